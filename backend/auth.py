@@ -5,17 +5,23 @@ Bu modül, JWT tabanlı kimlik doğrulama ve yetkilendirme işlemlerini yönetir
 Kullanıcı giriş, token oluşturma ve doğrulama işlemlerini içerir.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import os
+import threading
+import time
 import models
 import schemas
-from database import get_db
+from database import get_db, AsyncSessionLocal
 
 
 # ==================== GÜVENLİK YAPILANDIRMASI ====================
@@ -28,6 +34,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 saat (oturumu kapatana kadar)
 # Şifre hashleme için bcrypt kullan
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Aynı anda çalışabilecek bcrypt işlemi sayısı (her biri bir çekirdeği ~200 ms meşgul eder)
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Çalışanlar doluyken sırada bekleyebilecek en fazla işlem; aşılırsa 503 döner
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+# Token sürüm/iptal tablosunun veritabanından yenilenme aralığı (saniye)
+CREDENTIAL_REFRESH_INTERVAL = float(os.environ.get("CREDENTIAL_REFRESH_INTERVAL", "30"))
+
 # OAuth2 şeması (Bearer token)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -61,6 +76,124 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: list) -> list:
+    """
+    Birden fazla şifreyi hashle (süreç havuzunda toplu çalıştırmak için)
+    
+    Args:
+        passwords: Düz metin şifreler
+        
+    Returns:
+        list: Aynı sırada hashlenmiş şifreler
+    """
+    return [pwd_context.hash(password) for password in passwords]
+
+
+class PasswordHasherPool:
+    """
+    bcrypt işlemlerini olay döngüsü (event loop) dışında çalıştıran sınırlı havuz
+    
+    bcrypt hesaplama sırasında GIL'i bıraktığı için iş parçacığı havuzu yeterlidir.
+    Çalışanlar ve kuyruk doluysa yeni istek beklemek yerine 503 ile reddedilir;
+    böylece giriş dalgaları sitenin geri kalanını kilitlemez.
+    
+    Bir iş, çalışan iş parçacığında gerçekten bitene kadar in_flight'ta sayılır.
+    İstemci bağlantıyı kesip bekleyen coroutine iptal edilse de bcrypt çağrısı
+    sürer; sayaç bu yüzden havuz işinin done-callback'inde düşürülür.
+    """
+    
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        # Sayaçlar hem olay döngüsünde hem çalışan iş parçacıklarında güncellenir
+        self._lock = threading.Lock()
+    
+    @property
+    def queue_depth(self) -> int:
+        """Çalışan bekleyen işlem sayısı"""
+        return max(0, self.in_flight - self.workers)
+    
+    async def run(self, func, *args):
+        """
+        Fonksiyonu havuzda çalıştır
+        
+        Raises:
+            HTTPException: Kuyruk doluysa (503)
+        """
+        with self._lock:
+            full = self.in_flight >= self.workers + self.max_queue
+            if full:
+                self.rejected += 1
+            else:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if full:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Sunucu şu anda yoğun, lütfen birkaç saniye sonra tekrar deneyin",
+                headers={"Retry-After": "1"},
+            )
+        
+        submitted_at = time.perf_counter()
+        started_at = []
+        
+        def timed_call():
+            started_at.append(time.perf_counter())
+            return func(*args)
+        
+        future = self._executor.submit(timed_call)
+        future.add_done_callback(lambda done: self._finished(done, submitted_at, started_at))
+        return await asyncio.wrap_future(future)
+    
+    def _finished(self, future, submitted_at: float, started_at: list) -> None:
+        """
+        Havuz işi bittiğinde (başarılı, hatalı veya iptal) çağrılır
+        
+        Yalnızca başarılı işler completed'e ve kuyrukta bekleme süresine
+        (gönderimden çalışmaya başlamaya kadar) katılır.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+                self.total_wait_seconds += started_at[0] - submitted_at
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+
+# Uygulama genelinde kullanılan bcrypt havuzu
+password_hasher = PasswordHasherPool()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password'ün olay döngüsünü bloklamayan sürümü"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash'in olay döngüsünü bloklamayan sürümü"""
+    return await password_hasher.run(get_password_hash, password)
+
+
 
 # ==================== TOKEN İŞLEMLERİ ====================
 
@@ -90,9 +223,127 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def user_token_claims(user: models.User) -> dict:
+    """
+    Admin paneli token'ına eklenecek yetki bilgileri
+    
+    Yetkilendirme bu bilgilerle veritabanına gitmeden yapılır; ver (token
+    sürümü) şifre değişikliği veya pasifleştirmede artırılarak eski token'lar
+    geçersiz kılınır. adm ve act yalnızca üst sınırdır: güncel değerler
+    CredentialVersions tablosundan okunup token'dakilerle birlikte aranır.
+    """
+    return {
+        "sub": user.username,
+        "uid": user.id,
+        "adm": bool(user.is_admin),
+        "act": bool(user.is_active),
+        "ver": user.token_version or 0,
+    }
+
+
+@dataclass
+class TokenClaims:
+    """Doğrulanmış token'dan okunan kullanıcı bilgileri"""
+    user_id: int
+    username: str
+    is_admin: bool
+    is_active: bool
+    token_version: int
+
+
+# ==================== TOKEN SÜRÜM TABLOSU ====================
+
+class CredentialVersions:
+    """
+    Kullanıcı başına güncel token sürümü, aktiflik ve admin durumu (bellekte)
+    
+    Her istekte kullanıcı satırını okumak yerine token'daki sürüm bu tabloyla
+    karşılaştırılır; admin yetkisi alınan kullanıcının token'ı da böylece
+    sürümü değişmeden yetkisini kaybeder. Bu süreçteki değişiklikler set() ile
+    hemen yansır; başka süreçlerde veya doğrudan veritabanında yapılan
+    değişiklikler en geç CREDENTIAL_REFRESH_INTERVAL saniye içinde yenilemeyle gelir.
+    
+    Veritabanında bulunamayan kullanıcılar (ör. silinmiş kullanıcının hâlâ
+    geçerli token'ı) da hatırlanır; böyle bir token her istekte sorgu yaptırmaz.
+    """
+    
+    def __init__(self, interval: float = CREDENTIAL_REFRESH_INTERVAL):
+        self.interval = interval
+        self._entries = {}
+        self._missing = set()
+        self._task: Optional[asyncio.Task] = None
+    
+    def set(self, user: models.User) -> None:
+        """Kullanıcının güncel sürümünü tabloya yaz"""
+        self._missing.discard(user.id)
+        self._entries[user.id] = (user.token_version or 0, bool(user.is_active), bool(user.is_admin))
+    
+    async def refresh(self) -> None:
+        """Tüm kullanıcıların sürümlerini tek sorguyla yeniden yükle"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(models.User.id, models.User.token_version, models.User.is_active, models.User.is_admin)
+            )).all()
+        self._entries = {
+            user_id: (token_version or 0, bool(is_active), bool(is_admin))
+            for user_id, token_version, is_active, is_admin in rows
+        }
+        self._missing = set()
+    
+    async def get(self, user_id: int):
+        """
+        Kullanıcının (sürüm, aktif, admin) bilgisini getir
+        
+        Tabloda yoksa (ör. yeni oluşturulan kullanıcı) tek satır okunur; satır
+        da yoksa sonuç bir sonraki yenilemeye kadar hatırlanır.
+        
+        Returns:
+            tuple: (token_version, is_active, is_admin) veya kullanıcı yoksa None
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            if user_id in self._missing:
+                return None
+            async with AsyncSessionLocal() as db:
+                user = await db.get(models.User, user_id)
+            if user is None:
+                self._missing.add(user_id)
+                return None
+            self.set(user)
+            entry = self._entries[user_id]
+        return entry
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except Exception:
+                # Yenileme başarısızsa eldeki tabloyla devam et
+                pass
+    
+    def start(self) -> None:
+        """Periyodik yenilemeyi başlat (uygulama başlangıcında)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Uygulama genelinde kullanılan token sürüm tablosu
+credential_versions = CredentialVersions()
+
+
 # ==================== KULLANICI İŞLEMLERİ ====================
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """
     Kullanıcı adına göre kullanıcıyı bul
     
@@ -103,10 +354,11 @@ def get_user_by_username(db: Session, username: str):
     Returns:
         User: Kullanıcı nesnesi veya None
     """
-    return db.query(models.User).filter(models.User.username == username).first()
+    result = await db.execute(select(models.User).where(models.User.username == username))
+    return result.scalars().first()
 
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
     """
     Kullanıcıyı doğrula
     
@@ -118,12 +370,12 @@ def authenticate_user(db: Session, username: str, password: str):
     Returns:
         User: Başarılıysa kullanıcı nesnesi, değilse False
     """
-    user = get_user_by_username(db, username)
+    user = await get_user_by_username(db, username)
     
     if not user:
         return False
     
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     
     return user
@@ -131,19 +383,18 @@ def authenticate_user(db: Session, username: str, password: str):
 
 # ==================== YETKİLENDİRME ====================
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> TokenClaims:
     """
-    Token'dan mevcut kullanıcıyı al
+    Token'ı doğrula ve yetki bilgilerini döndür (veritabanı sorgusu yok)
     
     Args:
         token: JWT Bearer token
-        db: Veritabanı oturumu
         
     Returns:
-        User: Mevcut kullanıcı
+        TokenClaims: Token'daki kullanıcı bilgileri
         
     Raises:
-        HTTPException: Token geçersizse veya kullanıcı bulunamazsa
+        HTTPException: Token geçersizse, eski sürümdeyse veya kullanıcı silinmişse
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -155,31 +406,71 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         # Token'ı çöz
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
+        user_id = payload.get("uid")
+        token_version = payload.get("ver")
         
-        if username is None:
+        # Öğrenci token'ları ve yetki bilgisi taşımayan eski token'lar kabul edilmez
+        if username is None or user_id is None or token_version is None:
             raise credentials_exception
             
     except JWTError:
         raise credentials_exception
     
-    # Kullanıcıyı veritabanından bul
-    user = get_user_by_username(db, username=username)
+    # Şifre değişikliği / pasifleştirme sonrası eski token'ları reddet
+    entry = await credential_versions.get(user_id)
+    if entry is None or entry[0] != token_version:
+        raise credentials_exception
+    
+    return TokenClaims(
+        user_id=user_id,
+        username=username,
+        is_admin=bool(payload.get("adm")) and entry[2],
+        is_active=bool(payload.get("act")) and entry[1],
+        token_version=token_version,
+    )
+
+
+async def get_current_user(
+    claims: TokenClaims = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Token'dan mevcut kullanıcının veritabanı kaydını al
+    
+    Yalnızca kullanıcı satırına ihtiyaç duyan endpoint'ler (profil, şifre
+    değiştirme) içindir; yetki kontrolleri get_current_active_admin ile yapılır.
+    
+    Args:
+        claims: Doğrulanmış token bilgileri
+        db: Veritabanı oturumu
+        
+    Returns:
+        User: Mevcut kullanıcı
+        
+    Raises:
+        HTTPException: Kullanıcı bulunamazsa
+    """
+    user = await db.get(models.User, claims.user_id)
     
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Kimlik bilgileri doğrulanamadı",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return user
 
 
-async def get_current_active_admin(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_admin(current_user: TokenClaims = Depends(get_token_claims)):
     """
-    Mevcut kullanıcının admin olduğunu doğrula
+    Mevcut kullanıcının admin olduğunu doğrula (token ve sürüm tablosuyla, veritabanı sorgusu yok)
     
     Args:
-        current_user: Mevcut kullanıcı
+        current_user: Token'daki kullanıcı bilgileri
         
     Returns:
-        User: Admin kullanıcı
+        TokenClaims: Admin kullanıcının bilgileri
         
     Raises:
         HTTPException: Kullanıcı aktif değilse veya admin yetkisi yoksa
@@ -196,4 +487,4 @@ async def get_current_active_admin(current_user: models.User = Depends(get_curre
             detail="Yetersiz yetki - Admin erişimi gerekli"
         )
     
-    return current_user
\ No newline at end of file
+    return current_user
@@ -0,0 +1,126 @@
+"""
+Liste Serileştirme Benchmark'ı
+
+Duyuru listesinin satır başına maliyetini iki yol için ölçer:
+    - önce: ORM nesneleri -> schemas.Announcement.model_validate -> FastAPI
+      response_model doğrulaması (model_dump + tekrar doğrulama) -> json.dumps
+    - sonra: seçilen kolonların satır demetleri -> serializers.announcement_dict
+      -> serializers.dumps (orjson)
+Her iki yol da aynı geçici veritabanından okur; sorgu süresi de dahildir.
+Çıktının iki yolda birebir aynı olduğu da kontrol edilir.
+
+Kullanım (backend klasöründe):
+    python benchmarks/serialization.py --rows 1000 --repeat 20
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+import serializers  # noqa: E402
+
+
+def seed_database(db_path: Path, rows: int):
+    """Geçici veritabanını örnek duyurularla doldur"""
+    engine = database.build_engine(f"sqlite:///{db_path}", "wal")
+    database.Base.metadata.create_all(bind=engine)
+
+    Session = database.sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all(
+            models.Announcement(
+                title=f"Duyuru {i}",
+                content="Rektörlük'ten gelen yazıya göre ders işlenmeyecektir. " * 8,
+                announcement_type="department",
+                date="25.10.2025",
+            )
+            for i in range(rows)
+        )
+        db.commit()
+    return engine, Session
+
+
+def query(statement):
+    return (
+        statement.where(models.Announcement.is_published == True)
+        .order_by(models.Announcement.created_at.desc(), models.Announcement.id.desc())
+    )
+
+
+def before(db, response_adapter) -> bytes:
+    """Eski yol: ORM + iki kez pydantic doğrulaması + json.dumps"""
+    announcements = db.scalars(query(select(models.Announcement))).all()
+    result = []
+    for announcement in announcements:
+        item = schemas.Announcement.model_validate(announcement)
+        item.variants = []
+        result.append(item)
+    # FastAPI, endpoint'in döndürdüğü modelleri dict'e çevirip response_model ile tekrar doğrular
+    content = response_adapter.dump_python(
+        response_adapter.validate_python([item.model_dump() for item in result]), mode="json"
+    )
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def after(db) -> bytes:
+    """Yeni yol: kolon demetleri + eşleyici + orjson"""
+    announcements = db.execute(query(select(*serializers.ANNOUNCEMENT_COLUMNS))).all()
+    return serializers.dumps([serializers.announcement_dict(announcement) for announcement in announcements])
+
+
+def measure(function, repeat: int) -> float:
+    """En iyi çalışma süresi (saniye)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Liste serileştirme benchmark'ı")
+    parser.add_argument("--rows", type=int, default=1000, help="Duyuru sayısı")
+    parser.add_argument("--repeat", type=int, default=20, help="Tekrar sayısı (en iyisi raporlanır)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine, Session = seed_database(Path(directory) / "bench.db", args.rows)
+        response_adapter = TypeAdapter(List[schemas.Announcement])
+
+        with Session() as db:
+            old_body, new_body = before(db, response_adapter), after(db)
+            if old_body != new_body:
+                raise SystemExit("❌ İki yolun çıktısı farklı")
+
+            # Kimlik haritası (identity map) önceki turun nesnelerini tutmasın
+            def run_before():
+                before(db, response_adapter)
+                db.expunge_all()
+
+            old_time = measure(run_before, args.repeat)
+            new_time = measure(lambda: after(db), args.repeat)
+        engine.dispose()
+
+    json_backend = "orjson" if serializers.orjson is not None else "json"
+    print(f"{args.rows} satır, {len(new_body) / 1024:.1f} KB yanıt ({json_backend})")
+    print(f"{'yol':<8}{'toplam (ms)':>14}{'satır başına (µs)':>20}")
+    for name, elapsed in (("önce", old_time), ("sonra", new_time)):
+        print(f"{name:<8}{elapsed * 1000:>14.2f}{elapsed / args.rows * 1e6:>20.2f}")
+    print(f"Hızlanma: {old_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
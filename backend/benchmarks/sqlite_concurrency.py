@@ -0,0 +1,142 @@
+"""
+SQLite Eşzamanlılık Benchmark'ı
+
+Ödev teslim yoğunluğunu taklit eder: yazıcılar create_homework ile aynı
+sorgu/insert/commit akışını çalıştırırken okuyucular duyuru listesini
+(get_announcements sorgusu) okur. Her SQLite profili için geçici bir
+veritabanı oluşturulur ve okuma/yazma verimi ile kilit hataları raporlanır.
+
+Kullanım (backend klasöründe):
+    python benchmarks/sqlite_concurrency.py --duration 5 --readers 8 --writers 4
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database  # noqa: E402
+import models  # noqa: E402
+
+
+def seed_database(db_path: Path, profile: str, announcements: int) -> None:
+    """Geçici veritabanını tablolar ve örnek verilerle doldur"""
+    sync_engine = database.build_engine(f"sqlite:///{db_path}", profile)
+    database.Base.metadata.create_all(bind=sync_engine)
+
+    Session = database.sessionmaker(bind=sync_engine)
+    with Session() as db:
+        db.add(models.Course(code="BENCH101", name="Benchmark Dersi"))
+        db.add(models.Student(
+            student_number="2025999999",
+            full_name="Benchmark Öğrenci",
+            email="bench@ogrenci.karabuk.edu.tr",
+            hashed_password="x"
+        ))
+        db.add_all(
+            models.Announcement(title=f"Duyuru {i}", content="İçerik " * 50)
+            for i in range(announcements)
+        )
+        db.commit()
+    sync_engine.dispose()
+
+
+async def reader(Session, stop_at: float, stats: dict) -> None:
+    """get_announcements ile aynı liste sorgusunu tekrar tekrar çalıştır"""
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            async with Session() as db:
+                query = select(models.Announcement).where(models.Announcement.is_published == True)
+                (await db.scalars(query.order_by(models.Announcement.created_at.desc()).limit(100))).all()
+            stats["reads"] += 1
+            stats["read_latencies"].append(time.perf_counter() - started)
+        except OperationalError:
+            stats["read_errors"] += 1
+
+
+async def writer(Session, stop_at: float, stats: dict) -> None:
+    """create_homework akışını (ders + öğrenci sorgusu, insert, commit) tekrarla"""
+    while time.perf_counter() < stop_at:
+        try:
+            async with Session() as db:
+                course = await db.scalar(select(models.Course).where(models.Course.code == "BENCH101"))
+                student = await db.scalar(select(models.Student).where(
+                    models.Student.student_number == "2025999999"
+                ))
+                db.add(models.Homework(
+                    student_id=student.id,
+                    student_number=student.student_number,
+                    student_name=student.full_name,
+                    course_id=course.id,
+                    course_code=course.code,
+                    course_name=course.name,
+                    file_url="/uploads/pdfs/bench.pdf"
+                ))
+                await db.commit()
+            stats["writes"] += 1
+        except OperationalError:
+            stats["write_errors"] += 1
+
+
+async def run_profile(profile: str, args) -> dict:
+    """Tek bir profil için benchmark'ı çalıştır"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "bench.db"
+        seed_database(db_path, profile, args.announcements)
+
+        bench_engine = database.build_async_engine(f"sqlite+aiosqlite:///{db_path}", profile)
+        Session = async_sessionmaker(
+            bind=bench_engine,
+            expire_on_commit=False
+        )
+        stats = {
+            "reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0,
+            "read_latencies": []
+        }
+
+        stop_at = time.perf_counter() + args.duration
+        tasks = [reader(Session, stop_at, stats) for _ in range(args.readers)]
+        tasks += [writer(Session, stop_at, stats) for _ in range(args.writers)]
+        await asyncio.gather(*tasks)
+        await bench_engine.dispose()
+
+    latencies = sorted(stats["read_latencies"]) or [0.0]
+    return {
+        "profile": profile,
+        "reads_per_sec": stats["reads"] / args.duration,
+        "writes_per_sec": stats["writes"] / args.duration,
+        "read_p99_ms": latencies[int(len(latencies) * 0.99) - 1 if len(latencies) > 1 else 0] * 1000,
+        "read_errors": stats["read_errors"],
+        "write_errors": stats["write_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite profil eşzamanlılık benchmark'ı")
+    parser.add_argument("--duration", type=float, default=5.0, help="Profil başına süre (sn)")
+    parser.add_argument("--readers", type=int, default=8, help="Eşzamanlı okuyucu sayısı")
+    parser.add_argument("--writers", type=int, default=4, help="Eşzamanlı yazıcı sayısı")
+    parser.add_argument("--announcements", type=int, default=200, help="Örnek duyuru sayısı")
+    parser.add_argument("--profiles", nargs="+", default=list(database.SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profil':<10} {'okuma/sn':>10} {'yazma/sn':>10} {'okuma p99 (ms)':>15} {'okuma hata':>11} {'yazma hata':>11}")
+    for profile in args.profiles:
+        result = asyncio.run(run_profile(profile, args))
+        print(
+            f"{result['profile']:<10} {result['reads_per_sec']:>10.1f} {result['writes_per_sec']:>10.1f} "
+            f"{result['read_p99_ms']:>15.1f} {result['read_errors']:>11} {result['write_errors']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
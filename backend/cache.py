@@ -0,0 +1,241 @@
+"""
+Yanıt Önbelleği (Response Cache)
+
+Bu modül, herkese açık GET endpoint'lerinin serileştirilmiş JSON yanıtlarını
+bellekte tutan TTL + LRU bir önbellek ve bunu uygulayan ASGI middleware'ini içerir.
+İçerik yalnızca admin düzenlediğinde değiştiği için yanıtlar yol + sorgu
+parametrelerine göre saklanır; admin yazma endpoint'leri ilgili kaynağın
+kayıtlarını invalidate() ile temizler.
+
+Önbellek süreç içidir; birden fazla worker ile çalışırken her worker kendi
+önbelleğini tutar ve TTL, diğer worker'lardaki eski kayıtların üst sınırıdır.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import parse_qsl
+import os
+import time
+
+from conditional import is_not_modified
+
+
+# ==================== ÖNBELLEK YAPILANDIRMASI ====================
+
+# Kayıt ömrü (saniye); 0 önbelleği kapatır
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "60"))
+
+# Saklanacak en fazla yanıt sayısı (LRU ile en eski kullanılan çıkarılır)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+
+@dataclass
+class CachedResponse:
+    """Önbellekteki tek bir yanıt (durum kodu, başlıklar ve gövde baytları)"""
+    status: int
+    headers: list
+    body: bytes
+    expires_at: float = field(default=0.0)
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+
+    @classmethod
+    def from_response(cls, status: int, headers: list, body: bytes) -> "CachedResponse":
+        """Yakalanan yanıttan kayıt oluştur; koşullu GET için doğrulayıcıları ayrıştır"""
+        entry = cls(status=status, headers=headers, body=body)
+        for name, value in headers:
+            if name == b"etag":
+                entry.etag = value.decode("latin-1")
+            elif name == b"last-modified":
+                entry.last_modified = parsedate_to_datetime(value.decode("latin-1"))
+        return entry
+
+    def validator_headers(self) -> list:
+        """304 yanıtında tekrar gönderilecek başlıklar"""
+        return [
+            (name, value) for name, value in self.headers
+            if name in (b"etag", b"last-modified", b"cache-control")
+        ]
+
+
+# ==================== ÖNBELLEK ====================
+
+class ResponseCache:
+    """
+    TTL + LRU yanıt önbelleği
+
+    Anahtar (yol, sıralı sorgu parametreleri) çiftidir. İstatistikler
+    (hits, misses, evictions, expirations, invalidations) stats() ile okunur.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        # Her invalidate çağrısında artar; okuma sırasında değiştiyse yanıt saklanmaz
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    @staticmethod
+    def make_key(path: str, query_string: bytes) -> tuple:
+        """Yol ve sorgu parametrelerinden sıralamadan bağımsız anahtar üret"""
+        params = tuple(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+        return path, params
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        """Kaydı getir; süresi dolmuşsa sil ve None döndür"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: tuple, entry: CachedResponse) -> None:
+        """Kaydı sakla; kapasite aşılırsa en eski kullanılanı çıkar"""
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *prefixes: str) -> int:
+        """
+        Verilen yollar (ve alt yolları) için saklanan yanıtları sil
+
+        Args:
+            prefixes: Örn. "/api/announcements"
+
+        Returns:
+            int: Silinen kayıt sayısı
+        """
+        self.generation += 1
+        stale = [
+            key for key in self._entries
+            if any(key[0] == prefix or key[0].startswith(prefix + "/") for prefix in prefixes)
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# Uygulama genelinde kullanılan önbellek
+response_cache = ResponseCache()
+
+
+# ==================== ASGI MIDDLEWARE ====================
+
+class ResponseCacheMiddleware:
+    """
+    Belirli yollara gelen GET isteklerinin 200 yanıtlarını önbellekten sun
+
+    Önbellekte yoksa istek normal işlenir, gönderilen başlık ve gövde
+    yakalanır ve saklanır. Yanıt X-Cache başlığı ile HIT/MISS olarak işaretlenir.
+    Önbellekteki yanıtın ETag/Last-Modified değeri istemcininkiyle eşleşirse
+    veritabanına hiç gidilmeden 304 döner.
+    """
+
+    def __init__(self, app, cache: ResponseCache, paths):
+        self.app = app
+        self.cache = cache
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.paths
+            or not self.cache.enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache.make_key(scope["path"], scope.get("query_string", b""))
+        entry = self.cache.get(key)
+        if entry is not None:
+            if entry.etag is not None:
+                request_headers = {
+                    name.decode("latin-1"): value.decode("latin-1")
+                    for name, value in scope.get("headers", [])
+                }
+                if is_not_modified(request_headers, entry.etag, entry.last_modified):
+                    await send({
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": entry.validator_headers() + [(b"x-cache", b"HIT")],
+                    })
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+            await send({
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": entry.headers + [(b"x-cache", b"HIT")],
+            })
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        generation = self.cache.generation
+        captured = {"status": None, "headers": None, "body": []}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                captured["status"] = message["status"]
+                captured["headers"] = list(message.get("headers", []))
+                message = dict(message, headers=captured["headers"] + [(b"x-cache", b"MISS")])
+            elif message["type"] == "http.response.body":
+                captured["body"].append(message.get("body", b""))
+                # Yanıt tamamlandı; arada invalidate olmadıysa sakla
+                if (
+                    not message.get("more_body", False)
+                    and captured["status"] == 200
+                    and generation == self.cache.generation
+                ):
+                    self.cache.set(key, CachedResponse.from_response(
+                        status=captured["status"],
+                        headers=captured["headers"],
+                        body=b"".join(captured["body"]),
+                    ))
+            await send(message)
+
+        await self.app(scope, receive, capture_send)
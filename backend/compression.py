@@ -0,0 +1,341 @@
+"""
+Yanıt Sıkıştırma (gzip / brotli)
+
+Bu modül iki parçadan oluşur:
+    - CompressionMiddleware: Dinamik JSON/metin yanıtlarını Accept-Encoding'e
+      göre brotli veya gzip ile sıkıştırır. ETag taşıyan yanıtların sıkıştırılmış
+      gövdeleri küçük bir LRU'da saklanır; önbellekten (X-Cache: HIT) dönen aynı
+      liste her istekte yeniden sıkıştırılmaz. ETag'e dokunulmaz: dinamik
+      yanıtların ETag'leri zaten zayıftır (conditional.make_etag), güçlü ETag'li
+      (bayt düzeyinde) yanıtlar ise sıkıştırılmaz.
+    - precompress_file: Yüklenen statik dosyaların yanına bir kez .gz / .br
+      kopyaları yazar; CachedFileResponse bunları Accept-Encoding'e göre sunar.
+
+brotli paketi kurulu değilse yalnızca gzip kullanılır.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import gzip
+import mimetypes
+import os
+import uuid
+import zlib
+
+try:
+    import brotli
+except ImportError:  # isteğe bağlı bağımlılık
+    brotli = None
+
+
+# ==================== YAPILANDIRMA ====================
+
+# Bu boyutun altındaki yanıtlar sıkıştırılmaz (byte)
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+
+# Dinamik yanıtlar için seviyeler (hız/oran dengesi)
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "5"))
+
+# Sıkıştırılmış gövde önbelleğindeki en fazla kayıt sayısı
+COMPRESSED_BODY_CACHE_SIZE = int(os.environ.get("COMPRESSED_BODY_CACHE_SIZE", "128"))
+
+# Ön sıkıştırma yalnızca en az bu oranda kazanç varsa saklanır (sıkıştırılmış / orijinal)
+PRECOMPRESS_MAX_RATIO = 0.9
+
+# Dinamik olarak sıkıştırılan içerik tipleri
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+# Önceden sıkıştırılabilen statik dosya tipleri (görseller zaten sıkıştırılmıştır)
+PRECOMPRESSIBLE_TYPES = {"application/pdf", "image/svg+xml", "application/json", "text/plain", "text/csv"}
+
+# Ön sıkıştırılmış kopyaların uzantıları
+ENCODING_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+# Tercih sırasına göre desteklenen kodlamalar
+ENCODINGS = (["br"] if brotli is not None else []) + ["gzip"]
+
+
+# ==================== KODLAMA SEÇİMİ ====================
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Accept-Encoding başlığındaki kabul edilen (q > 0) kodlamalar"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """İstemcinin kabul ettiği en iyi kodlama (br > gzip) veya None"""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY if level is None else level)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def add_vary(headers: list, value: bytes = b"Accept-Encoding") -> list:
+    """Vary başlığına değer ekle (yoksa oluştur)"""
+    for index, (name, existing) in enumerate(headers):
+        if name == b"vary":
+            if value.lower() not in existing.lower():
+                headers[index] = (name, existing + b", " + value)
+            return headers
+    headers.append((b"vary", value))
+    return headers
+
+
+# ==================== SIKIŞTIRILMIŞ GÖVDE ÖNBELLEĞİ ====================
+
+class CompressedBodyCache:
+    """
+    İstek hedefi + ETag + kodlama anahtarıyla sıkıştırılmış gövdeleri tutan LRU
+
+    Aynı ETag farklı hedeflerde de görülebilir (ör. birleşik doğrulayıcılar);
+    bu yüzden anahtara yol, sorgu ve gövde özeti de girer.
+    Kayıtların süresi dolmaz; içerik değişince ETag de değişir ve eski kayıt
+    zamanla çıkarılır.
+    """
+
+    def __init__(self, max_entries: int = COMPRESSED_BODY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def get_or_compress(self, target: tuple, etag: Optional[bytes], encoding: str, body: bytes) -> bytes:
+        key = (target, etag, encoding, len(body), hash(body))
+        if etag is not None and key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        compressed = compress(body, encoding)
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        if etag is not None and self.max_entries > 0:
+            self._entries[key] = compressed
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def stats(self) -> dict:
+        return {
+            "encodings": ENCODINGS,
+            "min_size": COMPRESSION_MIN_SIZE,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+        }
+
+
+# Uygulama genelinde kullanılan sıkıştırılmış gövde önbelleği
+compressed_bodies = CompressedBodyCache()
+
+
+# ==================== ASGI MIDDLEWARE ====================
+
+class CompressionMiddleware:
+    """
+    Dinamik yanıtları Accept-Encoding'e göre sıkıştır
+
+    Yalnızca COMPRESSIBLE_TYPES içindeki, COMPRESSION_MIN_SIZE'dan büyük ve
+    zaten kodlanmamış yanıtlar sıkıştırılır. ETag olduğu gibi korunur; böylece
+    handler'ın 304'ü, kodlanmamış ve sıkıştırılmış 200 yanıtları aynı ETag'i
+    taşır. Güçlü ETag'li yanıtlar (dosyalar) belirli baytlara bağlı olduğundan
+    ve Range/If-Range ile kullanıldığından sıkıştırılmaz; sıkıştırmaya değen
+    dosyaların .br/.gz kopyaları zaten ayrı ETag'lerle sunulur.
+    """
+
+    def __init__(self, app, cache: CompressedBodyCache = compressed_bodies, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.cache = cache
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def compress_send(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                # Gövdenin ilk parçası gelene kadar bekle
+                start_message = message
+                return
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                # pathsend / zerocopysend gibi gövde mesajları sıkıştırılmaz
+                passthrough = True
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            if compressor is not None:
+                # Akış halinde gelen yanıt parça parça sıkıştırılıyor
+                body = compressor.compress(message.get("body", b""))
+                if not message.get("more_body", False):
+                    body += compressor.flush()
+                await send({**message, "body": body})
+                return
+
+            response_start, start_message = start_message, None
+            response_headers = list(response_start.get("headers", []))
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if not self.should_compress(response_start["status"], response_headers, body, more_body):
+                if self.is_compressible_type(response_headers):
+                    add_vary(response_headers)
+                passthrough = True
+                await send({**response_start, "headers": response_headers})
+                await send(message)
+                return
+
+            etag = next((value for name, value in response_headers if name == b"etag"), None)
+            response_headers = [(name, value) for name, value in response_headers if name != b"content-length"]
+            response_headers.append((b"content-encoding", encoding.encode("latin-1")))
+            add_vary(response_headers)
+
+            if more_body:
+                compressor = self.streaming_compressor(encoding)
+                await send({**response_start, "headers": response_headers})
+                await send({**message, "body": compressor.compress(body)})
+                return
+
+            target = (scope["path"], scope.get("query_string", b""))
+            compressed = self.cache.get_or_compress(target, etag, encoding, body)
+            response_headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            await send({**response_start, "headers": response_headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, compress_send)
+
+    @staticmethod
+    def is_compressible_type(headers: list) -> bool:
+        content_type = next((value for name, value in headers if name == b"content-type"), b"")
+        return content_type.decode("latin-1").lower().startswith(COMPRESSIBLE_TYPES)
+
+    def should_compress(self, status: int, headers: list, body: bytes, more_body: bool) -> bool:
+        if status < 200 or status in (204, 206, 304):
+            return False
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"cache-control" and b"no-transform" in value.lower():
+                return False
+            if name == b"etag" and not value.startswith(b"W/"):
+                return False
+        if not self.is_compressible_type(headers):
+            return False
+        return more_body or len(body) >= self.minimum_size
+
+    @staticmethod
+    def streaming_compressor(encoding: str):
+        if encoding == "br":
+            return brotli.Compressor(quality=BROTLI_QUALITY)
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+# ==================== ÖN SIKIŞTIRMA ====================
+
+def is_precompressible(path) -> bool:
+    return mimetypes.guess_type(str(path))[0] in PRECOMPRESSIBLE_TYPES
+
+
+def precompressed_path(path, encoding: str) -> Path:
+    """Dosyanın verilen kodlamadaki kardeş dosyasının yolu (ör. x.pdf.gz)"""
+    return Path(f"{path}{ENCODING_EXTENSIONS[encoding]}")
+
+
+def precompressed_variant(path, accept_encoding: Optional[str]) -> Optional[tuple]:
+    """
+    İstemcinin kabul ettiği, diskte hazır en iyi sıkıştırılmış kopya
+
+    Returns:
+        tuple: (kodlama, dosya yolu) veya uygun kopya yoksa None
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in ENCODINGS:
+        if encoding in accepted:
+            sibling = precompressed_path(path, encoding)
+            if sibling.exists():
+                return encoding, sibling
+    return None
+
+
+def remove_precompressed(path) -> None:
+    """Dosyanın .gz / .br kopyalarını sil"""
+    for extension in ENCODING_EXTENSIONS.values():
+        Path(f"{path}{extension}").unlink(missing_ok=True)
+
+
+def precompress_file(path) -> dict:
+    """
+    Dosyanın yanına en yüksek seviyede sıkıştırılmış .gz ve .br kopyalarını yaz
+    Süreç havuzunda (jobs.get_process_pool) arka plan işi olarak çalıştırılır.
+    Kazanç PRECOMPRESS_MAX_RATIO'dan azsa kopya yazılmaz (zaten sıkıştırılmış içerik).
+
+    Args:
+        path: Sıkıştırılacak dosya
+
+    Returns:
+        dict: size ve yazılan her kodlama için boyut (ör. {"size": 1000, "gzip": 300})
+    """
+    path = Path(path)
+    if not is_precompressible(path):
+        return {"size": path.stat().st_size}
+
+    data = path.read_bytes()
+    result = {"size": len(data)}
+    for encoding in ENCODINGS:
+        compressed = compress(data, encoding, level=11 if encoding == "br" else 9)
+        if len(compressed) > len(data) * PRECOMPRESS_MAX_RATIO:
+            continue
+        sibling = precompressed_path(path, encoding)
+        temp_path = sibling.with_name(f".{sibling.name}.{uuid.uuid4().hex}.part")
+        temp_path.write_bytes(compressed)
+        os.replace(temp_path, sibling)
+        result[encoding] = len(compressed)
+    return result
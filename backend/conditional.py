@@ -0,0 +1,181 @@
+"""
+Koşullu GET (ETag / Last-Modified) Yardımcıları
+
+Bu modül, içerik endpoint'leri için doğrulayıcılar (validator) üretir ve
+If-None-Match / If-Modified-Since başlıklarını değerlendirir. İstemcinin
+elindeki sürüm güncelse gövde yeniden serileştirilip gönderilmez, 304 döner.
+
+Liste doğrulayıcıları tablonun max(updated_at) ve satır sayısından üretilir:
+ekleme, güncelleme ve silme işlemlerinin her biri en az birini değiştirir.
+Sayfalama ve filtre parametreleri de (query_key) ETag'e katılır; aynı tablo
+için farklı parametrelerle alınan yanıtlar birbirinin 304'ünü almaz.
+
+Bu doğrulayıcılar bayt değil anlam eşitliği bildirir: aynı içerik gzip, brotli
+veya kodlanmamış gönderilebilir. Bu yüzden ETag'ler her zaman zayıftır (W/);
+304, kodlanmamış 200 ve sıkıştırılmış 200 yanıtları aynı değeri taşır.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+
+
+# Doğrulayıcılı yanıtlar tarayıcı/CDN'de saklanır ama her seferinde doğrulanır
+CONDITIONAL_CACHE_CONTROL = "no-cache"
+
+
+@dataclass
+class Validators:
+    """Bir yanıtın ETag ve Last-Modified değerleri"""
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_http_date(self.last_modified)
+        return headers
+
+
+# ==================== DOĞRULAYICI ÜRETİMİ ====================
+
+def make_etag(*parts) -> str:
+    """Verilen parçalardan kararlı bir zayıf (W/) ETag üret"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def query_key(request: Request) -> tuple:
+    """İsteğin sorgu parametreleri, sıradan bağımsız (ETag'e katılmak için)"""
+    return tuple(sorted(request.query_params.multi_items()))
+
+
+async def table_validators(db, model, *extra_aggregates, extra=()) -> Validators:
+    """
+    Tablonun tamamı için doğrulayıcılar (tek aggregate sorgusu)
+
+    Args:
+        db: Async veritabanı oturumu
+        model: updated_at kolonu olan model
+        extra_aggregates: Temsili etkileyen ek aggregate'ler (ör. sum(views))
+        extra: Temsili etkileyen diğer değerler (ör. query_key(request))
+
+    Returns:
+        Validators: ETag ve son değişiklik zamanı
+    """
+    row = (await db.execute(
+        select(func.max(model.updated_at), func.count(), *extra_aggregates).select_from(model)
+    )).one()
+    last_modified = row[0]
+    return Validators(
+        etag=make_etag(model.__tablename__, *row, *extra),
+        last_modified=last_modified,
+    )
+
+
+async def combined_validators(db, *sources, extra=()) -> Validators:
+    """
+    Birden fazla tablonun doğrulayıcılarını tek sorguda birleştir
+
+    Args:
+        db: Async veritabanı oturumu
+        sources: (model, ek aggregate'ler...) demetleri; model updated_at kolonu içermeli
+        extra: Temsili etkileyen diğer değerler (ör. sayfa boyutu)
+
+    Returns:
+        Validators: Tüm tablolardan üretilen ETag ve en son değişiklik zamanı
+    """
+    columns = []
+    for model, *aggregates in sources:
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+        columns.extend(select(aggregate).select_from(model).scalar_subquery() for aggregate in aggregates)
+
+    row = (await db.execute(select(*columns))).one()
+    modified = [value for value in row if isinstance(value, datetime)]
+    return Validators(
+        etag=make_etag(*(source[0].__tablename__ for source in sources), *row, *extra),
+        last_modified=max(modified) if modified else None,
+    )
+
+
+def row_validators(obj) -> Validators:
+    """Tek bir kayıt için updated_at tabanlı doğrulayıcılar"""
+    return Validators(
+        etag=make_etag(obj.__tablename__, obj.id, obj.updated_at),
+        last_modified=obj.updated_at,
+    )
+
+
+# ==================== KOŞUL DEĞERLENDİRME ====================
+
+def format_http_date(value: datetime) -> str:
+    """UTC (naive) datetime'ı HTTP tarih biçimine çevir"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value, usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match başlığını zayıf karşılaştırma ile değerlendir (RFC 9110)"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified_since(if_modified_since: str, last_modified: Optional[datetime]) -> bool:
+    """If-Modified-Since tarihinden sonra değişiklik yoksa True"""
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP tarihleri saniye hassasiyetindedir
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_not_modified(headers, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    İstemcinin kopyası güncel mi?
+
+    If-None-Match varsa yalnızca o değerlendirilir; yoksa If-Modified-Since kullanılır.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        return not_modified_since(if_modified_since, last_modified)
+    return False
+
+
+def check_not_modified(request: Request, response: Response, validators: Validators) -> Optional[Response]:
+    """
+    Doğrulayıcıları yanıta ekle; istemcinin kopyası güncelse 304 yanıtı döndür
+
+    Kullanım:
+        not_modified = check_not_modified(request, response, validators)
+        if not_modified:
+            return not_modified
+    """
+    headers = validators.headers()
+    if is_not_modified(request.headers, validators.etag, validators.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,192 @@
+"""
+Ders Kayıtları (Enrollment)
+
+Öğrencinin kayıtlı olduğu dersler eskiden students.enrolled_courses kolonunda
+JSON metni olarak tutuluyordu; "X dersindeki öğrenciler" sorusu her öğrenci
+satırını okuyup json.loads etmeyi gerektiriyordu. Artık her kayıt enrollments
+tablosunda bir satırdır ve hem öğrencinin dersleri hem dersin öğrenci listesi
+indeks aralığı olarak okunur.
+
+Kayıt ekleme ve silme işlemleri küme tabanlıdır: istenen öğrenciler tek bir
+INSERT ... SELECT veya DELETE ... WHERE ile işlenir, satır satır döngü yoktur.
+API yanıtları eski enrolled_courses liste biçimini korur.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List
+import json
+
+from sqlalchemy import delete, inspect, literal, or_, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import models
+
+
+# ==================== OKUMA ====================
+
+async def enrolled_course_ids(db, student_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """
+    Öğrencilerin kayıtlı olduğu ders ID'leri (tek sorgu, birincil anahtar indeksi)
+
+    Returns:
+        dict: öğrenci ID'si -> artan sıralı ders ID'leri (kaydı olmayanlar için boş liste)
+    """
+    courses = {student_id: [] for student_id in student_ids}
+    if not courses:
+        return courses
+
+    rows = await db.execute(
+        select(models.Enrollment.student_id, models.Enrollment.course_id)
+        .where(models.Enrollment.student_id.in_(list(courses)))
+        .order_by(models.Enrollment.student_id, models.Enrollment.course_id)
+    )
+    for student_id, course_id in rows:
+        courses[student_id].append(course_id)
+    return courses
+
+
+def student_filter(student_ids: Iterable[int] = (), student_numbers: Iterable[str] = ()):
+    """ID veya öğrenci numarası listesine uyan öğrencileri seçen WHERE koşulu"""
+    return or_(
+        models.Student.id.in_(list(student_ids)),
+        models.Student.student_number.in_(list(student_numbers)),
+    )
+
+
+async def find_students(db, student_ids: Iterable[int] = (), student_numbers: Iterable[str] = ()):
+    """
+    İstenen öğrencileri bul ve bulunamayanları ayır
+
+    Returns:
+        tuple: (bulunan öğrenci ID'leri, bulunamayan ID ve numaralar)
+    """
+    student_ids, student_numbers = set(student_ids), set(student_numbers)
+    rows = (await db.execute(
+        select(models.Student.id, models.Student.student_number)
+        .where(student_filter(student_ids, student_numbers))
+    )).all()
+
+    found_ids = {row.id for row in rows}
+    found_numbers = {row.student_number for row in rows}
+    not_found = sorted(student_ids - found_ids) + sorted(student_numbers - found_numbers)
+    return sorted(found_ids), not_found
+
+
+# ==================== KÜME TABANLI YAZMA ====================
+
+def _insert_enrollments(source):
+    """(student_id, course_id, created_at) seçen sorgudan kayıt ekle; var olanlar atlanır"""
+    return (
+        sqlite_insert(models.Enrollment)
+        .from_select(["student_id", "course_id", "created_at"], source)
+        .on_conflict_do_nothing()
+    )
+
+
+async def enroll_students(db, course_id: int, student_ids: Iterable[int]) -> int:
+    """
+    Öğrencileri derse tek INSERT ... SELECT ile kaydet (commit çağırana aittir)
+
+    Returns:
+        int: Yeni eklenen kayıt sayısı (zaten kayıtlı olanlar sayılmaz)
+    """
+    source = (
+        select(models.Student.id, literal(course_id), literal(datetime.utcnow()))
+        .where(models.Student.id.in_(list(student_ids)))
+    )
+    result = await db.execute(_insert_enrollments(source))
+    return result.rowcount
+
+
+async def enroll_in_courses(db, student_id: int, course_ids: Iterable[int]) -> int:
+    """
+    Öğrenciyi var olan derslere tek INSERT ... SELECT ile kaydet (commit çağırana aittir)
+
+    Returns:
+        int: Yeni eklenen kayıt sayısı
+    """
+    source = (
+        select(literal(student_id), models.Course.id, literal(datetime.utcnow()))
+        .where(models.Course.id.in_(list(course_ids)))
+    )
+    result = await db.execute(_insert_enrollments(source))
+    return result.rowcount
+
+
+async def unenroll_students(db, course_id: int, student_ids: Iterable[int]) -> int:
+    """
+    Öğrencilerin ders kaydını tek DELETE ile sil (commit çağırana aittir)
+
+    Returns:
+        int: Silinen kayıt sayısı
+    """
+    result = await db.execute(
+        delete(models.Enrollment).where(
+            models.Enrollment.course_id == course_id,
+            models.Enrollment.student_id.in_(list(student_ids)),
+        )
+    )
+    return result.rowcount
+
+
+# ==================== GÖÇ ====================
+
+LEGACY_COLUMN = "enrolled_courses"
+
+
+def _parse_legacy_courses(value) -> List[int]:
+    """Eski JSON kolonunu ders ID listesine çevir (bozuk değerler yok sayılır)"""
+    try:
+        course_ids = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(course_ids, list):
+        return []
+    return [course_id for course_id in course_ids if isinstance(course_id, int) and not isinstance(course_id, bool)]
+
+
+def migrate_legacy_enrollments(connection) -> dict:
+    """
+    students.enrolled_courses JSON kolonunu enrollments tablosuna taşı ve kolonu kaldır
+
+    Var olmayan derslere ait ID'ler atlanır. Kolon yoksa (yeni veritabanı veya
+    göç zaten çalışmış) hiçbir şey yapılmaz.
+
+    Args:
+        connection: Senkron veritabanı bağlantısı (göç işlemi içinde)
+
+    Returns:
+        dict: {"students": taşınan öğrenci sayısı, "enrollments": eklenen kayıt sayısı}
+    """
+    counts = {"students": 0, "enrollments": 0}
+    columns = {column["name"] for column in inspect(connection).get_columns("students")}
+    if LEGACY_COLUMN not in columns:
+        return counts
+
+    models.Enrollment.__table__.create(bind=connection, checkfirst=True)
+    course_ids = set(connection.scalars(select(models.Course.id)))
+    now = datetime.utcnow()
+
+    rows = []
+    legacy = connection.execute(text(
+        f"SELECT id, {LEGACY_COLUMN} FROM students WHERE {LEGACY_COLUMN} IS NOT NULL"
+    ))
+    for student_id, value in legacy:
+        enrolled = set(_parse_legacy_courses(value)) & course_ids
+        if enrolled:
+            counts["students"] += 1
+            rows.extend(
+                {"student_id": student_id, "course_id": course_id, "created_at": now}
+                for course_id in sorted(enrolled)
+            )
+
+    if rows:
+        result = connection.execute(sqlite_insert(models.Enrollment).on_conflict_do_nothing(), rows)
+        counts["enrollments"] = result.rowcount
+
+    # DROP COLUMN SQLite 3.35+ gerektirir; eski sürümlerde kolon boşaltılıp bırakılır
+    if connection.dialect.server_version_info >= (3, 35, 0):
+        connection.execute(text(f"ALTER TABLE students DROP COLUMN {LEGACY_COLUMN}"))
+    else:
+        connection.execute(text(f"UPDATE students SET {LEGACY_COLUMN} = NULL"))
+    return counts
@@ -0,0 +1,336 @@
+"""
+Dosya Yanıtları (Range, Koşullu GET ve Değişmez Önbellek)
+
+Bu modül, yüklenen dosyaları sunan endpoint'ler ve /uploads StaticFiles
+bağlantısı için FileResponse'un genişletilmiş halini içerir:
+    - Range / 206 Partial Content (PDF görüntüleyiciler büyük dosyaları
+      parça parça açabilir), If-Range desteği ve 416 yanıtı
+    - ETag / Last-Modified doğrulaması ve 304 Not Modified
+    - Cache-Control: immutable; yükleme adları zaman damgasıyla benzersiz
+      olduğundan dosya içeriği aynı URL'de değişmez
+    - Sunucu destekliyorsa sıfır kopya gönderim (ASGI zerocopysend/pathsend)
+    - Diskte hazır .br / .gz kopyası varsa Accept-Encoding'e göre onun sunulması
+      (bkz. compression.precompress_file)
+Ayrıca birden fazla dosyayı bellekte veya diskte biriktirmeden ZIP olarak
+akıtan iter_zip üretecini içerir.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import io
+import logging
+import os
+import stat
+import time
+import zipfile
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+from compression import is_precompressible, precompressed_variant
+from conditional import is_not_modified
+from file_utils import UPLOAD_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== YAPILANDIRMA ====================
+
+# Değişmez dosyaların tarayıcı/CDN'de saklanma süresi (saniye, varsayılan 1 yıl)
+FILE_CACHE_MAX_AGE = int(os.environ.get("FILE_CACHE_MAX_AGE", str(365 * 24 * 3600)))
+
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={FILE_CACHE_MAX_AGE}, immutable"
+
+# İçeriği henüz değişebilecek dosyalar her seferinde (ETag ile) doğrulanır
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 304 yanıtında tekrar gönderilecek başlıklar
+VALIDATOR_HEADERS = ("etag", "last-modified", "cache-control", "vary")
+
+
+def cache_control_for(path) -> str:
+    """
+    Yüklenen dosyanın önbellek politikası
+
+    Görseller yüklendikten sonra arka planda yerinde optimize edilir; küçük
+    resmi oluşmadan (iş bitmeden) önce orijinal dosya değişmez sayılmaz.
+    """
+    path = Path(path)
+    if path.parent.name == "images":
+        thumbnail_path = path.parent.parent / "thumbnails" / f"thumb_{path.name}"
+        if not thumbnail_path.exists():
+            return REVALIDATE_CACHE_CONTROL
+    return IMMUTABLE_CACHE_CONTROL
+
+
+class RangeNotSatisfiable(Exception):
+    """İstenen bayt aralığı dosya sınırları dışında"""
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[tuple]:
+    """
+    Range başlığındaki tek bayt aralığını ayrıştır
+
+    Birden fazla aralık veya tanınmayan birim istenirse başlık yok sayılır
+    ve dosyanın tamamı gönderilir (RFC 9110 buna izin verir).
+
+    Args:
+        range_header: Range başlığı (ör. "bytes=0-1023", "bytes=-500")
+        size: Dosya boyutu (byte)
+
+    Returns:
+        tuple: (başlangıç, bitiş) dahil aralık veya aralık uygulanmayacaksa None
+
+    Raises:
+        RangeNotSatisfiable: Aralık dosyanın dışındaysa (416)
+    """
+    if not range_header:
+        return None
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    first, dash, last = ranges.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if end < start and start < size:
+                return None
+        else:
+            # Son N bayt
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            start, end = max(0, size - suffix), size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+# ==================== YANIT ====================
+
+class CachedFileResponse(FileResponse):
+    """
+    Range, koşullu GET ve Cache-Control destekli FileResponse
+
+    Doğrulayıcılar (ETag, Last-Modified) dosyanın stat bilgisinden üretilir;
+    If-None-Match / If-Modified-Since eşleşirse dosya açılmadan 304 döner.
+    """
+
+    def __init__(self, path, cache_control: Optional[str] = None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.headers.setdefault("cache-control", cache_control or cache_control_for(path))
+        self.headers["accept-ranges"] = "bytes"
+
+    async def __call__(self, scope, receive, send) -> None:
+        request_headers = Headers(scope=scope)
+        stat_result = self.stat_result
+
+        if is_precompressible(self.path):
+            vary = self.headers.get("vary")
+            if vary is None or "accept-encoding" not in vary.lower():
+                self.headers["vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+            # Aralık istekleri her zaman kodlanmamış içerik üzerinden yanıtlanır
+            if "range" not in request_headers:
+                variant = precompressed_variant(self.path, request_headers.get("accept-encoding"))
+                if variant is not None:
+                    encoding, self.path = variant
+                    stat_result = None
+                    for name in ("content-length", "last-modified", "etag"):
+                        if name in self.headers:
+                            del self.headers[name]
+                    self.headers["content-encoding"] = encoding
+
+        if stat_result is None:
+            try:
+                stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            except FileNotFoundError:
+                raise RuntimeError(f"File at path {self.path} does not exist.")
+            if not stat.S_ISREG(stat_result.st_mode):
+                raise RuntimeError(f"File at path {self.path} is not a file.")
+            self.set_stat_headers(stat_result)
+
+        etag = self.headers["etag"]
+        if is_not_modified(request_headers, etag, datetime.utcfromtimestamp(stat_result.st_mtime)):
+            await Response(status_code=304, headers={
+                name: value for name, value in self.headers.items() if name in VALIDATOR_HEADERS
+            })(scope, receive, send)
+            return
+
+        size = stat_result.st_size
+        offset, count = 0, size
+        # If-Range: istemcinin parçaları farklı bir sürüme aitse tamamını gönder
+        if_range = request_headers.get("if-range")
+        if if_range is None or if_range.strip() == etag:
+            try:
+                byte_range = parse_range(request_headers.get("range"), size)
+            except RangeNotSatisfiable:
+                await Response(status_code=416, headers={
+                    "content-range": f"bytes */{size}",
+                    "accept-ranges": "bytes",
+                })(scope, receive, send)
+                return
+            if byte_range is not None:
+                offset, end = byte_range
+                count = end - offset + 1
+                self.status_code = 206
+                self.headers["content-range"] = f"bytes {offset}-{end}/{size}"
+                self.headers["content-length"] = str(count)
+
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            await self.send_file(scope, send, offset, count, size)
+
+        if self.background is not None:
+            await self.background()
+
+    async def send_file(self, scope, send, offset: int, count: int, size: int) -> None:
+        """Dosyanın [offset, offset + count) aralığını gönder"""
+        extensions = scope.get("extensions") or {}
+
+        if "http.response.zerocopysend" in extensions:
+            # Sunucu dosyayı çekirdekte (sendfile) gönderir
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": offset,
+                    "count": count,
+                    "more_body": False,
+                })
+            return
+
+        if "http.response.pathsend" in extensions and offset == 0 and count == size:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(offset)
+            remaining = count
+            more_body = True
+            while more_body:
+                chunk = await file.read(min(self.chunk_size, remaining)) if remaining else b""
+                remaining -= len(chunk)
+                # Dosya gönderim sırasında kısalırsa (boş parça) yanıt kapatılır
+                more_body = remaining > 0 and bool(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": more_body,
+                })
+
+
+# ==================== STATİK DOSYALAR ====================
+
+class CachedStaticFiles(StaticFiles):
+    """/uploads bağlantısı için Range ve değişmez önbellek destekli StaticFiles"""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        return CachedFileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+
+# ==================== ZIP ARŞİVİ ====================
+
+# Arşivde bulunamayan dosyaların listelendiği not dosyası
+MISSING_FILES_NOTE = "EKSIK_DOSYALAR.txt"
+
+
+class _ZipSink(io.RawIOBase):
+    """
+    zipfile'ın yazdığı baytları bir sonraki parçaya kadar tutan, geri sarılamayan akış
+
+    zipfile geri sarılamayan akışlarda (seek yok) her girdinin CRC ve boyutunu
+    veri tanımlayıcısıyla (data descriptor) girdiden sonra yazar; bu sayede
+    arşiv başa dönmeden üretilir. tell() yazılan toplam baytı döndürür.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Biriken baytları döndür ve tamponu boşalt"""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_date_time(modified: Optional[datetime], stat_result) -> tuple:
+    timestamp = modified.timetuple() if modified else time.localtime(stat_result.st_mtime)
+    # ZIP biçimi 1980 öncesi tarihleri desteklemez
+    return max(tuple(timestamp[:6]), (1980, 1, 1, 0, 0, 0))
+
+
+def iter_zip(entries: Iterable[tuple], chunk_size: int = UPLOAD_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Dosyaları ZIP arşivi olarak parça parça üret
+
+    Her dosya chunk_size'lık parçalarla okunur ve arşive yazılan baytlar hemen
+    döndürülür; bellek kullanımı dosya sayısı ve boyutundan bağımsızdır. PDF ve
+    görseller zaten sıkıştırılmış olduğundan girdiler sıkıştırılmadan (stored)
+    eklenir. Bulunamayan dosyalar atlanır ve arşivin sonundaki
+    MISSING_FILES_NOTE dosyasında listelenir.
+
+    Senkron bir üreteçtir (dosya G/Ç'si bloklar); StreamingResponse onu iş
+    parçacığı havuzunda tüketir.
+
+    Args:
+        entries: (arşivdeki ad, dosya yolu, değiştirilme zamanı veya None) demetleri
+        chunk_size: Okuma parça boyutu (byte)
+
+    Yields:
+        bytes: Arşivin sıradaki parçası
+    """
+    sink = _ZipSink()
+    missing = []
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, path, modified in entries:
+            try:
+                source = open(path, "rb")
+            except OSError:
+                logger.warning(f"⚠️ Arşive eklenecek dosya bulunamadı: {path}")
+                missing.append(name)
+                continue
+
+            with source:
+                stat_result = os.fstat(source.fileno())
+                info = zipfile.ZipInfo(name, date_time=_zip_date_time(modified, stat_result))
+                info.compress_type = zipfile.ZIP_STORED
+                # Boyut önceden bilinirse zipfile ZIP64 gereksinimini kendisi belirler
+                info.file_size = stat_result.st_size
+                with archive.open(info, mode="w") as target:
+                    while chunk := source.read(chunk_size):
+                        target.write(chunk)
+                        yield sink.drain()
+            yield sink.drain()
+
+        if missing:
+            archive.writestr(MISSING_FILES_NOTE, "\n".join(missing) + "\n")
+    yield sink.drain()
@@ -0,0 +1,440 @@
+"""
+İçerik Adresli Dosya Deposu (Content-Addressed Store)
+
+Bu modül, yüklenen dosyaları SHA-256 özetleriyle adreslenen blob'lar olarak
+saklar. Mantıksal dosya adı (ör. /uploads/pdfs/CV_14225801012025_a7b3c9d2.pdf) blob'a
+bir sabit bağlantıdır (hardlink); aynı içerik kaç kez yüklenirse yüklensin
+diskte tek kopya tutulur. stored_files tablosu mantıksal adları blob'lara,
+stored_blobs tablosu blob'ları referans sayılarına eşler.
+
+Mevcut URL'ler ve StaticFiles değişmeden çalışır; blob'lar ayrıca içerik
+özetine bağlı, hiç değişmeyen /uploads/blobs/... adresinden sunulabilir.
+
+Depo, çağıranın veritabanı işlemine katılır ve commit etmez. Diskteki değişiklikler
+işlemin sonucuna göre tamamlanır ya da geri alınır. Bunun için oturuma
+kaydedilen işlem sonrası eylemler kullanılır (bkz. on_commit / on_rollback).
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+import models
+from file_utils import UPLOAD_CHUNK_SIZE, UPLOAD_DIR
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== YAPILANDIRMA ====================
+
+# Blob dizini: blobs/<özetin ilk 2 karakteri>/<özet><uzantı>
+BLOB_DIR = UPLOAD_DIR / "blobs"
+BLOB_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    """
+    destination'ı source'a sabit bağlantı yap (atomik olarak değiştirir)
+    Dosya sistemi hardlink desteklemiyorsa kopyalanır.
+    """
+    temp_path = destination.with_name(f".{destination.name}.link")
+    temp_path.unlink(missing_ok=True)
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    os.replace(temp_path, destination)
+
+
+def file_sha256(path: Path) -> str:
+    """Dosyanın SHA-256 özetini parça parça hesapla"""
+    checksum = hashlib.sha256()
+    with path.open("rb") as source:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+# ==================== İŞLEM SONRASI EYLEMLER ====================
+
+_AFTER_COMMIT = "file_store.after_commit"
+_AFTER_ROLLBACK = "file_store.after_rollback"
+
+
+def _session_info(db) -> dict:
+    """Async oturumlarda eylemler alttaki senkron oturumda tutulur"""
+    return getattr(db, "sync_session", db).info
+
+
+def on_commit(db, action) -> None:
+    """İşlem başarıyla commit edilince çalışacak dosya eylemini kaydet"""
+    _session_info(db).setdefault(_AFTER_COMMIT, []).append(action)
+
+
+def on_rollback(db, action) -> None:
+    """İşlem geri alınırsa (veya commit edilmeden kapanırsa) çalışacak eylemi kaydet"""
+    _session_info(db).setdefault(_AFTER_ROLLBACK, []).append(action)
+
+
+def _run_actions(actions, outcome: str) -> None:
+    for action in actions:
+        try:
+            action()
+        except OSError as e:
+            logger.warning(f"⚠️ Dosya eylemi çalıştırılamadı ({outcome}): {str(e)}")
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    session.info.pop(_AFTER_ROLLBACK, None)
+    _run_actions(session.info.pop(_AFTER_COMMIT, ()), "commit")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session, transaction) -> None:
+    # Commit edilen işlemde eylemler after_commit'te zaten tüketilmiştir
+    if transaction.parent is not None:
+        return
+    session.info.pop(_AFTER_COMMIT, None)
+    _run_actions(session.info.pop(_AFTER_ROLLBACK, ()), "rollback")
+
+
+# ==================== DEPO ====================
+
+class ContentStore:
+    """
+    SHA-256 ile adreslenen, referans sayılı dosya deposu
+
+    Referans sayıları çağıranın veritabanı oturumunda, çağıranın işleminde
+    güncellenir; commit çağırana aittir. Böylece dosya kaydı onu kullanan
+    satırla (ör. Homework) birlikte ya kalıcı olur ya da geri alınır.
+    """
+
+    def __init__(self, blob_dir: Path = BLOB_DIR):
+        self.blob_dir = blob_dir
+        self.stored = 0
+        self.deduplicated = 0
+        self.bytes_saved = 0
+        self.released = 0
+        self.blobs_removed = 0
+
+    def blob_path(self, sha256: str, extension: str = "") -> Path:
+        return self.blob_dir / sha256[:2] / f"{sha256}{extension}"
+
+    def blob_url(self, sha256: str, extension: str = "") -> str:
+        """Blob'un içerik özetine bağlı (değişmez) URL'si"""
+        return f"/uploads/blobs/{sha256[:2]}/{sha256}{extension}"
+
+    @staticmethod
+    def url_for(path: Path) -> str:
+        return f"/uploads/{path.relative_to(UPLOAD_DIR).as_posix()}"
+
+    async def add(self, db, temp_path: Path, destination: Path, sha256: str, size: int) -> dict:
+        """
+        Geçici dosyayı depoya al ve destination adıyla bağla
+
+        Aynı özetli blob zaten varsa geçici dosya silinir ve mevcut blob'a
+        yeni bir bağlantı açılır (diskte ek yer kaplamaz). İşlem geri alınırsa
+        mantıksal dosya silinir. Yeni oluşan blob dosyası diskte kalır ve aynı
+        içeriğin sonraki yüklemesinde yeniden kullanılır.
+
+        Args:
+            db: Async veritabanı oturumu (yalnızca flush edilir, commit çağırana aittir)
+            temp_path: Tamamen yazılmış geçici dosya
+            destination: Mantıksal dosya yolu (UPLOAD_DIR altında)
+            sha256: İçeriğin özeti
+            size: Boyut (byte)
+
+        Returns:
+            dict: blob_url ve deduplicated (içerik zaten depodaysa True)
+        """
+        url = self.url_for(destination)
+        # Aynı ad üzerine yazılıyorsa önceki içeriğin referansını bırak
+        await self.release(db, url)
+
+        # Referansı dosya işlemlerinden önce artır: SQLite yazma kilidi
+        # eşzamanlı release() çağrılarıyla sırayı garanti eder
+        extension = await db.scalar(
+            insert(models.StoredBlob)
+            .values(sha256=sha256, size=size, extension=destination.suffix.lower(), ref_count=1)
+            .on_conflict_do_update(
+                index_elements=["sha256"],
+                set_={"ref_count": models.StoredBlob.ref_count + 1}
+            )
+            .returning(models.StoredBlob.extension)
+        )
+        db.add(models.StoredFile(url=url, sha256=sha256))
+
+        blob_path = self.blob_path(sha256, extension)
+        deduplicated = blob_path.exists()
+        try:
+            if deduplicated:
+                temp_path.unlink(missing_ok=True)
+            else:
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp_path, blob_path)
+            link_or_copy(blob_path, destination)
+            await db.flush()
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            destination.unlink(missing_ok=True)
+            raise
+        on_rollback(db, lambda: destination.unlink(missing_ok=True))
+
+        self.stored += 1
+        if deduplicated:
+            self.deduplicated += 1
+            self.bytes_saved += size
+            logger.info(f"♻️ Aynı içerik zaten depoda, bağlantı oluşturuldu: {destination.name}")
+
+        return {"blob_url": self.blob_url(sha256, extension), "deduplicated": deduplicated}
+
+    def adoptable_path(self, file_url: Optional[str], subdir: str = "pdfs") -> Optional[Path]:
+        """
+        Depoya alınabilecek mantıksal dosyanın yolu (değilse None)
+
+        URL istemciden geldiği için yalnızca UPLOAD_DIR/subdir altındaki
+        gerçek dosyalar kabul edilir (../ ile dışarı çıkılamaz).
+        """
+        if not file_url or not file_url.startswith("/uploads/"):
+            return None
+        path = UPLOAD_DIR / file_url.replace("/uploads/", "", 1)
+        if ".." in path.parts or path.name.startswith("."):
+            return None
+        if path.resolve().parent != (UPLOAD_DIR / subdir).resolve():
+            return None
+        return path if path.is_file() else None
+
+    async def adopt(self, db, file_url: Optional[str]) -> bool:
+        """
+        Daha önce yüklenmiş mantıksal dosyayı çağıranın işleminde depoya al
+
+        Yükleme endpoint'leri dosyayı henüz bir kayda bağlı değilken diske
+        yazar; referans, URL'yi kaydeden handler'ın (ör. CV, yayın) işleminde
+        buradan açılır. Aynı içerikli blob varsa mantıksal dosya ona bağlanır
+        ve ayrı kopya diskten kalkar. İçerik aynı olduğundan işlem geri
+        alınırsa dosyanın geri konması gerekmez.
+
+        Args:
+            db: Async veritabanı oturumu (yalnızca flush edilir, commit çağırana aittir)
+            file_url: Kayda yazılan dosya URL'si
+
+        Returns:
+            bool: Dosya depoya yeni alındıysa True (zaten kayıtlı veya uygun değilse False)
+        """
+        path = self.adoptable_path(file_url)
+        if path is None:
+            return False
+        url = self.url_for(path)
+        if await db.scalar(select(models.StoredFile.sha256).where(models.StoredFile.url == url)) is not None:
+            return False
+
+        sha256 = await asyncio.to_thread(file_sha256, path)
+        size = path.stat().st_size
+        extension = await db.scalar(
+            insert(models.StoredBlob)
+            .values(sha256=sha256, size=size, extension=path.suffix.lower(), ref_count=1)
+            .on_conflict_do_update(
+                index_elements=["sha256"],
+                set_={"ref_count": models.StoredBlob.ref_count + 1}
+            )
+            .returning(models.StoredBlob.extension)
+        )
+        db.add(models.StoredFile(url=url, sha256=sha256))
+        await db.flush()
+
+        # add()'deki gibi yeni oluşan blob geri alınsa da diskte kalır
+        blob_path = self.blob_path(sha256, extension)
+        deduplicated = blob_path.exists()
+        if not deduplicated:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            link_or_copy(path, blob_path)
+        elif not os.path.samefile(blob_path, path):
+            link_or_copy(blob_path, path)
+
+        self.stored += 1
+        if deduplicated:
+            self.deduplicated += 1
+            self.bytes_saved += size
+            logger.info(f"♻️ Aynı içerik zaten depoda, bağlantı oluşturuldu: {path.name}")
+        return True
+
+    async def release(self, db, file_url: str) -> bool:
+        """
+        Mantıksal dosyanın blob referansını bırak
+
+        Referans sıfıra inerse blob kaydı silinir; dosyası işlem commit
+        edilince silinir (bkz. _discard_blob). Mantıksal dosyanın kendisini
+        silmek çağıranın (delete_file) işidir.
+
+        Returns:
+            bool: Dosya depoda kayıtlıysa True (eski yüklemeler için False)
+        """
+        sha256 = await db.scalar(
+            delete(models.StoredFile)
+            .where(models.StoredFile.url == file_url)
+            .returning(models.StoredFile.sha256)
+        )
+        if sha256 is None:
+            return False
+
+        row = (await db.execute(
+            update(models.StoredBlob)
+            .where(models.StoredBlob.sha256 == sha256)
+            .values(ref_count=models.StoredBlob.ref_count - 1)
+            .returning(models.StoredBlob.ref_count, models.StoredBlob.extension)
+        )).first()
+        self.released += 1
+
+        if row is not None and row.ref_count <= 0:
+            await db.execute(delete(models.StoredBlob).where(models.StoredBlob.sha256 == sha256))
+            self._discard_blob(db, sha256, row.extension)
+        return True
+
+    async def release_many(self, db, urls) -> int:
+        """
+        release()'in küme tabanlı hali: birçok mantıksal dosyanın referansını bırak
+
+        Referans sayıları birkaç UPDATE ile düşürülür, sıfıra inen blob'lar
+        tek DELETE ile silinir; dosyaları release()'teki gibi commit sonrası
+        silinir. Mantıksal dosyaları silmek çağıranın işidir.
+
+        Args:
+            db: Async veritabanı oturumu (çağıranın işleminde çalışır)
+            urls: URL listesi veya URL seçen alt sorgu
+
+        Returns:
+            int: Depoda kayıtlı olup bırakılan dosya sayısı
+        """
+        released = (await db.scalars(
+            delete(models.StoredFile)
+            .where(models.StoredFile.url.in_(urls))
+            .returning(models.StoredFile.sha256)
+        )).all()
+        if not released:
+            return 0
+
+        # Aynı blob'a birden fazla bağlantı bırakılabilir; aynı miktarda düşenler tek sorguda
+        by_count = {}
+        for sha256, count in Counter(released).items():
+            by_count.setdefault(count, []).append(sha256)
+        for count, hashes in by_count.items():
+            await db.execute(
+                update(models.StoredBlob)
+                .where(models.StoredBlob.sha256.in_(hashes))
+                .values(ref_count=models.StoredBlob.ref_count - count)
+            )
+
+        removed = (await db.execute(
+            delete(models.StoredBlob)
+            .where(models.StoredBlob.sha256.in_(set(released)), models.StoredBlob.ref_count <= 0)
+            .returning(models.StoredBlob.sha256, models.StoredBlob.extension)
+        )).all()
+        for sha256, extension in removed:
+            self._discard_blob(db, sha256, extension)
+
+        self.released += len(released)
+        return len(released)
+
+    def _discard_blob(self, db, sha256: str, extension: str) -> None:
+        """
+        Referansı biten blob dosyasını işlem sonucuna göre sil veya geri koy
+
+        Dosya, yazma kilidi tutulurken benzersiz bir ada taşınır. Commit'ten
+        sonra aynı içeriği yükleyen add() blob'u bulamaz ve yenisini yazar;
+        silinmek üzere olan dosyaya bağlanmaz. Commit edilince taşınan dosya
+        silinir, geri alınırsa eski adına geri konur.
+        """
+        blob_path = self.blob_path(sha256, extension)
+        discarded = blob_path.with_name(f".{blob_path.name}.{uuid.uuid4().hex}.deleted")
+        try:
+            os.replace(blob_path, discarded)
+        except FileNotFoundError:
+            return
+
+        def remove():
+            discarded.unlink(missing_ok=True)
+            self.blobs_removed += 1
+
+        on_commit(db, remove)
+        on_rollback(db, lambda: os.replace(discarded, blob_path))
+
+    def stats(self) -> dict:
+        return {
+            "stored": self.stored,
+            "deduplicated": self.deduplicated,
+            "bytes_saved": self.bytes_saved,
+            "released": self.released,
+            "blobs_removed": self.blobs_removed,
+        }
+
+
+# Uygulama genelinde kullanılan depo
+content_store = ContentStore()
+
+
+# ==================== MEVCUT DOSYALARIN KAYDI ====================
+
+def register_existing_files(connection, subdir: str = "pdfs") -> dict:
+    """
+    Depo öncesi yüklenmiş dosyaları blob'lara bağla (göç sırasında çalışır)
+
+    Aynı içerikli kopyalar tek blob'a bağlanarak diskte yer açılır. Zaten
+    kayıtlı dosyalar atlanır; tekrar çalıştırmak güvenlidir.
+
+    Args:
+        connection: Senkron veritabanı bağlantısı
+        subdir: UPLOAD_DIR altındaki dizin
+
+    Returns:
+        dict: registered (kaydedilen dosya) ve deduplicated (bağlanan kopya) sayıları
+    """
+    registered = set(connection.execute(select(models.StoredFile.url)).scalars())
+    blobs = dict(connection.execute(select(models.StoredBlob.sha256, models.StoredBlob.extension)).all())
+    counts = {"registered": 0, "deduplicated": 0}
+
+    for path in sorted((UPLOAD_DIR / subdir).glob("*")):
+        if not path.is_file() or path.name.startswith("."):
+            continue
+        url = content_store.url_for(path)
+        if url in registered:
+            continue
+
+        sha256 = file_sha256(path)
+        if sha256 in blobs:
+            blob_path = content_store.blob_path(sha256, blobs[sha256])
+            if not blob_path.exists():
+                link_or_copy(path, blob_path)
+            elif not os.path.samefile(blob_path, path):
+                link_or_copy(blob_path, path)
+                counts["deduplicated"] += 1
+            connection.execute(
+                update(models.StoredBlob)
+                .where(models.StoredBlob.sha256 == sha256)
+                .values(ref_count=models.StoredBlob.ref_count + 1)
+            )
+        else:
+            extension = path.suffix.lower()
+            blob_path = content_store.blob_path(sha256, extension)
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            link_or_copy(path, blob_path)
+            connection.execute(models.StoredBlob.__table__.insert().values(
+                sha256=sha256, size=path.stat().st_size, extension=extension, ref_count=1
+            ))
+            blobs[sha256] = extension
+
+        connection.execute(models.StoredFile.__table__.insert().values(url=url, sha256=sha256))
+        counts["registered"] += 1
+
+    return counts
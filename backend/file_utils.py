@@ -7,12 +7,16 @@ küçük resimlerin oluşturulması ve silinmesi işlemlerini yönetir.
 
 from fastapi import UploadFile, HTTPException
 from pathlib import Path
-from PIL import Image
+from PIL import Image, features
 import os
-import shutil
 import re
 from datetime import datetime
 from typing import Optional
+import hashlib
+import io
+import uuid
+
+from compression import remove_precompressed
 
 
 # ==================== DOSYA YÜKLEME YAPILANDIRMASI ====================
@@ -24,6 +28,31 @@ UPLOAD_DIR = Path("/home/s/Yazılımlar/ibca.com/backend/uploads")
 MAX_IMAGE_SIZE = 1024 * 1024  # 1MB
 MAX_PDF_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Yüklemeler diske bu boyutta parçalar halinde kopyalanır (bellek kullanımı sabit kalır)
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB
+
+# JPEG kalite arama aralığı (optimize_image)
+JPEG_MAX_QUALITY = 85
+JPEG_MIN_QUALITY = 20
+
+# Duyarlı (responsive) görsel varyantlarının genişlikleri (piksel)
+IMAGE_VARIANT_WIDTHS = tuple(
+    int(width) for width in os.environ.get("IMAGE_VARIANT_WIDTHS", "480,960,1440,1920").split(",")
+)
+
+# Varyant formatları: (format, MIME tipi, uzantı, kaydetme ayarları)
+# WebP ve AVIF yalnızca Pillow bu formatları destekliyorsa üretilir
+IMAGE_VARIANT_FORMATS = [
+    ("jpeg", "image/jpeg", "jpg", {"quality": 80, "optimize": True}),
+]
+if features.check("webp"):
+    IMAGE_VARIANT_FORMATS.append(("webp", "image/webp", "webp", {"quality": 80, "method": 4}))
+if features.check("avif"):
+    IMAGE_VARIANT_FORMATS.append(("avif", "image/avif", "avif", {"quality": 60}))
+
+# İçerik adresli depoya (file_store) alınan dosya tipleri
+CONTENT_ADDRESSED_TYPES = {"pdf"}
+
 # İzin verilen dosya tipleri
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/webp"}
 ALLOWED_PDF_TYPES = {"application/pdf"}
@@ -32,12 +61,64 @@ ALLOWED_PDF_TYPES = {"application/pdf"}
 (UPLOAD_DIR / "images").mkdir(parents=True, exist_ok=True)
 (UPLOAD_DIR / "thumbnails").mkdir(parents=True, exist_ok=True)
 (UPLOAD_DIR / "pdfs").mkdir(parents=True, exist_ok=True)
+(UPLOAD_DIR / "variants").mkdir(parents=True, exist_ok=True)
 
 
 
 # ==================== GÖRSEL OPTİMİZASYONU ====================
 
-def optimize_image(image_path: Path, max_size: int = MAX_IMAGE_SIZE) -> None:
+def encode_jpeg_to_size(
+    img: Image.Image,
+    max_size: int,
+    max_quality: int = JPEG_MAX_QUALITY,
+    min_quality: int = JPEG_MIN_QUALITY
+) -> tuple:
+    """
+    Görseli boyut sınırına sığan en yüksek kalitede JPEG olarak kodla
+    Kodlama bellekte yapılır ve kalite ikili arama (binary search) ile bulunur.
+    
+    Args:
+        img: Kodlanacak (RGB) görsel
+        max_size: Hedef maksimum boyut (byte)
+        max_quality: Denenecek en yüksek kalite
+        min_quality: İnilebilecek en düşük kalite
+        
+    Returns:
+        tuple: (JPEG baytları, seçilen kalite, kodlama sayısı)
+        Hiçbir kalite sığmazsa min_quality ile kodlanmış sonuç döner.
+    """
+    passes = 0
+    
+    def encode(quality: int) -> bytes:
+        nonlocal passes
+        passes += 1
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=quality, optimize=True)
+        return buffer.getvalue()
+    
+    # Çoğu görsel en yüksek kalitede zaten sığar: tek kodlama
+    data = encode(max_quality)
+    if len(data) <= max_size:
+        return data, max_quality, passes
+    
+    # Hiçbir kalite sığmazsa denenen en düşük kaliteli sonuç kullanılır
+    best, smallest = None, (data, max_quality)
+    low, high = min_quality, max_quality - 1
+    while low <= high:
+        quality = (low + high) // 2
+        candidate = encode(quality)
+        if len(candidate) <= max_size:
+            best = (candidate, quality)
+            low = quality + 1
+        else:
+            smallest = min(smallest, (candidate, quality), key=lambda item: item[1])
+            high = quality - 1
+    
+    data, quality = best or smallest
+    return data, quality, passes
+
+
+def optimize_image(image_path: Path, max_size: int = MAX_IMAGE_SIZE) -> dict:
     """
     Görseli optimize et (boyut küçültme ve kalite ayarlama)
     Orantılı küçültme yapılır, kırpma olmaz.
@@ -46,6 +127,9 @@ def optimize_image(image_path: Path, max_size: int = MAX_IMAGE_SIZE) -> None:
         image_path: Görsel dosyasının yolu
         max_size: Maksimum dosya boyutu (byte)
         
+    Returns:
+        dict: Seçilen JPEG kalitesi (quality), kodlama sayısı (passes) ve boyut (size)
+        
     Raises:
         Exception: Görsel işlenirken hata oluşursa
     """
@@ -76,15 +160,19 @@ def optimize_image(image_path: Path, max_size: int = MAX_IMAGE_SIZE) -> None:
                 img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
                 print(f"Görsel boyutlandırıldı: {original_width}x{original_height} → {img.width}x{img.height}")
             
-            # Optimize ederek kaydet (JPEG formatında)
-            img.save(image_path, 'JPEG', quality=85, optimize=True)
-            
-            # Dosya boyutu hala büyükse kaliteyi kademeli olarak düşür
-            quality = 85
-            while image_path.stat().st_size > max_size and quality > 20:
-                quality -= 10
-                img.save(image_path, 'JPEG', quality=quality, optimize=True)
-                print(f"Kalite azaltıldı: {quality}")
+            # Boyut sınırına sığan en yüksek kaliteyi bellekte bul (JPEG formatında)
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            data, quality, passes = encode_jpeg_to_size(img, max_size)
+            print(f"JPEG kalitesi: {quality} ({passes} kodlama, {len(data)} byte)")
+        
+        # Sonucu diske tek seferde yaz; orijinal dosya sunulmaya devam ederken
+        # yarım yazılmış hali görünmesin diye geçici dosya üzerinden taşı
+        temp_path = temp_path_for(image_path)
+        temp_path.write_bytes(data)
+        os.replace(temp_path, image_path)
+        
+        return {"quality": quality, "passes": passes, "size": len(data)}
                 
     except Exception as e:
         print(f"Görsel optimize edilirken hata: {e}")
@@ -112,8 +200,10 @@ def create_thumbnail(image_path: Path, thumbnail_path: Path, size: tuple = (300,
             # thumbnail metodu orantılı küçültme yapar (en-boy oranını korur)
             img.thumbnail(size, Image.Resampling.LANCZOS)
             
-            # JPEG olarak kaydet
-            img.save(thumbnail_path, 'JPEG', quality=80, optimize=True)
+            # JPEG olarak kaydet (geçici dosya üzerinden)
+            temp_path = temp_path_for(thumbnail_path)
+            img.save(temp_path, 'JPEG', quality=80, optimize=True)
+            os.replace(temp_path, thumbnail_path)
             
             print(f"Thumbnail oluşturuldu: {original_size} → {img.size}")
             
@@ -122,6 +212,150 @@ def create_thumbnail(image_path: Path, thumbnail_path: Path, size: tuple = (300,
         raise
 
 
+def thumbnail_url_for(image_url: str) -> Optional[str]:
+    """
+    Yüklenen görselin küçük resmi oluşturulduysa URL'sini döndür
+    
+    Args:
+        image_url: /uploads/images/... biçiminde görsel URL'si
+        
+    Returns:
+        str: Küçük resim URL'si veya henüz yoksa None
+    """
+    if not image_url or not image_url.startswith("/uploads/images/"):
+        return None
+    thumbnail_filename = f"thumb_{Path(image_url).name}"
+    if (UPLOAD_DIR / "thumbnails" / thumbnail_filename).exists():
+        return f"/uploads/thumbnails/{thumbnail_filename}"
+    return None
+
+
+def create_variants(image_path: Path) -> list:
+    """
+    Görselin genişlik varyantlarını desteklenen her formatta oluştur
+    Görselden geniş varyant üretilmez; en büyük varyant görselin kendi genişliğidir.
+    
+    Args:
+        image_path: Optimize edilmiş görselin yolu
+        
+    Returns:
+        list: Her varyant için width, height, format, mime_type, url ve size bilgileri
+    """
+    variants = []
+    with Image.open(image_path) as img:
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        
+        widths = sorted({width for width in IMAGE_VARIANT_WIDTHS if width < img.width} | {
+            min(img.width, max(IMAGE_VARIANT_WIDTHS))
+        })
+        
+        for width in widths:
+            height = max(1, round(img.height * width / img.width))
+            resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+            
+            for image_format, mime_type, extension, options in IMAGE_VARIANT_FORMATS:
+                variant_filename = f"{image_path.stem}_w{width}.{extension}"
+                variant_path = UPLOAD_DIR / "variants" / variant_filename
+                temp_path = temp_path_for(variant_path)
+                resized.save(temp_path, image_format.upper(), **options)
+                os.replace(temp_path, variant_path)
+                
+                variants.append({
+                    "width": width,
+                    "height": height,
+                    "format": image_format,
+                    "mime_type": mime_type,
+                    "url": f"/uploads/variants/{variant_filename}",
+                    "size": variant_path.stat().st_size
+                })
+    
+    print(f"Görsel varyantları oluşturuldu: {image_path.name} → {len(variants)} dosya")
+    return variants
+
+
+def accepted_media_types(accept: Optional[str]) -> set:
+    """Accept başlığındaki kabul edilen (q > 0) MIME tiplerini döndür"""
+    accepted = set()
+    for part in (accept or "").split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            accepted.add(media_type.lower())
+    return accepted
+
+
+def negotiate_variant(variants: list, accept: Optional[str], width: Optional[int] = None):
+    """
+    Accept başlığı ve istenen genişliğe göre en uygun varyantı seç
+    
+    Format tercihi AVIF > WebP > JPEG'dir; AVIF ve WebP yalnızca Accept'te açıkça
+    geçiyorsa seçilir. Genişlik için istenen değere eşit veya büyük en küçük
+    varyant, yoksa en büyüğü seçilir.
+    
+    Args:
+        variants: ImageVariant kayıtları
+        accept: İsteğin Accept başlığı
+        width: İstenen genişlik (w parametresi)
+        
+    Returns:
+        ImageVariant: Seçilen varyant veya uygun varyant yoksa None
+    """
+    accepted = accepted_media_types(accept)
+    
+    for image_format, mime_type, _, _ in reversed(IMAGE_VARIANT_FORMATS):
+        if image_format != "jpeg" and mime_type not in accepted:
+            continue
+        candidates = sorted(
+            (variant for variant in variants if variant.format == image_format),
+            key=lambda variant: variant.width
+        )
+        if not candidates:
+            continue
+        if width:
+            for variant in candidates:
+                if variant.width >= width:
+                    return variant
+        return candidates[-1]
+    
+    return None
+
+
+def process_image(image_path: str) -> dict:
+    """
+    Görseli optimize et ve küçük resmini oluştur
+    Süreç havuzunda (jobs.get_process_pool) arka plan işi olarak çalıştırılır.
+    
+    Args:
+        image_path: uploads/images altındaki görselin yolu
+        
+    Returns:
+        dict: url, thumbnail_url, optimized_size, quality, encode_passes ve variants bilgileri
+    """
+    image_path = Path(image_path)
+    encoding = optimize_image(image_path)
+    
+    thumbnail_filename = f"thumb_{image_path.name}"
+    create_thumbnail(image_path, UPLOAD_DIR / "thumbnails" / thumbnail_filename)
+    variants = create_variants(image_path)
+    
+    return {
+        "url": f"/uploads/images/{image_path.name}",
+        "thumbnail_url": f"/uploads/thumbnails/{thumbnail_filename}",
+        "optimized_size": encoding["size"],
+        "quality": encoding["quality"],
+        "encode_passes": encoding["passes"],
+        "variants": variants
+    }
+
+
 
 # ==================== DOSYA YÜKLEME ====================
 
@@ -161,20 +395,92 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
-async def save_upload_file(file: UploadFile, file_type: str = "image") -> dict:
+def temp_path_for(path: Path) -> Path:
+    """
+    Hedefle aynı klasörde, her çağrıda benzersiz gizli geçici dosya yolu
+    Aynı hedefe eşzamanlı yazan istekler birbirinin geçici dosyasını ezmez.
+    """
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+
+
+async def stream_to_file(
+    file: UploadFile,
+    destination: Path,
+    max_size: Optional[int] = None,
+    too_large_detail: Optional[str] = None,
+    keep_temp: bool = False
+) -> dict:
+    """
+    Yüklenen dosyayı parça parça geçici dosyaya kopyala, sonra hedefe taşı
+    Boyut sınırı aşıldığı anda kopyalama durur; SHA-256 aynı geçişte hesaplanır.
+    Geçici dosya hedefle aynı klasörde tutulur, böylece taşıma atomiktir ve
+    yarım kalmış yüklemeler hiçbir zaman hedef adla görünmez.
+    
+    Args:
+        file: Yüklenen dosya
+        destination: Kaydedilecek dosya yolu
+        max_size: Maksimum dosya boyutu (byte), None ise sınırsız
+        too_large_detail: Sınır aşıldığında dönecek hata mesajı
+        keep_temp: True ise hedefe taşınmaz; geçici dosya çağırana bırakılır
+        
+    Returns:
+        dict: size, sha256 ve temp_path bilgileri
+        
+    Raises:
+        HTTPException: Boyut sınırı aşılırsa (400) veya yazma hatasında (500)
+    """
+    temp_path = temp_path_for(destination)
+    checksum = hashlib.sha256()
+    size = 0
+    
+    try:
+        with temp_path.open("wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=too_large_detail or f"Dosya çok büyük. Maksimum boyut: {max_size / (1024*1024)}MB"
+                    )
+                checksum.update(chunk)
+                buffer.write(chunk)
+        if not keep_temp:
+            os.replace(temp_path, destination)
+    except HTTPException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    except Exception as e:
+        temp_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=500, detail=f"Dosya kaydedilirken hata: {str(e)}")
+    
+    return {"size": size, "sha256": checksum.hexdigest(), "temp_path": temp_path}
+
+
+async def save_upload_file(
+    file: UploadFile,
+    file_type: str = "image",
+    max_size: Optional[int] = None,
+    too_large_detail: Optional[str] = None,
+    db=None
+) -> dict:
     """
     Yüklenen dosyayı kaydet ve dosya bilgilerini döndür
-    Dosya adı korunur, sadece tarih/saat eklenir: ornek_dosya_14225801012025.pdf
+    Dosya adı korunur; tarih/saat ve rastgele bir ek eklenir: ornek_dosya_14225801012025_a7b3c9d2.pdf
     
     Args:
         file: Yüklenen dosya
         file_type: Dosya tipi ("image" veya "pdf")
+        max_size: Maksimum dosya boyutu (byte); PDF için varsayılan MAX_PDF_SIZE
+        too_large_detail: Boyut sınırı aşıldığında dönecek hata mesajı
+        db: Verilirse PDF'ler içerik adresli depoya (file_store) kaydedilir;
+            aynı içerik daha önce yüklendiyse diskte yeni kopya oluşmaz
         
     Returns:
-        dict: Dosya bilgileri (filename, url, size, vb.)
+        dict: Dosya bilgileri (filename, url, size, sha256, vb.)
+        Depoya kaydedildiyse blob_url ve deduplicated da döner
         
     Raises:
-        HTTPException: Dosya tipi geçersizse veya kayıt sırasında hata oluşursa
+        HTTPException: Dosya tipi geçersizse, çok büyükse veya kayıt sırasında hata oluşursa
     """
     # Dosya tipini doğrula
     if file_type == "image":
@@ -192,6 +498,9 @@ async def save_upload_file(file: UploadFile, file_type: str = "image") -> dict:
                 detail="Geçersiz dosya tipi. Sadece PDF dosyalarına izin verilir"
             )
         upload_subdir = "pdfs"
+        if max_size is None:
+            max_size = MAX_PDF_SIZE
+            too_large_detail = too_large_detail or f"PDF dosyası çok büyük. Maksimum boyut: {MAX_PDF_SIZE / (1024*1024)}MB"
         
     else:
         raise HTTPException(status_code=400, detail="Geçersiz dosya tipi")
@@ -206,82 +515,89 @@ async def save_upload_file(file: UploadFile, file_type: str = "image") -> dict:
     # Örnek: 14:22:58 01/01/2025 -> 14225801012025
     timestamp = datetime.now().strftime("%H%M%S%d%m%Y")
     
-    # Yeni dosya adı: orjinal_ad_tarihsaat.uzanti
-    unique_filename = f"{file_stem}_{timestamp}{file_extension}"
+    # Yeni dosya adı: orjinal_ad_tarihsaat_rastgele.uzanti
+    # Zaman damgası saniye çözünürlüğündedir; aynı saniyede aynı adla gelen
+    # yüklemeler birbirinin üzerine yazmasın diye rastgele ek eklenir
+    unique_filename = f"{file_stem}_{timestamp}_{uuid.uuid4().hex[:8]}{file_extension}"
     file_path = UPLOAD_DIR / upload_subdir / unique_filename
     
-    # Dosyayı kaydet
-    try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Dosya kaydedilirken hata: {str(e)}")
+    # Görseller arka planda yerinde optimize edildiği için (bağlantı koparır)
+    # yalnızca değişmeyen dosyalar içerik adresli depoya alınır
+    content_addressed = db is not None and file_type in CONTENT_ADDRESSED_TYPES
+    
+    # Dosyayı parça parça kaydet (boyut sınırı kopyalama sırasında uygulanır)
+    stored = await stream_to_file(file, file_path, max_size, too_large_detail, keep_temp=content_addressed)
     
     # Sonuç bilgilerini hazırla
     result = {
         "filename": unique_filename,
         "url": f"/uploads/{upload_subdir}/{unique_filename}",
-        "size": file_path.stat().st_size
+        "size": stored["size"],
+        "sha256": stored["sha256"]
     }
     
-    # Görsel ise optimize et
-    if file_type == "image":
+    if content_addressed:
+        from file_store import content_store
         try:
-            optimize_image(file_path)
-            
-            # Küçük resim oluştur
-            thumbnail_filename = f"thumb_{unique_filename}"
-            thumbnail_path = UPLOAD_DIR / "thumbnails" / thumbnail_filename
-            create_thumbnail(file_path, thumbnail_path)
-            
-            result["thumbnail_url"] = f"/uploads/thumbnails/{thumbnail_filename}"
-            result["optimized_size"] = file_path.stat().st_size
-            
+            result.update(await content_store.add(
+                db, stored["temp_path"], file_path, stored["sha256"], stored["size"]
+            ))
         except Exception as e:
-            print(f"Uyarı: Görsel optimize edilemedi: {e}")
-    
-    # PDF ise boyut kontrolü yap
-    elif file_type == "pdf":
-        if file_path.stat().st_size > MAX_PDF_SIZE:
-            file_path.unlink()  # Dosyayı sil
-            raise HTTPException(
-                status_code=400,
-                detail=f"PDF dosyası çok büyük. Maksimum boyut: {MAX_PDF_SIZE / (1024*1024)}MB"
-            )
+            raise HTTPException(status_code=500, detail=f"Dosya kaydedilirken hata: {str(e)}")
     
+    # Görseller burada işlenmez; optimizasyon ve küçük resim process_image ile
+    # arka plan işi olarak yapılır (bkz. server.start_image_processing)
     return result
 
 
 # ==================== DOSYA SİLME ====================
 
-def delete_file(file_url: str) -> bool:
+def _remove_upload(file_url: str, file_path: Path) -> bool:
+    """Yüklenen dosyayı, sıkıştırılmış kopyalarını ve görsel türevlerini diskten sil"""
+    remove_precompressed(file_path)
+    if not file_path.exists():
+        return False
+    file_path.unlink()
+    
+    # Küçük resim ve varyantlar varsa onları da sil
+    if "images/" in file_url:
+        filename = file_path.name
+        thumbnail_path = UPLOAD_DIR / "thumbnails" / f"thumb_{filename}"
+        if thumbnail_path.exists():
+            thumbnail_path.unlink()
+        for variant_path in (UPLOAD_DIR / "variants").glob(f"{file_path.stem}_w*"):
+            variant_path.unlink(missing_ok=True)
+    return True
+
+
+async def delete_file(file_url: str, db=None) -> bool:
     """
     Dosyayı sistemden sil
+    İçerik adresli depodaki dosyalarda blob'un referansı bırakılır; blob
+    yalnızca son referans silindiğinde kaldırılır (bkz. file_store).
+    db verilirse dosya, çağıranın işlemi commit edilince silinir; işlem geri
+    alınırsa kayıt da dosyası da yerinde kalır.
     
     Args:
         file_url: Silinecek dosyanın URL'si
+        db: Async veritabanı oturumu (referans çağıranın işleminde bırakılır)
         
     Returns:
-        bool: Başarılıysa True
+        bool: Dosya bulunduysa (db verilmişse silinmek üzere işaretlendiyse) True
     """
     try:
         if file_url.startswith("/uploads/"):
             file_path = UPLOAD_DIR / file_url.replace("/uploads/", "")
             
-            # Dosyayı sil
-            if file_path.exists():
-                file_path.unlink()
-                
-                # Küçük resim varsa onu da sil
-                if "images/" in file_url:
-                    filename = file_path.name
-                    thumbnail_path = UPLOAD_DIR / "thumbnails" / f"thumb_{filename}"
-                    if thumbnail_path.exists():
-                        thumbnail_path.unlink()
-                        
-                return True
+            if db is None:
+                return _remove_upload(file_url, file_path)
+            
+            from file_store import content_store, on_commit
+            await content_store.release(db, file_url)
+            on_commit(db, lambda: _remove_upload(file_url, file_path))
+            return file_path.exists()
                 
     except Exception as e:
         print(f"Dosya silinirken hata: {e}")
         
-    return False
\ No newline at end of file
+    return False
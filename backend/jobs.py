@@ -0,0 +1,129 @@
+"""
+Arka Plan İşleri (Background Jobs)
+
+Bu modül, uzun süren işlemleri (toplu öğrenci kaydı gibi) istek döngüsünün
+dışında çalıştırmak için süreç içi bir iş kaydı ve CPU yoğun adımlar için
+paylaşılan bir süreç havuzu (ProcessPoolExecutor) sağlar. Endpoint işi başlatır
+ve hemen iş ID'si döner; ilerleme GET /api/jobs/{job_id} ile izlenir.
+
+İş kaydı bellektedir: sunucu yeniden başlarsa tamamlanmamış işler kaybolur.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+import asyncio
+import logging
+import os
+import uuid
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== YAPILANDIRMA ====================
+
+# CPU yoğun işler (şifre hashleme vb.) için süreç sayısı
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", str(os.cpu_count() or 2)))
+
+# Bellekte tutulacak en fazla tamamlanmış iş sayısı
+JOB_HISTORY_LIMIT = int(os.environ.get("JOB_HISTORY_LIMIT", "100"))
+
+
+# ==================== SÜREÇ HAVUZU ====================
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Paylaşılan süreç havuzunu döndür (ilk kullanımda oluşturulur)"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=JOB_WORKERS)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Süreç havuzunu kapat (uygulama kapanışında)"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+# ==================== İŞ KAYDI ====================
+
+@dataclass
+class Job:
+    """Tek bir arka plan işinin durumu ve ilerlemesi"""
+    id: str
+    kind: str
+    total: int = 0
+    done: int = 0
+    status: str = "pending"  # pending, running, completed, failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def advance(self, count: int = 1) -> None:
+        """İlerlemeyi artır"""
+        self.done = min(self.done + count, self.total) if self.total else self.done + count
+
+
+class JobRegistry:
+    """
+    Süreç içi iş kaydı
+
+    start() verilen coroutine'i bir asyncio görevi olarak çalıştırır; dönüş
+    değeri işin sonucu olur, istisna fırlatırsa iş "failed" olarak işaretlenir.
+    """
+
+    def __init__(self, history_limit: int = JOB_HISTORY_LIMIT):
+        self.history_limit = history_limit
+        self._jobs = {}
+        self._tasks = set()
+
+    def create(self, kind: str, total: int = 0) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, total=total)
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def start(self, job: Job, coro) -> Job:
+        """İşi arka planda çalıştırmaya başla"""
+        task = asyncio.create_task(self._run(job, coro))
+        # Görev referansını tut; aksi halde çöp toplayıcı görevi silebilir
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, coro) -> None:
+        job.status = "running"
+        try:
+            job.result = await coro
+            job.status = "completed"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"❌ Arka plan işi başarısız ({job.kind} {job.id}): {str(e)}")
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _prune(self) -> None:
+        """En eski tamamlanmış işleri sınırın üzerindeyse sil"""
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job.id]
+
+
+# Uygulama genelinde kullanılan iş kaydı
+jobs = JobRegistry()
@@ -0,0 +1,292 @@
+"""
+Veritabanı Şema Göçleri (Migration)
+
+Bu modül, mevcut veritabanlarına sürümlü şema değişikliklerini uygular.
+create_all yalnızca eksik tabloları oluşturur; var olan tablolara yeni indeks
+veya kolon eklemez. Bu yüzden yeni şema değişiklikleri buraya sıralı bir göç
+olarak eklenir ve uygulama başlangıcında henüz uygulanmamış olanlar çalıştırılır.
+
+Yeni göç eklemek için:
+    1. Bağlantı (Connection) alan bir fonksiyon yaz
+    2. MIGRATIONS listesinin sonuna (sürüm, açıklama, fonksiyon) olarak ekle
+Göçler idempotent yazılmalıdır (ör. checkfirst=True), çünkü yeni veritabanlarında
+create_all aynı nesneleri zaten oluşturmuş olabilir.
+
+SQLite'ta her göç sürücü düzeyinde açık BEGIN ... COMMIT içinde çalışır.
+pysqlite'ın varsayılan (legacy) işlem yönetimi BEGIN'i yalnızca DML'den önce
+gönderir; CREATE / ALTER / DROP ifadeleri işlem dışında kalıp hata anında geri
+alınmaz. Bağlantı AUTOCOMMIT'e alınıp BEGIN elle gönderildiğinde SQLite DDL'i
+de işleme katar ve yarım kalan göç tamamen geri alınır.
+"""
+
+from contextlib import contextmanager
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.schema import CreateColumn
+from datetime import datetime
+
+
+# ==================== SÜRÜM TABLOSU ====================
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+
+# ==================== YARDIMCI FONKSİYONLAR ====================
+
+def _create_indexes(connection, model, *index_names):
+    """
+    Modelde tanımlı indeksleri (yoksa) oluştur
+
+    Args:
+        connection: Veritabanı bağlantısı
+        model: İndeksleri __table_args__ içinde tanımlı model sınıfı
+        index_names: Oluşturulacak indeks adları
+    """
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in index_names:
+        indexes[name].create(bind=connection, checkfirst=True)
+
+
+def _add_columns(connection, model, *column_names):
+    """
+    Modelde tanımlı kolonları (yoksa) ALTER TABLE ile ekle
+
+    Args:
+        connection: Veritabanı bağlantısı
+        model: Kolonları tanımlı model sınıfı
+        column_names: Eklenecek kolon adları (NOT NULL ise server_default olmalı)
+    """
+    table = model.__table__
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    for name in column_names:
+        if name in existing:
+            continue
+        column_ddl = CreateColumn(table.c[name]).compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+
+
+# ==================== GÖÇLER ====================
+
+def _add_list_query_indexes(connection):
+    """Liste endpoint'lerinin filtre + sıralama kolonları için bileşik indeksler"""
+    import models
+
+    _create_indexes(connection, models.Announcement, "ix_announcements_published_created")
+    _create_indexes(connection, models.Course, "ix_courses_active_code")
+    _create_indexes(connection, models.Publication, "ix_publications_published_year")
+    _create_indexes(connection, models.GalleryItem, "ix_gallery_items_published_order_created")
+    _create_indexes(connection, models.Homework, "ix_homeworks_student_assignment")
+    _create_indexes(connection, models.Student, "ix_students_semester_academic_year")
+
+
+# Basit sayaçlar: tablo adı -> analytics kolonu
+ANALYTICS_COUNTERS = {
+    "announcements": "total_announcements",
+    "courses": "total_courses",
+    "publications": "total_publications",
+    "gallery_items": "total_gallery_items",
+}
+
+
+def backfill_analytics(connection):
+    """
+    Tek analytics satırının toplamlarını tablolardan (yeniden) hesapla
+
+    Satır yoksa oluşturulur, birden fazla varsa yalnızca ilki tutulur.
+    Tetikleyiciler kurulmadan önce veya sayaçlar bozulduğunda çalıştırılır.
+    """
+    import models
+
+    row_id = connection.scalar(select(func.min(models.Analytics.id)))
+    if row_id is None:
+        connection.execute(models.Analytics.__table__.insert().values(page_views=0, unique_visitors=0))
+        row_id = connection.scalar(select(func.min(models.Analytics.id)))
+    connection.execute(models.Analytics.__table__.delete().where(models.Analytics.id != row_id))
+
+    totals = {
+        column: select(func.count()).select_from(models.Base.metadata.tables[table]).scalar_subquery()
+        for table, column in ANALYTICS_COUNTERS.items()
+    }
+    totals["total_students"] = select(func.count()).select_from(models.Student).scalar_subquery()
+    totals["active_students"] = (
+        select(func.count()).select_from(models.Student)
+        .where(models.Student.is_active == True)
+        .scalar_subquery()
+    )
+    connection.execute(
+        models.Analytics.__table__.update()
+        .where(models.Analytics.id == row_id)
+        .values(**totals, last_updated=datetime.utcnow())
+    )
+
+
+def _analytics_trigger(name, event, table, assignments):
+    """analytics satırını güncelleyen bir SQLite tetikleyicisi (aynı işlemde çalışır)"""
+    return text(f"""
+        CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}
+        BEGIN
+            UPDATE analytics SET {assignments}, last_updated = CURRENT_TIMESTAMP;
+        END
+    """)
+
+
+def _add_analytics_triggers(connection):
+    """Site istatistiklerini ekleme/silme ile aynı işlemde güncelleyen tetikleyiciler"""
+    for table, column in ANALYTICS_COUNTERS.items():
+        connection.execute(_analytics_trigger(
+            f"trg_analytics_{table}_insert", "INSERT", table, f"{column} = {column} + 1"
+        ))
+        connection.execute(_analytics_trigger(
+            f"trg_analytics_{table}_delete", "DELETE", table, f"{column} = {column} - 1"
+        ))
+
+    connection.execute(_analytics_trigger(
+        "trg_analytics_students_insert", "INSERT", "students",
+        "total_students = total_students + 1, "
+        "active_students = active_students + (COALESCE(NEW.is_active, 0) = 1)"
+    ))
+    connection.execute(_analytics_trigger(
+        "trg_analytics_students_delete", "DELETE", "students",
+        "total_students = total_students - 1, "
+        "active_students = active_students - (COALESCE(OLD.is_active, 0) = 1)"
+    ))
+    connection.execute(_analytics_trigger(
+        "trg_analytics_students_active", "UPDATE OF is_active", "students",
+        "active_students = active_students"
+        " + (COALESCE(NEW.is_active, 0) = 1) - (COALESCE(OLD.is_active, 0) = 1)"
+    ))
+
+    backfill_analytics(connection)
+
+
+def _add_user_token_version(connection):
+    """Token iptali için users.token_version kolonu"""
+    import models
+
+    _add_columns(connection, models.User, "token_version")
+
+
+def _add_homework_checksum(connection):
+    """Yüklenen ödev dosyasının özeti için homeworks.file_sha256 kolonu"""
+    import models
+
+    _add_columns(connection, models.Homework, "file_sha256")
+
+
+def _register_stored_files(connection):
+    """Mevcut PDF yüklemelerini içerik adresli depoya kaydet (aynı içerikler tek blob'a bağlanır)"""
+    from file_store import register_existing_files
+
+    counts = register_existing_files(connection, "pdfs")
+    print(f"   {counts['registered']} dosya kaydedildi, {counts['deduplicated']} kopya birleştirildi")
+
+
+def _add_search_indexes(connection):
+    """Duyuru, yayın ve dersler için FTS5 arama indeksleri ve senkron tetikleyicileri"""
+    from search import create_search_indexes
+
+    create_search_indexes(connection)
+
+
+def _add_homework_list_indexes(connection):
+    """Admin ödev listesinin filtre + upload_date sıralaması için indeksler"""
+    import models
+
+    _create_indexes(
+        connection, models.Homework,
+        "ix_homeworks_upload_date",
+        "ix_homeworks_course_upload",
+        "ix_homeworks_assignment_upload",
+        "ix_homeworks_student_upload",
+    )
+    # Tek kolonlu indeksler yeni bileşik indekslerin önekidir; yalnızca yazma maliyeti eklerler
+    connection.execute(text("DROP INDEX IF EXISTS ix_homeworks_course_id"))
+    connection.execute(text("DROP INDEX IF EXISTS ix_homeworks_assignment_id"))
+
+
+def _add_enrollments(connection):
+    """students.enrolled_courses JSON kolonunu enrollments tablosuna taşı"""
+    from enrollments import migrate_legacy_enrollments
+
+    counts = migrate_legacy_enrollments(connection)
+    print(f"   {counts['students']} öğrencinin {counts['enrollments']} ders kaydı taşındı")
+
+
+# Sıralı göç listesi: (sürüm, açıklama, fonksiyon)
+MIGRATIONS = [
+    (1, "Liste sorguları için bileşik indeksler", _add_list_query_indexes),
+    (2, "Site istatistikleri için sayaç tetikleyicileri", _add_analytics_triggers),
+    (3, "Kullanıcı token sürümü", _add_user_token_version),
+    (4, "Ödev dosyası SHA-256 özeti", _add_homework_checksum),
+    (5, "İçerik adresli dosya deposu", _register_stored_files),
+    (6, "Tam metin arama indeksleri (FTS5)", _add_search_indexes),
+    (7, "Ödev listesi indeksleri", _add_homework_list_indexes),
+    (8, "Ders kayıtları tablosu", _add_enrollments),
+]
+
+
+# ==================== GÖÇ ÇALIŞTIRICI ====================
+
+@contextmanager
+def _migration_transaction(engine):
+    """
+    DDL'i de kapsayan tek bir işlem içinde bağlantı ver
+
+    SQLite dışındaki veritabanlarında engine.begin() yeterlidir.
+    """
+    if engine.dialect.name != "sqlite":
+        with engine.begin() as connection:
+            yield connection
+        return
+
+    with engine.connect() as connection:
+        # Sürücü kendi BEGIN'ini göndermesin; işlem sınırlarını biz belirleriz
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.execute(text("BEGIN"))
+        try:
+            yield connection
+        except BaseException:
+            connection.execute(text("ROLLBACK"))
+            raise
+        connection.execute(text("COMMIT"))
+
+
+def run_migrations(engine) -> list:
+    """
+    Henüz uygulanmamış göçleri sırayla uygula
+
+    Her göç kendi işleminde (transaction) çalışır ve başarılı olursa aynı
+    işlemde schema_migrations tablosuna kaydedilir. Hata olursa o göçün DDL
+    dahil tüm değişiklikleri geri alınır ve sonraki göçler çalıştırılmaz.
+
+    Args:
+        engine: Senkron veritabanı motoru
+
+    Returns:
+        list: Bu çalıştırmada uygulanan göç sürümleri
+    """
+    migration_metadata.create_all(bind=engine)
+
+    with engine.connect() as connection:
+        applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        with _migration_transaction(engine) as connection:
+            migrate(connection)
+            connection.execute(schema_migrations.insert().values(version=version, name=name))
+
+        newly_applied.append(version)
+        print(f"✅ Veritabanı göçü uygulandı: {version} - {name}")
+
+    return newly_applied
@@ -5,7 +5,7 @@ Bu modül, uygulamanın tüm veritabanı modellerini (tablolarını) tanımlar.
 SQLAlchemy ORM kullanarak veri yapılarını tanımlar.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -25,6 +25,7 @@ class User(Base):
         full_name: Tam ad
         is_active: Aktif kullanıcı mı?
         is_admin: Admin yetkisi var mı?
+        token_version: Token sürümü (artırıldığında eski token'lar geçersiz olur)
         created_at: Oluşturulma zamanı
         updated_at: Son güncellenme zamanı
     """
@@ -37,6 +38,7 @@ class User(Base):
     full_name = Column(String(100))
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -60,6 +62,10 @@ class Announcement(Base):
         views: Görüntülenme sayısı
     """
     __tablename__ = "announcements"
+    __table_args__ = (
+        # Yayındaki duyurular created_at'e göre listelenir
+        Index("ix_announcements_published_created", "is_published", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
@@ -95,6 +101,10 @@ class Course(Base):
         updated_at: Son güncellenme zamanı
     """
     __tablename__ = "courses"
+    __table_args__ = (
+        # Aktif dersler koda göre listelenir
+        Index("ix_courses_active_code", "is_active", "code"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(20), unique=True, nullable=False)
@@ -134,6 +144,10 @@ class Publication(Base):
         updated_at: Son güncellenme zamanı
     """
     __tablename__ = "publications"
+    __table_args__ = (
+        # Yayındaki yayınlar yıla göre listelenir
+        Index("ix_publications_published_year", "is_published", "year"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(300), nullable=False)
@@ -172,6 +186,10 @@ class GalleryItem(Base):
         updated_at: Son güncellenme zamanı
     """
     __tablename__ = "gallery_items"
+    __table_args__ = (
+        # Yayındaki öğeler order_index (artan) ve created_at'e (azalan) göre listelenir
+        Index("ix_gallery_items_published_order_created", "is_published", "order_index", text("created_at DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
@@ -186,6 +204,83 @@ class GalleryItem(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# ==================== GÖRSEL VARYANT MODELİ ====================
+
+class ImageVariant(Base):
+    """
+    Görsel Varyantı Modeli - Yüklenen görselin farklı genişlik/format kopyaları
+    
+    Attributes:
+        id: Benzersiz varyant ID'si
+        source_filename: uploads/images altındaki kaynak görselin adı
+        width: Genişlik (piksel)
+        height: Yükseklik (piksel)
+        format: Format (jpeg, webp, avif)
+        mime_type: MIME tipi
+        url: Varyant dosyasının URL'si
+        size: Dosya boyutu (byte)
+        created_at: Oluşturulma zamanı
+    """
+    __tablename__ = "image_variants"
+    __table_args__ = (
+        # Bir görselin varyantları format ve genişliğe göre seçilir
+        Index("ix_image_variants_source_format_width", "source_filename", "format", "width"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source_filename = Column(String(300), nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    format = Column(String(10), nullable=False)
+    mime_type = Column(String(50), nullable=False)
+    url = Column(String(500), nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ==================== DOSYA DEPOSU MODELLERİ ====================
+
+class StoredBlob(Base):
+    """
+    Depolanan İçerik Modeli - SHA-256 özetiyle adreslenen tekil dosya içeriği
+    
+    Aynı içerikli yüklemeler tek bir blob'u paylaşır; ref_count bu blob'a
+    bağlı mantıksal dosya (StoredFile) sayısıdır ve sıfıra inince blob silinir.
+    
+    Attributes:
+        sha256: İçeriğin SHA-256 özeti (hex)
+        size: Boyut (byte)
+        extension: Blob dosyasının uzantısı (.pdf vb.)
+        ref_count: Referans sayısı
+        created_at: İlk yüklenme zamanı
+    """
+    __tablename__ = "stored_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    extension = Column(String(16), nullable=False, default="")
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StoredFile(Base):
+    """
+    Depolanan Dosya Modeli - Mantıksal dosya adı (URL) ile blob eşlemesi
+    
+    Attributes:
+        id: Benzersiz kayıt ID'si
+        url: Mantıksal dosya URL'si (/uploads/pdfs/...)
+        sha256: Bağlı olduğu blob'un özeti
+        created_at: Oluşturulma zamanı
+    """
+    __tablename__ = "stored_files"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String(500), unique=True, nullable=False)
+    sha256 = Column(String(64), ForeignKey("stored_blobs.sha256"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 # ==================== ÖZGEÇMİŞ MODELİ ====================
 
 class CV(Base):
@@ -273,8 +368,14 @@ class Student(Base):
         is_active: Aktif öğrenci mi?
         created_at: Kayıt tarihi
         last_login: Son giriş zamanı
+    
+    Kayıtlı olduğu dersler Enrollment tablosunda tutulur.
     """
     __tablename__ = "students"
+    __table_args__ = (
+        # Dönem bazlı listeleme ve toplu silme
+        Index("ix_students_semester_academic_year", "semester", "academic_year"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     student_number = Column(String(20), unique=True, nullable=False, index=True)
@@ -288,7 +389,32 @@ class Student(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
-    enrolled_courses = Column(Text, nullable=True)  # JSON string: [1, 2, 3] (course IDs)
+
+
+# ==================== DERS KAYDI MODELİ ====================
+
+class Enrollment(Base):
+    """
+    Ders Kaydı Modeli - Öğrenci ile ders arasındaki çoktan çoğa ilişki
+    
+    Birincil anahtar (student_id, course_id) öğrencinin derslerini, ikinci
+    indeks (course_id, student_id) dersin öğrenci listesini indeks aralığı
+    olarak okur.
+    
+    Attributes:
+        student_id: Öğrenci ID'si (Foreign Key)
+        course_id: Ders ID'si (Foreign Key)
+        created_at: Kayıt zamanı
+    """
+    __tablename__ = "enrollments"
+    __table_args__ = (
+        # Ders listesi (roster) öğrenci ID'sine göre sıralı okunur
+        Index("ix_enrollments_course_student", "course_id", "student_id"),
+    )
+    
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 
 # ==================== ÖDEV TANIMI MODELİ ====================
@@ -337,19 +463,31 @@ class Homework(Base):
         course_code: Ders kodu
         course_name: Ders adı
         file_url: Yüklenen dosyanın URL'i
+        file_sha256: Yüklenen dosyanın SHA-256 özeti (bütünlük kontrolü)
         upload_date: Yükleme tarihi
         notes: Öğrenci notları (opsiyonel)
     """
     __tablename__ = "homeworks"
+    __table_args__ = (
+        # Aynı öğrenci + aynı ödev için önceki yüklemeyi bulma
+        Index("ix_homeworks_student_assignment", "student_number", "assignment_id"),
+        # Admin listesi upload_date'e göre (yeniden eskiye) sayfalanır; her filtre için
+        # eşitlik kolonu + upload_date indeksi (SQLite indekse rowid'yi, yani id'yi ekler)
+        Index("ix_homeworks_upload_date", "upload_date"),
+        Index("ix_homeworks_course_upload", "course_id", "upload_date"),
+        Index("ix_homeworks_assignment_upload", "assignment_id", "upload_date"),
+        Index("ix_homeworks_student_upload", "student_number", "upload_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    assignment_id = Column(Integer, nullable=True, index=True)  # Ödev tanımı ID (nullable - eski ödevler için)
+    assignment_id = Column(Integer, nullable=True)  # Ödev tanımı ID (nullable - eski ödevler için)
     student_id = Column(Integer, nullable=False, index=True)
-    course_id = Column(Integer, nullable=False, index=True)
+    course_id = Column(Integer, nullable=False)
     student_number = Column(String(20), nullable=False)
     student_name = Column(String(200), nullable=False)
     course_code = Column(String(20), nullable=False)
     course_name = Column(String(200), nullable=False)
     file_url = Column(String(500), nullable=False)
+    file_sha256 = Column(String(64), nullable=True)
     upload_date = Column(DateTime, default=datetime.utcnow)
     notes = Column(Text, nullable=True)
\ No newline at end of file
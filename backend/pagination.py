@@ -0,0 +1,160 @@
+"""
+Keyset (Cursor) Sayfalama Yardımcıları
+
+Bu modül, liste endpoint'leri için offset yerine sıralama kolonlarına dayalı
+(keyset) sayfalama sağlar. offset(skip) derin sayfalarda atlanan tüm satırları
+okur; keyset sayfalama ise son görülen satırın sıralama değerlerinden devam
+ettiği için her sayfa indeks üzerinde aynı maliyettedir.
+
+Sıralama tanımı (order) (kolon, azalan_mı) çiftlerinden oluşur ve son kolon
+benzersiz olmalıdır (genellikle id). Sıralama kolonları NULL içermemelidir.
+Bir sonraki sayfanın cursor'ı X-Next-Cursor başlığında döner; böylece mevcut
+liste yanıtlarının gövdesi değişmez.
+"""
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, func, or_
+from datetime import datetime
+import base64
+import json
+
+
+# Bir sonraki sayfanın cursor'ını taşıyan yanıt başlığı
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# İstenirse filtreye uyan toplam kayıt sayısını taşıyan yanıt başlığı
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+# ==================== CURSOR KODLAMA ====================
+
+def encode_cursor(row, order) -> str:
+    """
+    Satırın sıralama değerlerini opak bir cursor'a dönüştür
+
+    Args:
+        row: Sayfadaki son ORM nesnesi
+        order: (kolon, azalan_mı) çiftleri
+
+    Returns:
+        str: URL güvenli base64 cursor
+    """
+    values = []
+    for column, _ in order:
+        value = getattr(row, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order) -> list:
+    """
+    Cursor'ı sıralama kolonlarının Python değerlerine çöz
+
+    Raises:
+        HTTPException: Cursor bozuksa veya bu sıralamaya ait değilse (400)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(order):
+            raise ValueError("cursor uzunluğu uyumsuz")
+
+        decoded = []
+        for (column, _), value in zip(order, values):
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, column.type.python_type):
+                raise ValueError(f"{column.key} için geçersiz değer")
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+
+# ==================== SORGU OLUŞTURMA ====================
+
+def order_by_clauses(order) -> list:
+    """(kolon, azalan_mı) çiftlerini ORDER BY ifadelerine dönüştür"""
+    return [column.desc() if descending else column.asc() for column, descending in order]
+
+
+def keyset_condition(order, values):
+    """
+    Cursor'dan sonra gelen satırları seçen WHERE koşulu
+
+    Karışık yönlü sıralamalar için (a, b, c) > (x, y, z) karşılaştırması
+    a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z) şeklinde açılır.
+    İlk kolon ayrıca aralık koşulu olarak eklenir ki indeks aralığı kullanılabilsin.
+    """
+    def after(column, descending, value):
+        return column < value if descending else column > value
+
+    branches = []
+    for i, (column, descending) in enumerate(order):
+        equal_prefix = [order[j][0] == values[j] for j in range(i)]
+        branches.append(and_(*equal_prefix, after(column, descending, values[i])))
+
+    first_column, first_descending = order[0]
+    first_bound = first_column <= values[0] if first_descending else first_column >= values[0]
+    return and_(first_bound, or_(*branches))
+
+
+async def paginate(db, query, order, limit: int, skip: int = 0, cursor: str = None, scalars: bool = True):
+    """
+    Sorguyu offset veya cursor moduna göre sayfala
+
+    cursor verilirse keyset sayfalama kullanılır ve skip yok sayılır; verilmezse
+    geriye dönük uyumluluk için offset(skip) uygulanır. Her iki modda da sonraki
+    sayfa için cursor üretilir.
+
+    Args:
+        db: Async veritabanı oturumu
+        query: Filtreleri uygulanmış select() sorgusu
+        order: (kolon, azalan_mı) çiftleri (son kolon benzersiz olmalı)
+        limit: Sayfa boyutu
+        skip: Offset modunda atlanacak satır sayısı
+        cursor: Önceki sayfadan dönen cursor
+        scalars: False ise ORM nesneleri yerine satır demetleri (Row) döner;
+            sorgu sıralama kolonlarını da seçmelidir
+
+    Returns:
+        tuple: (satırlar, sonraki sayfa cursor'ı veya None)
+    """
+    query = query.order_by(*order_by_clauses(order))
+    if cursor:
+        query = query.where(keyset_condition(order, decode_cursor(cursor, order)))
+    elif skip:
+        query = query.offset(skip)
+
+    # Bir fazla satır çekerek sonraki sayfanın varlığını ayrı COUNT sorgusu olmadan anla
+    result = await db.execute(query.limit(limit + 1))
+    rows = (result.scalars() if scalars else result).all()
+    if limit > 0 and len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1], order)
+    return rows[:limit], None
+
+
+def set_next_cursor(response: Response, next_cursor: str) -> None:
+    """Sonraki sayfa cursor'ını yanıt başlığına ekle"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+async def set_total_count(db, response: Response, query) -> int:
+    """
+    Sorguya uyan toplam satır sayısını yanıt başlığına ekle
+
+    Sayım sıralama ve sayfalama olmadan, aynı filtrelerle tek COUNT sorgusudur;
+    filtre kolonları indeksliyse yalnızca indeks okunur.
+
+    Args:
+        db: Async veritabanı oturumu
+        response: Başlığın ekleneceği yanıt
+        query: Filtreleri uygulanmış select() sorgusu
+    """
+    count_query = query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    total = await db.scalar(count_query)
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    return total
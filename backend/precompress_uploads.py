@@ -0,0 +1,36 @@
+"""
+Mevcut yüklemeler için .gz / .br kopyalarını oluşturan script
+
+Yeni yüklenen PDF'ler arka plan işiyle sıkıştırılır; bu script ön sıkıştırma
+öncesinde yüklenmiş dosyalar için bir kez çalıştırılır. Kopyası zaten olan
+dosyalar atlanır.
+
+Kullanım:
+    python precompress_uploads.py
+"""
+from compression import ENCODINGS, is_precompressible, precompress_file, precompressed_path
+from file_utils import UPLOAD_DIR
+
+
+def precompress_uploads():
+    processed = skipped = 0
+    saved = 0
+
+    for path in sorted(UPLOAD_DIR.rglob("*")):
+        if not path.is_file() or path.name.startswith(".") or not is_precompressible(path):
+            continue
+        if all(precompressed_path(path, encoding).exists() for encoding in ENCODINGS):
+            skipped += 1
+            continue
+
+        result = precompress_file(path)
+        processed += 1
+        if len(result) > 1:
+            saved += result["size"] - min(size for key, size in result.items() if key != "size")
+            print(f"✅ {path.relative_to(UPLOAD_DIR)}: {result}")
+
+    print(f"İşlenen: {processed}, atlanan: {skipped}, kazanç: {saved / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    precompress_uploads()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Any, Optional, List, Union
 from datetime import datetime
 
 # User Schemas
@@ -52,11 +52,24 @@ class AnnouncementUpdate(BaseModel):
     date: Optional[str] = None
     is_published: Optional[bool] = None
 
+class ImageVariant(BaseModel):
+    """Görselin srcset için kullanılabilecek bir genişlik/format kopyası"""
+    width: int
+    height: int
+    format: str
+    mime_type: str
+    url: str
+    size: int
+    
+    class Config:
+        from_attributes = True
+
 class Announcement(AnnouncementBase):
     id: int
     views: int
     created_at: datetime
     updated_at: datetime
+    variants: List[ImageVariant] = []
     
     class Config:
         from_attributes = True
@@ -163,6 +176,7 @@ class GalleryItem(BaseModel):
     video_url: Optional[str] = None  # For videos
     thumbnail_url: Optional[str] = None
     created_at: datetime
+    variants: List[ImageVariant] = []
     
     class Config:
         from_attributes = True
@@ -217,6 +231,14 @@ class CV(BaseModel):
         from_attributes = True
         populate_by_name = True
 
+# Ana Sayfa Schema
+class HomePage(BaseModel):
+    """GET /api/home: ana sayfanın tüm verileri tek yanıtta"""
+    announcements: List[Announcement]
+    gallery: List[GalleryItem]
+    courses: List[Course]
+    cv: Optional[CV] = None
+
 # Analytics Schema
 class AnalyticsResponse(BaseModel):
     page_views: int
@@ -232,6 +254,16 @@ class AnalyticsResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# ==================== ARAMA ŞEMALARI ====================
+
+class SearchResult(BaseModel):
+    """GET /api/search sonucu; title ve snippet eşleşmeleri <mark> ile işaretlenmiş HTML'dir"""
+    type: str  # announcement, publication, course
+    id: int
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    score: float
+
 # ==================== ÖĞRENCİ ŞEMALARI ====================
 
 # Student Schemas
@@ -284,6 +316,17 @@ class Student(StudentBase):
     class Config:
         from_attributes = True
 
+class EnrollmentRequest(BaseModel):
+    """Derse toplu kayıt / kayıt silme; öğrenciler ID veya numara ile verilir"""
+    student_ids: List[int] = Field(default_factory=list, max_length=10000)
+    student_numbers: List[str] = Field(default_factory=list, max_length=10000)
+
+class EnrollmentResult(BaseModel):
+    course_id: int
+    requested: int
+    changed_count: int
+    not_found: List[Union[int, str]] = []
+
 class StudentLoginRequest(BaseModel):
     student_number: str
     password: str
@@ -294,6 +337,24 @@ class StudentToken(BaseModel):
     student: Student
 
 
+# ==================== ARKA PLAN İŞİ ŞEMALARI ====================
+
+class JobStatus(BaseModel):
+    """Arka plan işinin durumu (GET /api/jobs/{job_id})"""
+    id: str
+    kind: str
+    status: str
+    total: int
+    done: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 # ==================== ÖDEV TANIMI ŞEMALARI ====================
 
 class HomeworkAssignmentBase(BaseModel):
@@ -341,6 +402,7 @@ class Homework(HomeworkBase):
     course_code: str
     course_name: str
     file_url: str
+    file_sha256: Optional[str] = None
     upload_date: datetime
     
     class Config:
@@ -0,0 +1,330 @@
+"""
+Tam Metin Arama (SQLite FTS5)
+
+Bu modül duyurular, yayınlar ve dersler için FTS5 sanal tablolarını, bunları
+kaynak tablolarla senkron tutan tetikleyicileri ve /api/search sorgularını içerir.
+
+FTS tabloları "external content" tablolarıdır: metin yalnızca kaynak tabloda
+durur, FTS tablosu sadece ters indeksi tutar. highlight()/snippet() metni kaynak
+tablodan okur; böylece vurgulanan metin orijinal (Türkçe karakterli) haliyle döner.
+
+Türkçe için katlama:
+    - unicode61 tokenizer büyük/küçük harfi katlar, remove_diacritics 2 ise
+      ş/ç/ğ/ö/ü ve İ harflerini s/c/g/o/u/i'ye indirger
+    - Noktasız ı'nın ayrıştırılabilir bir aksanı olmadığı için tokenizer onu
+      değiştirmez; tetikleyiciler indekse yazarken ı'yı i'ye çevirir. Harf sayısı
+      ve kelime sınırları değişmediği için vurgu konumları orijinal metinle örtüşür
+Böylece "sinif", "SINIF" ve "sınıf" aynı kelimeyi bulur. Türkçe eklemeli bir dil
+olduğundan sorgu terimleri önek olarak aranır ("ogrenci" -> "öğrencilerin").
+
+Not: FTS5'in yerleşik 'rebuild' komutu metni katlamadan indeksler; indeksi
+yeniden oluşturmak için rebuild_search_index kullanılmalıdır.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+import base64
+import html
+import json
+import os
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+
+# ==================== YAPILANDIRMA ====================
+
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# 2 ve 3 karakterlik önekler ayrıca indekslenir; kısa önek sorguları terim taraması yapmaz
+PREFIX_LENGTHS = "2 3"
+
+# Tek istekte dönebilecek en fazla sonuç
+SEARCH_MAX_LIMIT = int(os.environ.get("SEARCH_MAX_LIMIT", "50"))
+
+# Her tipte BM25 ile sıralanacak en fazla eşleşme (en yeniler). BM25 her eşleşen
+# satır için hesaplanır; çok yaygın terimlerde (binlerce eşleşme, IDF ~ 0) sıralama
+# bu pencereyle sınırlanır. Daha az eşleşen sorgularda sıralama tamdır.
+SEARCH_RANK_WINDOW = int(os.environ.get("SEARCH_RANK_WINDOW", "500"))
+
+# Sorguda dikkate alınacak en fazla terim
+SEARCH_MAX_TERMS = 8
+
+# Özet (snippet) uzunluğu (token)
+SNIPPET_TOKENS = 24
+
+# highlight()/snippet() işaretçileri; HTML kaçışından sonra <mark> etiketine çevrilir
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """
+    Bir kaynak tablonun FTS5 indeksi
+
+    Attributes:
+        kind: Yanıttaki sonuç tipi
+        table: Kaynak tablo (id kolonu FTS rowid'sidir)
+        columns: İndekslenen kolonlar (kaynak tablodaki adlarıyla)
+        weights: Kolonların BM25 ağırlıkları
+        title_column: Başlık olarak vurgulanan kolonun sırası
+        snippet_column: Özet çıkarılan kolonun sırası (-1: en iyi eşleşen kolon)
+        visible: Herkese açık satır koşulu (kaynak tablo "t" adıyla)
+    """
+    kind: str
+    table: str
+    columns: tuple
+    weights: tuple
+    title_column: int
+    snippet_column: int
+    visible: str
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+
+SEARCH_INDEXES = {
+    "announcement": SearchIndex(
+        "announcement", "announcements", ("title", "content"), (10.0, 1.0),
+        title_column=0, snippet_column=1, visible="t.is_published = 1",
+    ),
+    "publication": SearchIndex(
+        "publication", "publications", ("title", "authors", "abstract", "journal"), (10.0, 5.0, 1.0, 2.0),
+        title_column=0, snippet_column=-1, visible="t.is_published = 1",
+    ),
+    "course": SearchIndex(
+        "course", "courses", ("code", "name", "description"), (10.0, 10.0, 1.0),
+        title_column=1, snippet_column=2, visible="t.is_active = 1",
+    ),
+}
+
+
+# ==================== TÜRKÇE KATLAMA ====================
+
+def fold_turkish(value: str) -> str:
+    """Noktasız ı'yı i'ye çevir (diğer harfleri tokenizer katlar)"""
+    return value.replace("ı", "i")
+
+
+def _folded(expression: str) -> str:
+    """fold_turkish'in SQL karşılığı (tetikleyicilerde kullanılır)"""
+    return f"replace({expression}, 'ı', 'i')"
+
+
+# ==================== İNDEKS OLUŞTURMA ====================
+
+def create_search_index(connection, index: SearchIndex) -> None:
+    """
+    FTS5 tablosunu, senkron tetikleyicilerini oluştur ve mevcut satırları indeksle
+
+    Tetikleyiciler kaynak tablodaki yazma ile aynı işlemde çalışır. Güncelleme
+    tetikleyicisi yalnızca indekslenen kolonlar değiştiğinde çalışır; örneğin
+    duyuru görüntülenme sayacı indeksi etkilemez.
+    """
+    fts, table = index.fts_table, index.table
+    columns = ", ".join(index.columns)
+    new_values = ", ".join(_folded(f"new.{column}") for column in index.columns)
+    old_values = ", ".join(_folded(f"old.{column}") for column in index.columns)
+
+    connection.execute(text(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {columns},
+            content='{table}', content_rowid='id',
+            tokenize='{TOKENIZER}', prefix='{PREFIX_LENGTHS}'
+        )
+    """))
+    # ORDER BY rank kolon ağırlıklı BM25 kullanır
+    weights = ", ".join(str(weight) for weight in index.weights)
+    connection.execute(text(f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25({weights})')"))
+
+    insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+        BEGIN {insert} END
+    """))
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+        BEGIN {delete} END
+    """))
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {columns} ON {table}
+        BEGIN {delete} {insert} END
+    """))
+
+    rebuild_search_index(connection, index)
+
+
+def rebuild_search_index(connection, index: SearchIndex) -> None:
+    """İndeksi boşalt ve kaynak tablodaki tüm satırları katlanmış metinle yeniden indeksle"""
+    fts = index.fts_table
+    columns = ", ".join(index.columns)
+    values = ", ".join(_folded(column) for column in index.columns)
+    connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')"))
+    connection.execute(text(f"INSERT INTO {fts}(rowid, {columns}) SELECT id, {values} FROM {index.table}"))
+
+
+def create_search_indexes(connection) -> None:
+    """Tüm arama indekslerini oluştur (şema göçü)"""
+    for index in SEARCH_INDEXES.values():
+        create_search_index(connection, index)
+
+
+# ==================== SORGU ====================
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Kullanıcı sorgusunu güvenli bir FTS5 MATCH ifadesine çevir
+
+    Terimler tırnak içine alınır (FTS5 operatörleri ve sözdizimi hataları
+    oluşmaz) ve VE ile birleştirilir; iki karakter ve üzeri terimler önek
+    olarak aranır.
+
+    Returns:
+        str: MATCH ifadesi veya sorguda terim yoksa None
+    """
+    terms = re.findall(r"\w+", fold_turkish(query))[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' if len(term) > 1 else f'"{term}"' for term in terms)
+
+
+def _search_statement(index: SearchIndex):
+    """
+    Tek indeks için BM25 sıralı, vurgulu arama sorgusu
+
+    Alt sorgu eşleşmeleri rowid sırasıyla (sıralama hesabı yapmadan) tarar ve
+    en yeni :window eşleşmenin alt sınırını bulur; rowid koşulu FTS5'e aktarılır
+    ve BM25 yalnızca bu aralıktaki satırlar için hesaplanır.
+    """
+    fts = index.fts_table
+    return text(f"""
+        SELECT t.id AS id,
+               highlight({fts}, {index.title_column}, :start, :end) AS title,
+               snippet({fts}, {index.snippet_column}, :start, :end, '…', :tokens) AS snippet,
+               {fts}.rank AS rank
+        FROM {fts}
+        JOIN {index.table} AS t ON t.id = {fts}.rowid
+        WHERE {fts} MATCH :query
+          AND {fts}.rowid >= (
+              SELECT min(rowid) FROM (
+                  SELECT rowid FROM {fts} WHERE {fts} MATCH :query ORDER BY rowid DESC LIMIT :window
+              )
+          )
+          AND {index.visible}
+        ORDER BY {fts}.rank
+        LIMIT :limit
+    """)
+
+
+SEARCH_STATEMENTS = {kind: _search_statement(index) for kind, index in SEARCH_INDEXES.items()}
+
+_TAG = re.compile(r"<[^>]*>|<[^>]*$")
+
+
+def highlight_html(value: Optional[str]) -> Optional[str]:
+    """
+    Vurgulu metni güvenli HTML'e çevir
+
+    Kaynak metindeki HTML etiketleri (ders açıklamaları vb.) atılır, kalan metin
+    kaçışlanır ve yalnızca eşleşmeler <mark> ile işaretlenir.
+    """
+    if value is None:
+        return None
+    value = html.escape(html.unescape(_TAG.sub("", value)), quote=False)
+    return value.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+def parse_kinds(types: Optional[str]) -> List[str]:
+    """
+    Virgülle ayrılmış sonuç tiplerini doğrula (boşsa tümü)
+
+    Raises:
+        HTTPException: Bilinmeyen tip (400)
+    """
+    if not types:
+        return list(SEARCH_INDEXES)
+    kinds = [kind.strip() for kind in types.split(",") if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in SEARCH_INDEXES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Geçersiz arama tipi: {', '.join(unknown)} (geçerli: {', '.join(SEARCH_INDEXES)})"
+        )
+    return kinds
+
+
+async def search(db, query: str, kinds: List[str], limit: int, skip: int = 0) -> tuple:
+    """
+    İndekslerde ara ve sonuçları BM25 skoruna göre birleştir
+
+    Her indeks kendi içinde FTS5'in rank sıralamasıyla en fazla skip + limit + 1
+    satır döndürür (en yeni SEARCH_RANK_WINDOW eşleşme arasından); sonuçlar
+    skora göre birleştirilip sayfalanır.
+
+    Args:
+        db: Async veritabanı oturumu
+        query: Kullanıcının arama metni
+        kinds: Aranacak sonuç tipleri
+        limit: Sayfa boyutu (en fazla SEARCH_MAX_LIMIT)
+        skip: Atlanacak sonuç sayısı
+
+    Returns:
+        tuple: (sonuç sözlükleri, sonraki sayfa var mı)
+    """
+    match = build_match_query(query)
+    if match is None:
+        return [], False
+
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    skip = max(0, skip)
+    params = {
+        "query": match,
+        "start": HIGHLIGHT_START,
+        "end": HIGHLIGHT_END,
+        "tokens": SNIPPET_TOKENS,
+        "limit": skip + limit + 1,
+        "window": max(SEARCH_RANK_WINDOW, skip + limit + 1),
+    }
+
+    results = []
+    for kind in kinds:
+        for row in (await db.execute(SEARCH_STATEMENTS[kind], params)).all():
+            results.append({
+                "type": kind,
+                "id": row.id,
+                "title": highlight_html(row.title),
+                "snippet": highlight_html(row.snippet),
+                # bm25 negatiftir (küçük olan daha iyi); yanıtta büyük olan daha iyidir
+                "score": round(-row.rank, 6),
+            })
+
+    results.sort(key=lambda result: -result["score"])
+    return results[skip:skip + limit], len(results) > skip + limit
+
+
+# ==================== CURSOR ====================
+# Skora göre sıralanan sonuçlar için keyset sayfalama yoktur; cursor bir sonraki
+# sayfanın başlangıç sırasını opak olarak taşır.
+
+def encode_search_cursor(skip: int) -> str:
+    raw = json.dumps([skip]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> int:
+    """
+    Raises:
+        HTTPException: Cursor bozuksa (400)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+            raise ValueError("geçersiz cursor")
+        return values[0]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
@@ -0,0 +1,277 @@
+"""
+Hızlı JSON Serileştirme
+
+Liste endpoint'lerinde yanıt süresinin büyük kısmı serileştirmeye gider:
+ORM nesneleri schemas.py modellerine doğrulanır, FastAPI response_model ile
+tekrar doğrular ve ardından json.dumps çalışır. Bu modül bunun yerine
+seçilen kolonların satır demetlerini (veya ORM nesnelerini) doğrudan
+frontend alan adlarıyla sözlüğe eşler ve orjson ile bayta çevirir.
+
+Eşleyiciler mevcut yanıt sözleşmesini (alan adları ve sırası, response_model
+şemaları) birebir korur; şemalar OpenAPI dokümantasyonu için yerinde kalır.
+orjson kurulu değilse standart json modülü kullanılır.
+"""
+
+from datetime import date, datetime
+from typing import Any, Optional
+import json
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+import models
+
+try:
+    import orjson
+except ImportError:  # isteğe bağlı bağımlılık
+    orjson = None
+
+
+# ==================== JSON YANITI ====================
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemez")
+
+
+def dumps(content: Any) -> bytes:
+    """İçeriği JSON baytlarına çevir (datetime değerleri ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Doğrulamadan geçmeyen, orjson ile üretilen JSON yanıtı"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    İçeriği doğrudan JSON yanıtı olarak döndür
+
+    Endpoint bir Response döndürdüğünde FastAPI, enjekte edilen response
+    nesnesinin başlıklarını (ETag, X-Next-Cursor vb.) eklemez; bu yüzden
+    başlıklar buradan kopyalanır.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def json_bytes_response(body: bytes, response: Optional[Response] = None) -> Response:
+    """Önceden serileştirilmiş JSON gövdesini döndür (başlıklar json_response gibi kopyalanır)"""
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ==================== EŞLEYİCİLER ====================
+# Her *_COLUMNS demeti ilgili eşleyicinin okuduğu kolonları içerir; ORM
+# nesneleri de aynı özniteliklere sahip olduğu için eşleyicilere verilebilir.
+
+VARIANT_COLUMNS = (
+    models.ImageVariant.source_filename,
+    models.ImageVariant.width,
+    models.ImageVariant.height,
+    models.ImageVariant.format,
+    models.ImageVariant.mime_type,
+    models.ImageVariant.url,
+    models.ImageVariant.size,
+)
+
+
+def variant_dict(row) -> dict:
+    """schemas.ImageVariant ile aynı alanlar"""
+    return {
+        "width": row.width,
+        "height": row.height,
+        "format": row.format,
+        "mime_type": row.mime_type,
+        "url": row.url,
+        "size": row.size,
+    }
+
+
+ANNOUNCEMENT_COLUMNS = (
+    models.Announcement.id,
+    models.Announcement.title,
+    models.Announcement.content,
+    models.Announcement.announcement_type,
+    models.Announcement.image_url,
+    models.Announcement.date,
+    models.Announcement.is_published,
+    models.Announcement.views,
+    models.Announcement.created_at,
+    models.Announcement.updated_at,
+)
+
+
+def announcement_dict(row, variants=()) -> dict:
+    """schemas.Announcement ile aynı alanlar ve sıra"""
+    return {
+        "title": row.title,
+        "content": row.content,
+        "announcement_type": row.announcement_type,
+        "image_url": row.image_url,
+        "date": row.date,
+        "is_published": row.is_published,
+        "id": row.id,
+        "views": row.views,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "variants": [variant_dict(variant) for variant in variants],
+    }
+
+
+COURSE_COLUMNS = (
+    models.Course.id,
+    models.Course.code,
+    models.Course.name,
+    models.Course.level,
+    models.Course.semester,
+    models.Course.credits,
+    models.Course.description,
+    models.Course.content,
+    models.Course.syllabus_url,
+    models.Course.materials_url,
+    models.Course.is_active,
+    models.Course.created_at,
+)
+
+
+def course_dict(row) -> dict:
+    """schemas.Course ile aynı alanlar ve sıra"""
+    return {
+        "code": row.code,
+        "name": row.name,
+        "level": row.level,
+        "semester": row.semester,
+        "credits": row.credits,
+        "description": row.description,
+        "content": row.content,
+        "syllabus_url": row.syllabus_url,
+        "materials_url": row.materials_url,
+        "is_active": row.is_active,
+        "id": row.id,
+        "created_at": row.created_at,
+    }
+
+
+PUBLICATION_COLUMNS = (
+    models.Publication.id,
+    models.Publication.title,
+    models.Publication.authors,
+    models.Publication.year,
+    models.Publication.publication_type,
+    models.Publication.journal,
+    models.Publication.conference,
+    models.Publication.location,
+    models.Publication.doi,
+    models.Publication.pdf_url,
+    models.Publication.external_url,
+    models.Publication.abstract,
+    models.Publication.is_published,
+    models.Publication.created_at,
+)
+
+
+def publication_dict(row) -> dict:
+    """Yayın; frontend 'type' ve 'file_url' bekler, eski adlar uyumluluk için kalır"""
+    return {
+        "id": row.id,
+        "title": row.title,
+        "authors": row.authors,
+        "year": row.year,
+        "type": row.publication_type,
+        "publication_type": row.publication_type,
+        "journal": row.journal,
+        "conference": row.conference,
+        "location": row.location,
+        "doi": row.doi,
+        "file_url": row.pdf_url,
+        "pdf_url": row.pdf_url,
+        "external_url": row.external_url,
+        "abstract": row.abstract,
+        "is_published": row.is_published,
+        "created_at": row.created_at,
+    }
+
+
+GALLERY_ITEM_COLUMNS = (
+    models.GalleryItem.id,
+    models.GalleryItem.title,
+    models.GalleryItem.description,
+    models.GalleryItem.item_type,
+    models.GalleryItem.url,
+    models.GalleryItem.thumbnail_url,
+    models.GalleryItem.order_index,  # sayfalama cursor'ı için
+    models.GalleryItem.created_at,
+)
+
+
+def gallery_item_dict(row, variants=()) -> dict:
+    """schemas.GalleryItem; frontend 'type', 'image_url' ve 'video_url' bekler"""
+    is_photo = row.item_type == "photo"
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "type": row.item_type,
+        "image_url": row.url if is_photo else None,
+        "video_url": row.url if row.item_type == "video" else None,
+        "thumbnail_url": row.thumbnail_url,
+        "created_at": row.created_at,
+        "variants": [variant_dict(variant) for variant in variants] if is_photo else [],
+    }
+
+
+def cv_dict(cv) -> dict:
+    """schemas.CV; frontend 'name' ve 'file_url' bekler"""
+    return {
+        "id": cv.id,
+        "name": cv.full_name,
+        "title": cv.title,
+        "email": cv.email,
+        "phone": cv.phone,
+        "office": cv.office,
+        "education": cv.education,
+        "experience": cv.experience,
+        "photo_url": cv.photo_url,
+        "file_url": cv.pdf_url,
+        "updated_at": cv.updated_at,
+    }
+
+
+STUDENT_COLUMNS = (
+    models.Student.id,
+    models.Student.student_number,
+    models.Student.full_name,
+    models.Student.email,
+    models.Student.department,
+    models.Student.year,
+    models.Student.semester,
+    models.Student.academic_year,
+    models.Student.is_active,
+    models.Student.created_at,
+    models.Student.last_login,
+)
+
+
+def student_dict(row, enrolled_courses=()) -> dict:
+    """schemas.Student ile aynı alanlar ve sıra; dersler enrollments tablosundan gelir"""
+    return {
+        "student_number": row.student_number,
+        "full_name": row.full_name,
+        "email": row.email,
+        "department": row.department,
+        "year": row.year,
+        "semester": row.semester,
+        "academic_year": row.academic_year,
+        "id": row.id,
+        "is_active": row.is_active,
+        "created_at": row.created_at,
+        "last_login": row.last_login,
+        "enrolled_courses": list(enrolled_courses),
+    }
@@ -5,31 +5,86 @@ Bu modül, akademik web sitesi için tüm API endpoint'lerini tanımlar.
 Duyurular, dersler, yayınlar, galeri, CV ve kimlik doğrulama işlemlerini yönetir.
 """
 
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, UploadFile, File, Form, status
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Response, status
 from starlette.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from starlette.responses import StreamingResponse
+from sqlalchemy import and_, select, func, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pathlib import Path
 import os
+import asyncio
 import logging
 from datetime import timedelta, datetime
-import json
 
 # Yerel modülleri import et
-from database import get_db, init_db
+from database import get_db, init_db, read_snapshot, AsyncSessionLocal
 import models
 import schemas
 from auth import (
     authenticate_user,
     create_access_token,
+    user_token_claims,
+    credential_versions,
+    TokenClaims,
     get_current_user,
     get_current_active_admin,
-    get_password_hash,
+    get_password_hash_async,
+    verify_password_async,
+    hash_passwords,
+    password_hasher,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from file_utils import save_upload_file, delete_file, UPLOAD_DIR
+from file_utils import (
+    save_upload_file,
+    delete_file,
+    process_image,
+    thumbnail_url_for,
+    negotiate_variant,
+    sanitize_filename,
+    UPLOAD_DIR
+)
+from pagination import paginate, set_next_cursor, set_total_count, NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from cache import response_cache, ResponseCache, CachedResponse, ResponseCacheMiddleware
+from conditional import table_validators, combined_validators, row_validators, check_not_modified, query_key
+from write_behind import write_behind
+from file_store import content_store
+from file_responses import CachedFileResponse, CachedStaticFiles, REVALIDATE_CACHE_CONTROL, iter_zip
+from compression import CompressionMiddleware, compressed_bodies, precompress_file
+from serializers import (
+    dumps,
+    json_response,
+    json_bytes_response,
+    announcement_dict,
+    course_dict,
+    publication_dict,
+    gallery_item_dict,
+    cv_dict,
+    student_dict,
+    ANNOUNCEMENT_COLUMNS,
+    COURSE_COLUMNS,
+    PUBLICATION_COLUMNS,
+    GALLERY_ITEM_COLUMNS,
+    STUDENT_COLUMNS,
+    VARIANT_COLUMNS
+)
+from enrollments import (
+    enrolled_course_ids,
+    find_students,
+    enroll_students,
+    enroll_in_courses,
+    unenroll_students
+)
+from student_bulk import (
+    semester_filter,
+    delete_students,
+    bulk_delete_students,
+    bulk_update_students,
+    start_file_cleanup,
+    MAX_STUDENT_YEAR
+)
+from search import search, parse_kinds, encode_search_cursor, decode_search_cursor
+from jobs import jobs, get_process_pool, shutdown_process_pool
 
 # Veritabanını başlat
 init_db()
@@ -41,15 +96,165 @@ app = FastAPI(title="Academic Website API")
 api_router = APIRouter(prefix="/api")
 
 # Yüklenen dosyaları statik olarak sun
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+app.mount("/uploads", CachedStaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+
+# Liste endpoint'lerinin sıralama tanımları: (kolon, azalan_mı)
+# Keyset sayfalama bu kolonlara göre devam eder; son kolon benzersiz olmalıdır.
+ANNOUNCEMENT_ORDER = [(models.Announcement.created_at, True), (models.Announcement.id, True)]
+COURSE_ORDER = [(models.Course.code, False), (models.Course.id, False)]
+PUBLICATION_ORDER = [(models.Publication.year, True), (models.Publication.id, True)]
+GALLERY_ORDER = [
+    (models.GalleryItem.order_index, False),
+    (models.GalleryItem.created_at, True),
+    (models.GalleryItem.id, False),
+]
+STUDENT_ORDER = [(models.Student.id, False)]
+# Ders listesi (ix_enrollments_course_student sırasıyla, ek sıralama gerekmez)
+ROSTER_ORDER = [(models.Enrollment.student_id, False)]
+HOMEWORK_ORDER = [(models.Homework.upload_date, True), (models.Homework.id, True)]
+
+# Ana sayfada her kaynaktan gösterilen kayıt sayısı (varsayılan ve üst sınır)
+HOME_ITEM_LIMIT = int(os.environ.get("HOME_ITEM_LIMIT", "6"))
+HOME_MAX_ITEM_LIMIT = 50
+
+# Serileştirilmiş ana sayfa yanıtları; anahtar birleşik ETag olduğundan
+# herhangi bir içerik değişince eski kayıt kendiliğinden kullanılmaz olur
+home_cache = ResponseCache(max_entries=16)
+
+
+# ==================== GÖRSEL İŞLEME ====================
+
+def image_source_filename(image_url: Optional[str]) -> Optional[str]:
+    """/uploads/images/... URL'sinden kaynak dosya adını çıkar (değilse None)"""
+    if image_url and image_url.startswith("/uploads/images/"):
+        return Path(image_url).name
+    return None
+
+async def load_variants(db: AsyncSession, image_urls) -> dict:
+    """
+    Görsellerin varyantlarını tek sorguda getir
+    
+    Returns:
+        dict: görsel URL'si -> format ve genişliğe göre sıralı varyant satırları
+    """
+    filenames = {image_source_filename(url): url for url in image_urls if image_source_filename(url)}
+    if not filenames:
+        return {}
+    
+    variants = (await db.execute(
+        select(*VARIANT_COLUMNS)
+        .where(models.ImageVariant.source_filename.in_(filenames))
+        .order_by(models.ImageVariant.format, models.ImageVariant.width)
+    )).all()
+    
+    grouped = {}
+    for variant in variants:
+        grouped.setdefault(filenames[variant.source_filename], []).append(variant)
+    return grouped
+
+async def delete_image_variants(db: AsyncSession, image_url: Optional[str]) -> None:
+    """Silinen görselin varyant kayıtlarını sil (dosyaları delete_file siler)"""
+    source_filename = image_source_filename(image_url)
+    if source_filename:
+        await db.execute(delete(models.ImageVariant).where(models.ImageVariant.source_filename == source_filename))
+
+async def store_record_pdf(db: AsyncSession, old_url: Optional[str], new_url: Optional[str]) -> None:
+    """
+    Kayda yazılan PDF'i içerik adresli depoya al, değiştirilen eskisini bırak
+
+    Yükleme endpoint'leri dosyayı depoya almaz; referans, URL'yi kaydeden
+    handler'ın işleminde açılır ve kayıt değişince ya da silinince bırakılır.
+    """
+    if new_url:
+        await content_store.adopt(db, new_url)
+    if old_url and old_url != new_url:
+        await delete_file(old_url, db)
+
+async def on_image_processed(result: dict) -> None:
+    """
+    Görsel işi tamamlanınca çalışan kanca
+    Varyantları kaydeder, görsel iş bitmeden bir galeri öğesine eklendiyse küçük
+    resmini doldurur ve görseli kullanan içeriklerin updated_at'ini ilerletir
+    (yanıtlarına varyantlar eklendiği için ETag'leri değişmeli)
+    """
+    image_url = result["url"]
+    source_filename = image_source_filename(image_url)
+    
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(models.ImageVariant).where(models.ImageVariant.source_filename == source_filename))
+        db.add_all(
+            models.ImageVariant(source_filename=source_filename, **variant)
+            for variant in result["variants"]
+        )
+        gallery = await db.execute(
+            update(models.GalleryItem)
+            .where(models.GalleryItem.url == image_url)
+            .values(thumbnail_url=func.coalesce(models.GalleryItem.thumbnail_url, result["thumbnail_url"]))
+        )
+        announcements = await db.execute(
+            update(models.Announcement)
+            .where(models.Announcement.image_url == image_url)
+            .values(updated_at=datetime.utcnow())
+        )
+        await db.commit()
+    
+    if gallery.rowcount:
+        response_cache.invalidate("/api/gallery")
+    if announcements.rowcount:
+        response_cache.invalidate("/api/announcements")
+
+async def run_image_processing(job, image_path: str) -> dict:
+    """Görsel optimizasyonu ve küçük resim işi (süreç havuzunda)"""
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(get_process_pool(), process_image, image_path)
+    job.advance()
+    await on_image_processed(result)
+    return result
+
+def start_image_processing(upload_result: dict) -> dict:
+    """
+    Yüklenen görsel için arka plan işini başlat
+    Yanıt hemen orijinal URL ve iş ID'si ile döner; küçük resim iş bitince hazır olur
+    """
+    image_path = str(UPLOAD_DIR / "images" / upload_result["filename"])
+    job = jobs.create("image.process", total=1)
+    jobs.start(job, run_image_processing(job, image_path))
+    
+    return {
+        **upload_result,
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}"
+    }
+
+async def run_precompression(job, file_path: str) -> dict:
+    """Statik dosyanın .gz / .br kopyalarını yazan iş (süreç havuzunda)"""
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(get_process_pool(), precompress_file, file_path)
+    job.advance()
+    return result
+
+def start_precompression(upload_result: dict) -> dict:
+    """
+    Yüklenen PDF için ön sıkıştırma işini başlat
+    Kopyalar hazır olana kadar dosya sıkıştırılmadan sunulur
+    """
+    file_path = str(UPLOAD_DIR / "pdfs" / upload_result["filename"])
+    job = jobs.create("file.precompress", total=1)
+    jobs.start(job, run_precompression(job, file_path))
+    
+    return {
+        **upload_result,
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}"
+    }
 
 
 # ==================== KİMLİK DOĞRULAMA ENDPOINT'LERİ ====================
 
 @api_router.post("/auth/login", response_model=schemas.Token)
-async def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: schemas.LoginRequest, db: AsyncSession = Depends(get_db)):
     """Kullanıcı giriş endpoint'i"""
-    user = authenticate_user(db, login_data.username, login_data.password)
+    user = await authenticate_user(db, login_data.username, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,7 +264,7 @@ async def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db))
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=user_token_claims(user), expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -73,406 +278,554 @@ async def change_password(
     old_password: str = Form(...),
     new_password: str = Form(...),
     current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Kullanıcı şifre değiştirme"""
-    from auth import verify_password
-    
-    if not verify_password(old_password, current_user.hashed_password):
+    if not await verify_password_async(old_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Mevcut şifre hatalı")
     
-    current_user.hashed_password = get_password_hash(new_password)
-    db.commit()
-    return {"message": "Şifre başarıyla güncellendi"}
+    current_user.hashed_password = await get_password_hash_async(new_password)
+    # Eski token'ları geçersiz kıl ve yeni sürümle token ver
+    current_user.token_version = (current_user.token_version or 0) + 1
+    await db.commit()
+    credential_versions.set(current_user)
+    
+    access_token = create_access_token(
+        data=user_token_claims(current_user),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "message": "Şifre başarıyla güncellendi",
+        "access_token": access_token,
+        "token_type": "bearer"
+    }
 
 
 # ==================== DUYURU ENDPOINT'LERİ ====================
 
 @api_router.get("/announcements", response_model=List[schemas.Announcement])
-def get_announcements(
+async def get_announcements(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     announcement_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Tüm duyuruları getir (herkese açık)"""
-    query = db.query(models.Announcement).filter(models.Announcement.is_published == True)
+    """
+    Tüm duyuruları getir (herkese açık)
+    cursor verilirse keyset sayfalama yapılır; sonraki sayfa X-Next-Cursor başlığında döner
+    """
+    # Görüntülenme sayıları ve sayfa/filtre parametreleri de ETag'e dahil edilir
+    validators = await table_validators(
+        db, models.Announcement, func.sum(models.Announcement.views), extra=query_key(request)
+    )
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    # ORM nesnesi ve şema doğrulaması yerine kolonlar doğrudan JSON'a eşlenir
+    query = select(*ANNOUNCEMENT_COLUMNS).where(models.Announcement.is_published == True)
     if announcement_type:
-        query = query.filter(models.Announcement.announcement_type == announcement_type)
-    return query.order_by(models.Announcement.created_at.desc()).offset(skip).limit(limit).all()
+        query = query.where(models.Announcement.announcement_type == announcement_type)
+    announcements, next_cursor = await paginate(db, query, ANNOUNCEMENT_ORDER, limit, skip, cursor, scalars=False)
+    set_next_cursor(response, next_cursor)
+    
+    # Görsel varyantları (srcset) tek sorguda
+    variants = await load_variants(db, [announcement.image_url for announcement in announcements])
+    return json_response([
+        announcement_dict(announcement, variants.get(announcement.image_url, ()))
+        for announcement in announcements
+    ], response)
 
 @api_router.get("/announcements/{announcement_id}", response_model=schemas.Announcement)
-def get_announcement(announcement_id: int, db: Session = Depends(get_db)):
-    """Tek bir duyuruyu getir ve görüntülenme sayısını artır"""
-    announcement = db.query(models.Announcement).filter(models.Announcement.id == announcement_id).first()
+async def get_announcement(
+    announcement_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tek bir duyuruyu getir ve görüntülenme sayısını artır
+    Koşullu isteklerde (If-None-Match) de görüntülenme sayılır
+    Sayaç gecikmeli yazma tamponunda artırılır; istek salt okunurdur
+    """
+    announcement = await db.get(models.Announcement, announcement_id)
     if not announcement:
         raise HTTPException(status_code=404, detail="Duyuru bulunamadı")
     
-    # Görüntülenme sayısını artır
-    announcement.views += 1
-    db.commit()
-    db.refresh(announcement)
-    return announcement
+    write_behind.add_view(announcement_id)
+    
+    # Sayaç updated_at'i değiştirmez; yalnızca görüntülenme sayısı arttıysa da 304 döner
+    not_modified = check_not_modified(request, response, row_validators(announcement))
+    if not_modified:
+        return not_modified
+    
+    variants = await load_variants(db, [announcement.image_url])
+    result = announcement_dict(announcement, variants.get(announcement.image_url, ()))
+    # Henüz yazılmamış görüntülenmeleri de yansıt
+    result["views"] += write_behind.pending_views(announcement_id)
+    return json_response(result, response)
 
 @api_router.post("/announcements", response_model=schemas.Announcement)
 async def create_announcement(
     announcement: schemas.AnnouncementCreate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Yeni duyuru oluştur (sadece admin)"""
     db_announcement = models.Announcement(**announcement.dict())
     db.add(db_announcement)
-    db.commit()
-    db.refresh(db_announcement)
+    await db.commit()
+    response_cache.invalidate("/api/announcements")
+    await db.refresh(db_announcement)
     return db_announcement
 
 @api_router.put("/announcements/{announcement_id}", response_model=schemas.Announcement)
 async def update_announcement(
     announcement_id: int,
     announcement: schemas.AnnouncementUpdate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Duyuru güncelle (sadece admin)"""
-    db_announcement = db.query(models.Announcement).filter(models.Announcement.id == announcement_id).first()
+    db_announcement = await db.get(models.Announcement, announcement_id)
     if not db_announcement:
         raise HTTPException(status_code=404, detail="Duyuru bulunamadı")
     
     for key, value in announcement.dict(exclude_unset=True).items():
         setattr(db_announcement, key, value)
     
-    db.commit()
-    db.refresh(db_announcement)
+    await db.commit()
+    response_cache.invalidate("/api/announcements")
+    await db.refresh(db_announcement)
     return db_announcement
 
 @api_router.delete("/announcements/{announcement_id}")
 async def delete_announcement(
     announcement_id: int,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Duyuru sil (sadece admin)"""
-    db_announcement = db.query(models.Announcement).filter(models.Announcement.id == announcement_id).first()
+    db_announcement = await db.get(models.Announcement, announcement_id)
     if not db_announcement:
         raise HTTPException(status_code=404, detail="Duyuru bulunamadı")
     
     # İlişkili görseli varsa sil
     if db_announcement.image_url:
-        delete_file(db_announcement.image_url)
+        await delete_file(db_announcement.image_url, db)
+        await delete_image_variants(db, db_announcement.image_url)
     
-    db.delete(db_announcement)
-    db.commit()
+    await db.delete(db_announcement)
+    await db.commit()
+    response_cache.invalidate("/api/announcements")
     return {"message": "Duyuru başarıyla silindi"}
 
 @api_router.post("/announcements/upload-image")
 async def upload_announcement_image(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_active_admin)
+    current_user: TokenClaims = Depends(get_current_active_admin)
 ):
-    """Duyuru için görsel yükle (sadece admin)"""
+    """
+    Duyuru için görsel yükle (sadece admin)
+    Optimizasyon arka planda yapılır; ilerleme GET /api/jobs/{job_id} ile izlenir
+    """
     result = await save_upload_file(file, file_type="image")
-    return result
+    return start_image_processing(result)
 
 # ==================== COURSE ENDPOINTS ====================
 
 @api_router.get("/courses", response_model=List[schemas.Course])
-def get_courses(
+async def get_courses(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     level: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all courses"""
-    query = db.query(models.Course).filter(models.Course.is_active == True)
+    """Get all courses (cursor-based pagination via X-Next-Cursor)"""
+    validators = await table_validators(db, models.Course, extra=query_key(request))
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    query = select(*COURSE_COLUMNS).where(models.Course.is_active == True)
     if level:
-        query = query.filter(models.Course.level == level)
-    return query.order_by(models.Course.code).offset(skip).limit(limit).all()
+        query = query.where(models.Course.level == level)
+    courses, next_cursor = await paginate(db, query, COURSE_ORDER, limit, skip, cursor, scalars=False)
+    set_next_cursor(response, next_cursor)
+    return json_response([course_dict(course) for course in courses], response)
 
 @api_router.get("/courses/{course_id}", response_model=schemas.Course)
-def get_course(course_id: int, db: Session = Depends(get_db)):
+async def get_course(
+    course_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     """Get single course with details"""
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
+    course = await db.get(models.Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
+    
+    not_modified = check_not_modified(request, response, row_validators(course))
+    if not_modified:
+        return not_modified
     return course
 
 @api_router.post("/courses", response_model=schemas.Course)
 async def create_course(
     course: schemas.CourseCreate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new course (admin only)"""
     # Check if code already exists
-    existing = db.query(models.Course).filter(models.Course.code == course.code).first()
+    existing = await db.scalar(select(models.Course).where(models.Course.code == course.code))
     if existing:
         raise HTTPException(status_code=400, detail="Course code already exists")
     
     db_course = models.Course(**course.dict())
     db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
+    await db.commit()
+    response_cache.invalidate("/api/courses")
+    await db.refresh(db_course)
     return db_course
 
 @api_router.put("/courses/{course_id}", response_model=schemas.Course)
 async def update_course(
     course_id: int,
     course: schemas.CourseUpdate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update course (admin only)"""
-    db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
+    db_course = await db.get(models.Course, course_id)
     if not db_course:
         raise HTTPException(status_code=404, detail="Course not found")
     
     for key, value in course.dict(exclude_unset=True).items():
         setattr(db_course, key, value)
     
-    db.commit()
-    db.refresh(db_course)
+    await db.commit()
+    response_cache.invalidate("/api/courses")
+    await db.refresh(db_course)
     return db_course
 
 @api_router.delete("/courses/{course_id}")
 async def delete_course(
     course_id: int,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete course (admin only)"""
-    db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
+    db_course = await db.get(models.Course, course_id)
     if not db_course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    db.delete(db_course)
-    db.commit()
+    await db.delete(db_course)
+    await db.execute(delete(models.Enrollment).where(models.Enrollment.course_id == course_id))
+    await db.commit()
+    response_cache.invalidate("/api/courses")
     return {"message": "Course deleted successfully"}
 
+@api_router.get("/courses/{course_id}/students", response_model=List[schemas.Student])
+async def get_course_roster(
+    course_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Derse kayıtlı öğrenciler (Sadece admin)
+    Öğrenci ID'sine göre sıralı; sonraki sayfa X-Next-Cursor, istenirse toplam X-Total-Count başlığında döner
+    """
+    if not await db.get(models.Course, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    query = (
+        select(*STUDENT_COLUMNS, models.Enrollment.student_id)
+        .join(models.Enrollment, models.Enrollment.student_id == models.Student.id)
+        .where(models.Enrollment.course_id == course_id)
+    )
+    students, next_cursor = await paginate(db, query, ROSTER_ORDER, limit, skip, cursor, scalars=False)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        await set_total_count(db, response, query)
+    
+    courses = await enrolled_course_ids(db, [student.id for student in students])
+    return json_response([student_dict(student, courses[student.id]) for student in students], response)
+
+@api_router.post("/courses/{course_id}/enrollments", response_model=schemas.EnrollmentResult)
+async def enroll_course_students(
+    course_id: int,
+    enrollment: schemas.EnrollmentRequest,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Öğrencileri derse toplu kaydet (Sadece admin)
+    Zaten kayıtlı olanlar atlanır; changed_count yeni eklenen kayıt sayısıdır
+    """
+    if not await db.get(models.Course, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    student_ids, not_found = await find_students(db, enrollment.student_ids, enrollment.student_numbers)
+    enrolled_count = await enroll_students(db, course_id, student_ids)
+    await db.commit()
+    
+    logger.info(f"✅ Derse kayıt: ders {course_id}, {enrolled_count} yeni kayıt")
+    return {
+        "course_id": course_id,
+        "requested": len(enrollment.student_ids) + len(enrollment.student_numbers),
+        "changed_count": enrolled_count,
+        "not_found": not_found
+    }
+
+@api_router.delete("/courses/{course_id}/enrollments", response_model=schemas.EnrollmentResult)
+async def unenroll_course_students(
+    course_id: int,
+    enrollment: schemas.EnrollmentRequest,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Öğrencilerin ders kaydını toplu sil (Sadece admin)
+    changed_count silinen kayıt sayısıdır; derse kayıtlı olmayanlar hata vermez
+    """
+    if not await db.get(models.Course, course_id):
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    student_ids, not_found = await find_students(db, enrollment.student_ids, enrollment.student_numbers)
+    removed_count = await unenroll_students(db, course_id, student_ids)
+    await db.commit()
+    
+    logger.info(f"🗑️ Ders kaydı silindi: ders {course_id}, {removed_count} kayıt")
+    return {
+        "course_id": course_id,
+        "requested": len(enrollment.student_ids) + len(enrollment.student_numbers),
+        "changed_count": removed_count,
+        "not_found": not_found
+    }
+
 # ==================== PUBLICATION ENDPOINTS ====================
 
 @api_router.get("/publications")
-def get_publications(
+async def get_publications(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     publication_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all publications with field mapping for frontend"""
-    query = db.query(models.Publication).filter(models.Publication.is_published == True)
+    """Get all publications with field mapping for frontend (cursor-based pagination via X-Next-Cursor)"""
+    validators = await table_validators(db, models.Publication, extra=query_key(request))
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    query = select(*PUBLICATION_COLUMNS).where(models.Publication.is_published == True)
     if publication_type:
-        query = query.filter(models.Publication.publication_type == publication_type)
-    
-    publications = query.order_by(models.Publication.year.desc()).offset(skip).limit(limit).all()
-    
-    # Map database fields to frontend fields
-    result = []
-    for pub in publications:
-        result.append({
-            'id': pub.id,
-            'title': pub.title,
-            'authors': pub.authors,
-            'year': pub.year,
-            'type': pub.publication_type,  # Frontend uses 'type'
-            'publication_type': pub.publication_type,  # Keep for backwards compatibility
-            'journal': pub.journal,
-            'conference': pub.conference,
-            'location': pub.location,
-            'doi': pub.doi,
-            'file_url': pub.pdf_url,  # Frontend uses 'file_url'
-            'pdf_url': pub.pdf_url,  # Keep for backwards compatibility
-            'external_url': pub.external_url,
-            'abstract': pub.abstract,
-            'is_published': pub.is_published,
-            'created_at': pub.created_at
-        })
+        query = query.where(models.Publication.publication_type == publication_type)
     
-    return result
+    publications, next_cursor = await paginate(db, query, PUBLICATION_ORDER, limit, skip, cursor, scalars=False)
+    set_next_cursor(response, next_cursor)
+    
+    # Map database fields to frontend fields (type, file_url)
+    return json_response([publication_dict(pub) for pub in publications], response)
 
 @api_router.post("/publications", response_model=schemas.Publication)
 async def create_publication(
     publication: schemas.PublicationCreate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new publication (admin only)"""
     db_publication = models.Publication(**publication.dict())
     db.add(db_publication)
-    db.commit()
-    db.refresh(db_publication)
+    await store_record_pdf(db, None, db_publication.pdf_url)
+    await db.commit()
+    response_cache.invalidate("/api/publications")
+    await db.refresh(db_publication)
     return db_publication
 
 @api_router.put("/publications/{publication_id}", response_model=schemas.Publication)
 async def update_publication(
     publication_id: int,
     publication: schemas.PublicationUpdate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update publication (admin only)"""
-    db_publication = db.query(models.Publication).filter(models.Publication.id == publication_id).first()
+    db_publication = await db.get(models.Publication, publication_id)
     if not db_publication:
         raise HTTPException(status_code=404, detail="Publication not found")
     
+    old_pdf_url = db_publication.pdf_url
     for key, value in publication.dict(exclude_unset=True).items():
         setattr(db_publication, key, value)
+    await store_record_pdf(db, old_pdf_url, db_publication.pdf_url)
     
-    db.commit()
-    db.refresh(db_publication)
+    await db.commit()
+    response_cache.invalidate("/api/publications")
+    await db.refresh(db_publication)
     return db_publication
 
 @api_router.delete("/publications/{publication_id}")
 async def delete_publication(
     publication_id: int,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete publication (admin only)"""
-    db_publication = db.query(models.Publication).filter(models.Publication.id == publication_id).first()
+    db_publication = await db.get(models.Publication, publication_id)
     if not db_publication:
         raise HTTPException(status_code=404, detail="Publication not found")
     
     # Delete associated PDF if exists
     if db_publication.pdf_url:
-        delete_file(db_publication.pdf_url)
+        await delete_file(db_publication.pdf_url, db)
     
-    db.delete(db_publication)
-    db.commit()
+    await db.delete(db_publication)
+    await db.commit()
+    response_cache.invalidate("/api/publications")
     return {"message": "Publication deleted successfully"}
 
 @api_router.post("/publications/upload-pdf")
 async def upload_publication_pdf(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_active_admin)
+    current_user: TokenClaims = Depends(get_current_active_admin)
 ):
-    """Upload PDF for publication"""
+    """
+    Upload PDF for publication
+    Dosya, URL'si kaydedilince (create/update_publication) o işlemde içerik adresli depoya alınır
+    """
     result = await save_upload_file(file, file_type="pdf")
-    return result
+    return start_precompression(result)
 
 # ==================== GALLERY ENDPOINTS ====================
 
 @api_router.get("/gallery", response_model=List[schemas.GalleryItem])
-def get_gallery_items(
+async def get_gallery_items(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     item_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all gallery items"""
-    query = db.query(models.GalleryItem).filter(models.GalleryItem.is_published == True)
+    """Get all gallery items (cursor-based pagination via X-Next-Cursor)"""
+    validators = await table_validators(db, models.GalleryItem, extra=query_key(request))
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    query = select(*GALLERY_ITEM_COLUMNS).where(models.GalleryItem.is_published == True)
     if item_type:
-        query = query.filter(models.GalleryItem.item_type == item_type)
+        query = query.where(models.GalleryItem.item_type == item_type)
     
-    items = query.order_by(models.GalleryItem.order_index, models.GalleryItem.created_at.desc()).offset(skip).limit(limit).all()
+    items, next_cursor = await paginate(db, query, GALLERY_ORDER, limit, skip, cursor, scalars=False)
+    set_next_cursor(response, next_cursor)
     
-    # Map database field names to frontend field names
-    result = []
-    for item in items:
-        item_dict = {
-            'id': item.id,
-            'title': item.title,
-            'description': item.description,
-            'type': item.item_type,
-            'image_url': item.url if item.item_type == 'photo' else None,
-            'video_url': item.url if item.item_type == 'video' else None,
-            'thumbnail_url': item.thumbnail_url,
-            'created_at': item.created_at
-        }
-        result.append(item_dict)
+    # Görsel varyantları (srcset) tek sorguda
+    variants = await load_variants(db, [item.url for item in items if item.item_type == 'photo'])
     
-    return result
+    # Map database field names to frontend field names (type, image_url, video_url)
+    return json_response([gallery_item_dict(item, variants.get(item.url, ())) for item in items], response)
 
 @api_router.post("/gallery", response_model=schemas.GalleryItem)
 async def create_gallery_item(
     gallery_item: schemas.GalleryItemCreate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new gallery item (admin only)"""
     db_item = models.GalleryItem(**gallery_item.dict())
+    # Görsel işi daha önce bittiyse küçük resmi hemen bağla; bitmediyse iş tamamlanınca doldurulur
+    if db_item.item_type == "photo":
+        db_item.thumbnail_url = thumbnail_url_for(db_item.url)
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    response_cache.invalidate("/api/gallery")
+    await db.refresh(db_item)
     
     # Map database field names to frontend field names for response
-    response_dict = {
-        'id': db_item.id,
-        'title': db_item.title,
-        'description': db_item.description,
-        'type': db_item.item_type,
-        'image_url': db_item.url if db_item.item_type == 'photo' else None,
-        'video_url': db_item.url if db_item.item_type == 'video' else None,
-        'thumbnail_url': db_item.thumbnail_url,
-        'created_at': db_item.created_at
-    }
-    
-    return response_dict
+    variants = await load_variants(db, [db_item.url] if db_item.item_type == 'photo' else [])
+    return gallery_item_dict(db_item, variants.get(db_item.url, ()))
 
 @api_router.delete("/gallery/{item_id}")
 async def delete_gallery_item(
     item_id: int,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete gallery item (admin only)"""
-    db_item = db.query(models.GalleryItem).filter(models.GalleryItem.id == item_id).first()
+    db_item = await db.get(models.GalleryItem, item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Gallery item not found")
     
     # Delete associated files if exists
     if db_item.item_type == "photo" and db_item.url:
-        delete_file(db_item.url)
+        await delete_file(db_item.url, db)
+        await delete_image_variants(db, db_item.url)
         if db_item.thumbnail_url:
-            delete_file(db_item.thumbnail_url)
+            await delete_file(db_item.thumbnail_url, db)
     
-    db.delete(db_item)
-    db.commit()
+    await db.delete(db_item)
+    await db.commit()
+    response_cache.invalidate("/api/gallery")
     return {"message": "Gallery item deleted successfully"}
 
 @api_router.post("/gallery/upload-photo")
 async def upload_gallery_photo(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_active_admin)
+    current_user: TokenClaims = Depends(get_current_active_admin)
 ):
-    """Upload photo to gallery"""
+    """
+    Upload photo to gallery
+    Optimizasyon ve küçük resim arka planda yapılır; tamamlanınca galeri öğesinin
+    thumbnail_url alanı doldurulur
+    """
     result = await save_upload_file(file, file_type="image")
-    return result
+    return start_image_processing(result)
 
 # ==================== CV ENDPOINTS ====================
 
 @api_router.get("/cv", response_model=List[schemas.CV])
-def get_cv(db: Session = Depends(get_db)):
+async def get_cv(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """Get CV information"""
-    cv = db.query(models.CV).first()
+    validators = await table_validators(db, models.CV, extra=query_key(request))
+    not_modified = check_not_modified(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    cv = await db.scalar(select(models.CV))
     if not cv:
         return []  # Return empty list if no CV exists
     
     # Map database field names to frontend field names
-    cv_dict = {
-        'id': cv.id,
-        'name': cv.full_name,
-        'title': cv.title,
-        'email': cv.email,
-        'phone': cv.phone,
-        'office': cv.office,
-        'education': cv.education,
-        'experience': cv.experience,
-        'photo_url': cv.photo_url,
-        'file_url': cv.pdf_url,
-        'updated_at': cv.updated_at
-    }
-    
-    return [cv_dict]  # Return as list for consistency
+    return [cv_dict(cv)]  # Return as list for consistency
 
 @api_router.post("/cv", response_model=schemas.CV)
 async def create_cv(
     cv_data: schemas.CVCreate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create new CV (admin only)"""
     # Check if CV already exists
-    existing_cv = db.query(models.CV).first()
+    existing_cv = await db.scalar(select(models.CV))
     if existing_cv:
         raise HTTPException(status_code=400, detail="CV already exists. Use PUT to update.")
     
@@ -485,8 +838,10 @@ async def create_cv(
     
     cv = models.CV(**cv_dict)
     db.add(cv)
-    db.commit()
-    db.refresh(cv)
+    await store_record_pdf(db, None, cv.pdf_url)
+    await db.commit()
+    response_cache.invalidate("/api/cv")
+    await db.refresh(cv)
     
     # Map database field names to frontend field names for response
     response_dict = {
@@ -508,11 +863,11 @@ async def create_cv(
 @api_router.put("/cv", response_model=schemas.CV)
 async def update_cv(
     cv_data: schemas.CVUpdate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """Update CV information (admin only)"""
-    cv = db.query(models.CV).first()
+    cv = await db.scalar(select(models.CV))
     
     # Map frontend field names to database field names
     cv_dict = cv_data.dict(exclude_unset=True)
@@ -521,6 +876,7 @@ async def update_cv(
     if 'file_url' in cv_dict:
         cv_dict['pdf_url'] = cv_dict.pop('file_url')
     
+    old_pdf_url = cv.pdf_url if cv else None
     if not cv:
         # Create new CV if doesn't exist
         cv = models.CV(**cv_dict)
@@ -528,9 +884,11 @@ async def update_cv(
     else:
         for key, value in cv_dict.items():
             setattr(cv, key, value)
+    await store_record_pdf(db, old_pdf_url, cv.pdf_url)
     
-    db.commit()
-    db.refresh(cv)
+    await db.commit()
+    response_cache.invalidate("/api/cv")
+    await db.refresh(cv)
     
     # Map database field names to frontend field names for response
     response_dict = {
@@ -552,20 +910,23 @@ async def update_cv(
 @api_router.post("/cv/upload-pdf")
 async def upload_cv_pdf(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_active_admin)
+    current_user: TokenClaims = Depends(get_current_active_admin)
 ):
-    """Upload CV PDF"""
+    """
+    Upload CV PDF
+    Dosya, URL'si kaydedilince (create/update_cv) o işlemde içerik adresli depoya alınır
+    """
     result = await save_upload_file(file, file_type="pdf")
-    return result
+    return start_precompression(result)
 
 @api_router.post("/cv/upload-photo")
 async def upload_cv_photo(
     file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_active_admin)
+    current_user: TokenClaims = Depends(get_current_active_admin)
 ):
-    """Upload CV photo"""
+    """Upload CV photo (optimizasyon arka planda yapılır)"""
     result = await save_upload_file(file, file_type="image")
-    return result
+    return start_image_processing(result)
 
 
 # ==================== ÖĞRENCİ KİMLİK DOĞRULAMA ENDPOINT'LERİ ====================
@@ -573,7 +934,7 @@ async def upload_cv_photo(
 @api_router.post("/students/self-register", response_model=schemas.Student, status_code=status.HTTP_201_CREATED)
 async def self_register_student(
     registration: schemas.StudentRegister,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Öğrenci kendi kendine kayıt olur
@@ -594,9 +955,9 @@ async def self_register_student(
         )
     
     # Öğrenci numarası zaten var mı kontrol et
-    db_student = db.query(models.Student).filter(
+    db_student = await db.scalar(select(models.Student).where(
         models.Student.student_number == registration.student_number
-    ).first()
+    ))
     if db_student:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -610,9 +971,11 @@ async def self_register_student(
             detail="En az bir ders seçmelisiniz"
         )
     
+    existing_courses = set((await db.scalars(
+        select(models.Course.id).where(models.Course.id.in_(registration.course_ids))
+    )).all())
     for course_id in registration.course_ids:
-        course = db.query(models.Course).filter(models.Course.id == course_id).first()
-        if not course:
+        if course_id not in existing_courses:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Ders bulunamadı: ID {course_id}"
@@ -622,57 +985,41 @@ async def self_register_student(
     email = f"{registration.student_number}@ogrenci.karabuk.edu.tr"
     
     # Yeni öğrenci oluştur
-    import json
     db_student = models.Student(
         student_number=registration.student_number,
         full_name=registration.full_name,
         email=email,
-        hashed_password=get_password_hash(registration.password),
+        hashed_password=await get_password_hash_async(registration.password),
         department="Mekatronik Mühendisliği",
         year=1,
         semester="Güz",
         academic_year="2024-2025",
-        is_active=True,
-        enrolled_courses=json.dumps(registration.course_ids)
+        is_active=True
     )
     
     db.add(db_student)
-    db.commit()
-    db.refresh(db_student)
+    await db.flush()
+    await enroll_in_courses(db, db_student.id, registration.course_ids)
+    await db.commit()
+    await db.refresh(db_student)
     
     logger.info(f"✅ Öğrenci kendi kendine kayıt oldu: {registration.student_number} - {registration.full_name} - Dersler: {registration.course_ids}")
     
-    # enrolled_courses'u parse et ve döndür
-    student_dict = {
-        "id": db_student.id,
-        "student_number": db_student.student_number,
-        "full_name": db_student.full_name,
-        "email": db_student.email,
-        "department": db_student.department,
-        "year": db_student.year,
-        "semester": db_student.semester,
-        "academic_year": db_student.academic_year,
-        "is_active": db_student.is_active,
-        "created_at": db_student.created_at,
-        "last_login": db_student.last_login,
-        "enrolled_courses": json.loads(db_student.enrolled_courses) if db_student.enrolled_courses else []
-    }
-    
-    return student_dict
+    return student_dict(db_student, sorted(set(registration.course_ids)))
 
 @api_router.post("/students/register", response_model=schemas.Student, status_code=status.HTTP_201_CREATED)
 async def register_student(
     student: schemas.StudentCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Yeni öğrenci kaydı oluştur
     Herkes kullanabilir (admin değil)
     """
     # Öğrenci numarası zaten var mı kontrol et
-    db_student = db.query(models.Student).filter(
+    db_student = await db.scalar(select(models.Student).where(
         models.Student.student_number == student.student_number
-    ).first()
+    ))
     if db_student:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -680,9 +1027,9 @@ async def register_student(
         )
     
     # Email zaten var mı kontrol et
-    db_student = db.query(models.Student).filter(
+    db_student = await db.scalar(select(models.Student).where(
         models.Student.email == student.email
-    ).first()
+    ))
     if db_student:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -694,7 +1041,7 @@ async def register_student(
         student_number=student.student_number,
         full_name=student.full_name,
         email=student.email,
-        hashed_password=get_password_hash(student.password),
+        hashed_password=await get_password_hash_async(student.password),
         department=student.department,
         year=student.year,
         semester=student.semester,
@@ -703,24 +1050,29 @@ async def register_student(
     )
     
     db.add(db_student)
-    db.commit()
-    db.refresh(db_student)
+    await db.flush()
+    # Var olmayan ders ID'leri atlanır
+    if student.enrolled_courses:
+        await enroll_in_courses(db, db_student.id, student.enrolled_courses)
+    await db.commit()
+    await db.refresh(db_student)
     
     logger.info(f"✅ Yeni öğrenci kaydedildi: {student.student_number} - {student.full_name}")
-    return db_student
+    courses = await enrolled_course_ids(db, [db_student.id])
+    return student_dict(db_student, courses[db_student.id])
 
 @api_router.post("/students/login", response_model=schemas.StudentToken)
 async def student_login(
     login_data: schemas.StudentLoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Öğrenci giriş endpoint'i
     """
     # Öğrenciyi bul
-    student = db.query(models.Student).filter(
+    student = await db.scalar(select(models.Student).where(
         models.Student.student_number == login_data.student_number
-    ).first()
+    ))
     
     if not student:
         raise HTTPException(
@@ -729,8 +1081,7 @@ async def student_login(
         )
     
     # Şifre kontrolü
-    from auth import verify_password
-    if not verify_password(login_data.password, student.hashed_password):
+    if not await verify_password_async(login_data.password, student.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Öğrenci numarası veya şifre hatalı"
@@ -743,10 +1094,9 @@ async def student_login(
             detail="Hesabınız aktif değil"
         )
     
-    # Son giriş zamanını güncelle
-    from datetime import datetime
-    student.last_login = datetime.utcnow()
-    db.commit()
+    # Son giriş zamanını güncelle (gecikmeli yazma tamponu üzerinden)
+    last_login = datetime.utcnow()
+    write_behind.record_login(student.id, last_login)
     
     # Token oluştur
     access_token = create_access_token(
@@ -755,98 +1105,93 @@ async def student_login(
     
     logger.info(f"✅ Öğrenci giriş yaptı: {student.student_number} - {student.full_name}")
     
-    # enrolled_courses JSON parse et
-    student_dict = {
-        "id": student.id,
-        "student_number": student.student_number,
-        "full_name": student.full_name,
-        "email": student.email,
-        "is_active": student.is_active,
-        "created_at": student.created_at,
-        "last_login": student.last_login,
-        "enrolled_courses": json.loads(student.enrolled_courses) if student.enrolled_courses else []
-    }
+    courses = await enrolled_course_ids(db, [student.id])
+    student_data = student_dict(student, courses[student.id])
+    student_data["last_login"] = last_login
     
     return {
         "access_token": access_token,
         "token_type": "bearer",
-        "student": student_dict
+        "student": student_data
     }
 
-@api_router.post("/students/bulk-create", status_code=status.HTTP_201_CREATED)
-async def bulk_create_students(
-    bulk_data: schemas.StudentBulkCreate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
-):
+# Toplu kayıtta bir süreç havuzu görevine ve bir insert işlemine düşen öğrenci sayısı
+BULK_CREATE_CHUNK_SIZE = 200
+
+async def run_bulk_create_students(job, bulk_data: schemas.StudentBulkCreate):
     """
-    Toplu öğrenci kaydı oluştur (Sadece admin)
-    Örnek: 1000 öğrenci kaydı aynı anda
+    Toplu öğrenci kaydı işi (arka planda çalışır)
+    Mevcut numaralar tek aralık sorgusuyla bulunur, şifreler süreç havuzunda
+    parça parça hashlenir ve her parça tek bir toplu insert ile yazılır
     """
-    created_students = []
-    errors = []
+    current_year = datetime.now().year
     
-    # Yıl bilgisini al (örn: 2024)
-    import datetime
-    current_year = datetime.datetime.now().year
+    # Öğrenci numaraları aynı uzunlukta ve ardışık (örn: 2024000001...)
+    student_numbers = [f"{current_year}{str(i).zfill(6)}" for i in range(1, bulk_data.count + 1)]
     
-    for i in range(1, bulk_data.count + 1):
-        # Öğrenci numarası oluştur (örn: 2024001001)
-        student_number = f"{current_year}{str(i).zfill(6)}"
-        
-        # Email oluştur
-        email = f"{student_number}@ogrenci.karabuk.edu.tr"
-        
-        # Şifre oluştur (örn: student123)
-        password = f"{bulk_data.password_prefix}{str(i).zfill(3)}"
-        
-        # Ad soyad oluştur
-        full_name = f"Öğrenci {i}"
-        
-        try:
-            # Öğrenci zaten var mı kontrol et
-            existing = db.query(models.Student).filter(
-                models.Student.student_number == student_number
-            ).first()
-            
-            if existing:
-                errors.append(f"Öğrenci {student_number} zaten kayıtlı")
-                continue
-            
-            # Yeni öğrenci oluştur
-            new_student = models.Student(
-                student_number=student_number,
-                full_name=full_name,
-                email=email,
-                hashed_password=get_password_hash(password),
-                department=bulk_data.department,
-                year=bulk_data.year,
-                semester=bulk_data.semester,
-                academic_year=bulk_data.academic_year,
-                is_active=True
+    async with AsyncSessionLocal() as db:
+        existing = set((await db.scalars(
+            select(models.Student.student_number).where(
+                models.Student.student_number.between(student_numbers[0], student_numbers[-1])
             )
-            
-            db.add(new_student)
-            created_students.append({
-                "student_number": student_number,
-                "password": password,  # Sadece ilk kayıtta göster
-                "email": email,
-                "full_name": full_name
-            })
-            
+        )).all())
+    
+    errors = [f"Öğrenci {number} zaten kayıtlı" for number in student_numbers if number in existing]
+    job.advance(len(errors))
+    
+    pending = [
+        (i, number) for i, number in enumerate(student_numbers, start=1)
+        if number not in existing
+    ]
+    chunks = [pending[k:k + BULK_CREATE_CHUNK_SIZE] for k in range(0, len(pending), BULK_CREATE_CHUNK_SIZE)]
+    
+    # Tüm parçaları havuza hemen gönder ki bütün çekirdekler çalışsın
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    hash_futures = [
+        loop.run_in_executor(pool, hash_passwords, [
+            f"{bulk_data.password_prefix}{str(i).zfill(3)}" for i, _ in chunk
+        ])
+        for chunk in chunks
+    ]
+    
+    created_students = []
+    for chunk, hash_future in zip(chunks, hash_futures):
+        first, last = chunk[0][1], chunk[-1][1]
+        try:
+            hashed_passwords = await hash_future
+            rows = [
+                {
+                    "student_number": number,
+                    "full_name": f"Öğrenci {i}",
+                    "email": f"{number}@ogrenci.karabuk.edu.tr",
+                    "hashed_password": hashed_password,
+                    "department": bulk_data.department,
+                    "year": bulk_data.year,
+                    "semester": bulk_data.semester,
+                    "academic_year": bulk_data.academic_year,
+                    "is_active": True,
+                }
+                for (i, number), hashed_password in zip(chunk, hashed_passwords)
+            ]
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(models.Student), rows)
+                await db.commit()
         except Exception as e:
-            errors.append(f"Öğrenci {student_number} oluşturulamadı: {str(e)}")
+            errors.append(f"Öğrenciler {first}-{last} oluşturulamadı: {str(e)}")
+        else:
+            created_students.extend(
+                {
+                    "student_number": row["student_number"],
+                    "password": f"{bulk_data.password_prefix}{str(i).zfill(3)}",  # Sadece ilk kayıtta göster
+                    "email": row["email"],
+                    "full_name": row["full_name"]
+                }
+                for (i, _), row in zip(chunk, rows)
+            )
+        job.advance(len(chunk))
     
-    # Veritabanına kaydet
-    try:
-        db.commit()
-        logger.info(f"✅ Toplu öğrenci kaydı tamamlandı: {len(created_students)} öğrenci oluşturuldu")
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Toplu kayıt sırasında hata oluştu: {str(e)}"
-        )
+    logger.info(f"✅ Toplu öğrenci kaydı tamamlandı: {len(created_students)} öğrenci oluşturuldu")
     
     return {
         "success": True,
@@ -856,82 +1201,173 @@ async def bulk_create_students(
         "errors": errors[:10] if errors else []
     }
 
+@api_router.post("/students/bulk-create", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_create_students(
+    bulk_data: schemas.StudentBulkCreate,
+    current_user: TokenClaims = Depends(get_current_active_admin)
+):
+    """
+    Toplu öğrenci kaydı oluştur (Sadece admin)
+    Örnek: 1000 öğrenci kaydı aynı anda
+    İşlem arka planda çalışır; ilerleme ve sonuç GET /api/jobs/{job_id} ile izlenir
+    """
+    job = jobs.create("students.bulk_create", total=bulk_data.count)
+    jobs.start(job, run_bulk_create_students(job, bulk_data))
+    
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "status_url": f"/api/jobs/{job.id}"
+    }
+
 @api_router.get("/students", response_model=List[schemas.Student])
 async def get_students(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Tüm öğrencileri listele (Sadece admin)
+    cursor verilirse keyset sayfalama yapılır; sonraki sayfa X-Next-Cursor başlığında döner
     """
-    students = db.query(models.Student).offset(skip).limit(limit).all()
-    return students
-
-@api_router.delete("/students/{student_id}")
-async def delete_student(
-    student_id: int,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    students, next_cursor = await paginate(db, select(*STUDENT_COLUMNS), STUDENT_ORDER, limit, skip, cursor, scalars=False)
+    set_next_cursor(response, next_cursor)
+    courses = await enrolled_course_ids(db, [student.id for student in students])
+    return json_response([student_dict(student, courses[student.id]) for student in students], response)
+
+def file_cleanup_info(file_urls) -> dict:
+    """Silinen ödev dosyalarını arka planda temizle ve yanıta iş bilgisini ekle"""
+    job = start_file_cleanup(file_urls)
+    if job is None:
+        return {"cleanup_job_id": None, "cleanup_status_url": None}
+    return {"cleanup_job_id": job.id, "cleanup_status_url": f"/api/jobs/{job.id}"}
+
+# Toplu işlemler /students/{student_id}'den önce tanımlanır; aksi halde yol onunla eşleşir
+@api_router.delete("/students/bulk-delete-by-semester")
+async def bulk_delete_students_by_semester(
+    semester: str,
+    academic_year: str,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Öğrenci kaydını sil (Sadece admin)
+    Belirli döneme ait tüm öğrencileri sil (Sadece admin)
+    Dönem sonu temizliği için kullanılır. Öğrencilerin ödev ve ders kayıtları da
+    silinir; ödev dosyaları arka planda (cleanup_status_url) diskten kaldırılır
     """
-    student = db.query(models.Student).filter(models.Student.id == student_id).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Öğrenci bulunamadı")
+    deleted = await bulk_delete_students(db, semester_filter(semester, academic_year))
     
-    db.delete(student)
-    db.commit()
+    logger.info(
+        f"🗑️ Toplu öğrenci silme tamamlandı: {deleted['students']} öğrenci, "
+        f"{deleted['homeworks']} ödev silindi ({semester} {academic_year})"
+    )
     
-    logger.info(f"🗑️ Öğrenci silindi: {student.student_number} - {student.full_name}")
-    return {"message": "Öğrenci başarıyla silindi"}
+    return {
+        "success": True,
+        "deleted_count": deleted["students"],
+        "homework_deleted_count": deleted["homeworks"],
+        "semester": semester,
+        "academic_year": academic_year,
+        **file_cleanup_info(deleted["file_urls"])
+    }
 
-@api_router.delete("/students/bulk-delete-by-semester")
-async def bulk_delete_students_by_semester(
+@api_router.post("/students/bulk-deactivate")
+async def bulk_deactivate_students(
     semester: str,
     academic_year: str,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Belirli döneme ait tüm öğrencileri sil (Sadece admin)
-    Dönem sonu temizliği için kullanılır
+    Belirli döneme ait aktif öğrencileri pasifleştir (Sadece admin)
+    Pasif öğrenciler giriş yapamaz; kayıtları ve ödevleri korunur
     """
-    students = db.query(models.Student).filter(
-        models.Student.semester == semester,
-        models.Student.academic_year == academic_year
-    ).all()
-    
-    count = len(students)
+    count = await bulk_update_students(
+        db,
+        and_(semester_filter(semester, academic_year), models.Student.is_active == True),
+        {"is_active": False}
+    )
     
-    for student in students:
-        db.delete(student)
+    logger.info(f"⏸️ Toplu pasifleştirme tamamlandı: {count} öğrenci ({semester} {academic_year})")
     
-    db.commit()
+    return {
+        "success": True,
+        "deactivated_count": count,
+        "semester": semester,
+        "academic_year": academic_year
+    }
+
+@api_router.post("/students/bulk-promote")
+async def bulk_promote_students(
+    semester: str,
+    academic_year: str,
+    new_academic_year: Optional[str] = None,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Belirli döneme ait öğrencileri bir üst sınıfa geçir (Sadece admin)
+    Son sınıftaki öğrenciler değişmez. new_academic_year verilirse geçen
+    öğrencilerin akademik yılı da güncellenir
+    """
+    values = {"year": models.Student.year + 1}
+    if new_academic_year:
+        values["academic_year"] = new_academic_year
+    
+    count = await bulk_update_students(
+        db,
+        and_(semester_filter(semester, academic_year), models.Student.year < MAX_STUDENT_YEAR),
+        values
+    )
     
-    logger.info(f"🗑️ Toplu öğrenci silme tamamlandı: {count} öğrenci silindi ({semester} {academic_year})")
+    logger.info(f"⏫ Toplu sınıf geçirme tamamlandı: {count} öğrenci ({semester} {academic_year})")
     
     return {
         "success": True,
-        "deleted_count": count,
+        "promoted_count": count,
         "semester": semester,
-        "academic_year": academic_year
+        "academic_year": academic_year,
+        "new_academic_year": new_academic_year or academic_year
     }
 
+@api_router.delete("/students/{student_id}")
+async def delete_student(
+    student_id: int,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Öğrenci kaydını ödev ve ders kayıtlarıyla birlikte sil (Sadece admin)
+    """
+    student = await db.get(models.Student, student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Öğrenci bulunamadı")
+    student_number, full_name = student.student_number, student.full_name
+    
+    deleted = await delete_students(db, [student_id])
+    await db.commit()
+    
+    logger.info(f"🗑️ Öğrenci silindi: {student_number} - {full_name} ({deleted['homeworks']} ödev)")
+    return {"message": "Öğrenci başarıyla silindi", **file_cleanup_info(deleted["file_urls"])}
 
 # ==================== ÖDEV YÖNETİMİ ENDPOINT'LERİ ====================
 
+# Ödev dosyası boyut sınırı
+HOMEWORK_MAX_SIZE = 3 * 1024 * 1024  # 3MB
+
 @api_router.post("/homeworks/upload")
 async def upload_homework(
     course_id: int = Form(...),
     notes: Optional[str] = Form(None),
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    file: UploadFile = File(...)
 ):
     """
     Ödev yükle (Öğrenci - Token gerektirmez, öğrenci bilgisi formdan gelir)
+    Kayıt oluşturulmadığı için dosya içerik adresli depoya alınmaz
     """
     try:
         # Önce dosyayı kaydet
@@ -961,7 +1397,7 @@ async def create_homework(
     assignment_id: Optional[int] = Form(None),
     notes: Optional[str] = Form(None),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ödev oluştur ve dosya yükle
@@ -969,7 +1405,7 @@ async def create_homework(
     """
     try:
         # Ders kontrolü
-        course = db.query(models.Course).filter(models.Course.id == course_id).first()
+        course = await db.get(models.Course, course_id)
         if not course:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -978,9 +1414,7 @@ async def create_homework(
         
         # Ödev tanımı kontrolü (varsa)
         if assignment_id:
-            assignment = db.query(models.HomeworkAssignment).filter(
-                models.HomeworkAssignment.id == assignment_id
-            ).first()
+            assignment = await db.get(models.HomeworkAssignment, assignment_id)
             
             if not assignment:
                 raise HTTPException(
@@ -996,7 +1430,6 @@ async def create_homework(
                 )
             
             # Süre kontrolü
-            from datetime import datetime
             now = datetime.utcnow()
             
             if now < assignment.start_date:
@@ -1011,23 +1444,10 @@ async def create_homework(
                     detail=f"Ödev süresi doldu. Son teslim: {assignment.due_date.strftime('%d.%m.%Y %H:%M')}"
                 )
         
-        # Dosya boyutu kontrolü (3MB)
-        file_content = await file.read()
-        file_size = len(file_content)
-        
-        if file_size > 3 * 1024 * 1024:  # 3MB
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Dosya boyutu 3MB'dan büyük olamaz. PDF kalitesini düşürerek tekrar deneyin."
-            )
-        
-        # Dosyayı başa al (read() kullandığımız için)
-        await file.seek(0)
-        
         # Öğrenci kontrolü
-        student = db.query(models.Student).filter(
+        student = await db.scalar(select(models.Student).where(
             models.Student.student_number == student_number
-        ).first()
+        ))
         
         if not student:
             raise HTTPException(
@@ -1035,29 +1455,34 @@ async def create_homework(
                 detail="Öğrenci bulunamadı"
             )
         
+        # Dosyayı parça parça kaydet; 3MB aşılınca kopyalama durur (bellekte tutulmaz)
+        # Eski yükleme ancak yeni dosya başarıyla kaydedildikten sonra silinir
+        file_result = await save_upload_file(
+            file,
+            file_type="pdf",
+            max_size=HOMEWORK_MAX_SIZE,
+            too_large_detail="Dosya boyutu 3MB'dan büyük olamaz. PDF kalitesini düşürerek tekrar deneyin.",
+            db=db
+        )
+        
         # Aynı öğrenci + aynı ödev için önceki yükleme var mı kontrol et
         if assignment_id:
-            existing_homework = db.query(models.Homework).filter(
+            existing_homework = await db.scalar(select(models.Homework).where(
                 models.Homework.student_number == student_number,
                 models.Homework.assignment_id == assignment_id
-            ).first()
+            ))
             
             if existing_homework:
                 # Eski dosyayı sil
                 try:
-                    from file_utils import delete_file
-                    delete_result = await delete_file(existing_homework.file_url)
+                    await delete_file(existing_homework.file_url, db)
                     logger.info(f"🗑️ Eski ödev dosyası silindi: {existing_homework.file_url}")
                 except Exception as e:
                     logger.warning(f"⚠️ Eski dosya silinemedi (devam ediliyor): {str(e)}")
                 
-                # Eski kaydı sil
-                db.delete(existing_homework)
-                db.commit()
-                logger.info(f"🔄 Önceki ödev kaydı silindi, yenisi yüklenecek: {student_name} - {course.code}")
-        
-        # Dosyayı kaydet
-        file_result = await save_upload_file(file, file_type="pdf")
+                # Eski kaydı sil (yeni kayıtla aynı işlemde commit edilir)
+                await db.delete(existing_homework)
+                logger.info(f"🔄 Önceki ödev kaydı silinecek, yenisi yüklenecek: {student_name} - {course.code}")
         
         # Ödev kaydı oluştur
         homework = models.Homework(
@@ -1068,13 +1493,14 @@ async def create_homework(
             course_code=course.code,
             course_name=course.name,
             file_url=file_result["url"],
+            file_sha256=file_result["sha256"],
             assignment_id=assignment_id,
             notes=notes
         )
         
         db.add(homework)
-        db.commit()
-        db.refresh(homework)
+        await db.commit()
+        await db.refresh(homework)
         
         logger.info(f"✅ Ödev yüklendi: {student_name} - {course.code}")
         
@@ -1083,7 +1509,8 @@ async def create_homework(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        # Geri alma yeni dosyayı diskten siler, eski ödevin dosyası yerinde kalır (bkz. file_store)
+        await db.rollback()
         logger.error(f"❌ Ödev oluşturma hatası: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1093,50 +1520,77 @@ async def create_homework(
 @api_router.get("/homeworks/my-homeworks/{student_number}", response_model=List[schemas.Homework])
 async def get_my_homeworks(
     student_number: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Öğrencinin yüklediği ödevleri getir
     """
-    homeworks = db.query(models.Homework).filter(
+    homeworks = (await db.scalars(select(models.Homework).where(
         models.Homework.student_number == student_number
-    ).order_by(models.Homework.upload_date.desc()).all()
+    ).order_by(models.Homework.upload_date.desc()))).all()
     
     return homeworks
 
 @api_router.get("/homeworks", response_model=List[schemas.Homework])
 async def get_all_homeworks(
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    course_id: Optional[int] = None,
+    assignment_id: Optional[int] = None,
+    student_number: Optional[str] = None,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    include_total: bool = False,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Tüm ödevleri listele (Admin only)
+    Ödevleri yeniden eskiye listele (Admin only)
+    course_id, assignment_id, student_number ve yükleme tarihi aralığı
+    (uploaded_from <= upload_date < uploaded_to) ile süzülebilir. Sonraki sayfa
+    X-Next-Cursor başlığında döner (başlık yoksa başka kayıt yoktur);
+    include_total=true ile filtreye uyan toplam X-Total-Count başlığında döner
     """
-    homeworks = db.query(models.Homework).order_by(
-        models.Homework.upload_date.desc()
-    ).all()
+    query = select(models.Homework)
+    if course_id is not None:
+        query = query.where(models.Homework.course_id == course_id)
+    if assignment_id is not None:
+        query = query.where(models.Homework.assignment_id == assignment_id)
+    if student_number:
+        query = query.where(models.Homework.student_number == student_number)
+    if uploaded_from:
+        query = query.where(models.Homework.upload_date >= uploaded_from)
+    if uploaded_to:
+        query = query.where(models.Homework.upload_date < uploaded_to)
+    
+    homeworks, next_cursor = await paginate(db, query, HOMEWORK_ORDER, limit, skip, cursor)
+    set_next_cursor(response, next_cursor)
+    if include_total:
+        await set_total_count(db, response, query)
     
     return homeworks
 
 @api_router.delete("/homeworks/{homework_id}")
 async def delete_homework(
     homework_id: int,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ödevi sil (Admin only)
     """
-    homework = db.query(models.Homework).filter(models.Homework.id == homework_id).first()
+    homework = await db.get(models.Homework, homework_id)
     if not homework:
         raise HTTPException(status_code=404, detail="Ödev bulunamadı")
     
     # Dosyayı da sil
     if homework.file_url:
-        delete_file(homework.file_url)
+        await delete_file(homework.file_url, db)
     
-    db.delete(homework)
-    db.commit()
+    await db.delete(homework)
+    await db.commit()
     
     logger.info(f"🗑️ Ödev silindi: {homework.student_name} - {homework.course_code}")
     return {"message": "Ödev başarıyla silindi"}
@@ -1147,14 +1601,14 @@ async def delete_homework(
 @api_router.post("/homework-assignments", response_model=schemas.HomeworkAssignment, status_code=status.HTTP_201_CREATED)
 async def create_homework_assignment(
     assignment: schemas.HomeworkAssignmentCreate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ödev tanımı oluştur (Admin/Hoca)
     """
     # Ders kontrolü
-    course = db.query(models.Course).filter(models.Course.id == assignment.course_id).first()
+    course = await db.get(models.Course, assignment.course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Ders bulunamadı")
     
@@ -1167,8 +1621,8 @@ async def create_homework_assignment(
     
     db_assignment = models.HomeworkAssignment(**assignment.dict())
     db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
+    await db.commit()
+    await db.refresh(db_assignment)
     
     logger.info(f"✅ Ödev tanımı oluşturuldu: {assignment.title} - {course.name}")
     return db_assignment
@@ -1178,33 +1632,31 @@ async def create_homework_assignment(
 async def get_homework_assignments(
     course_id: Optional[int] = None,
     is_active: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ödev tanımlarını listele
     """
-    query = db.query(models.HomeworkAssignment)
+    query = select(models.HomeworkAssignment)
     
     if course_id:
-        query = query.filter(models.HomeworkAssignment.course_id == course_id)
+        query = query.where(models.HomeworkAssignment.course_id == course_id)
     if is_active is not None:
-        query = query.filter(models.HomeworkAssignment.is_active == is_active)
+        query = query.where(models.HomeworkAssignment.is_active == is_active)
     
-    assignments = query.order_by(models.HomeworkAssignment.due_date.desc()).all()
+    assignments = (await db.scalars(query.order_by(models.HomeworkAssignment.due_date.desc()))).all()
     return assignments
 
 
 @api_router.get("/homework-assignments/{assignment_id}", response_model=schemas.HomeworkAssignment)
 async def get_homework_assignment(
     assignment_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ödev tanımı detayı
     """
-    assignment = db.query(models.HomeworkAssignment).filter(
-        models.HomeworkAssignment.id == assignment_id
-    ).first()
+    assignment = await db.get(models.HomeworkAssignment, assignment_id)
     
     if not assignment:
         raise HTTPException(status_code=404, detail="Ödev tanımı bulunamadı")
@@ -1212,19 +1664,67 @@ async def get_homework_assignment(
     return assignment
 
 
+@api_router.get("/homework-assignments/{assignment_id}/submissions.zip")
+async def download_assignment_submissions(
+    assignment_id: int,
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ödev tanımına yapılan tüm teslimleri tek ZIP olarak indir (Admin/Hoca)
+    Dosyalar öğrenci numarasıyla adlandırılır; arşiv bellekte veya diskte
+    oluşturulmadan parça parça akıtılır
+    """
+    assignment = await db.get(models.HomeworkAssignment, assignment_id)
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Ödev tanımı bulunamadı")
+    
+    submissions = (await db.execute(
+        select(
+            models.Homework.id,
+            models.Homework.student_number,
+            models.Homework.file_url,
+            models.Homework.upload_date
+        )
+        .where(models.Homework.assignment_id == assignment_id)
+        .order_by(models.Homework.student_number, models.Homework.upload_date.desc())
+    )).all()
+    
+    entries = []
+    used_names = set()
+    for submission in submissions:
+        if not submission.file_url.startswith("/uploads/"):
+            continue
+        file_path = UPLOAD_DIR / submission.file_url.replace("/uploads/", "", 1)
+        name = f"{sanitize_filename(submission.student_number) or submission.id}{file_path.suffix}"
+        # Aynı öğrencinin birden fazla teslimi varsa en yenisi numarayla, diğerleri kayıt ID'siyle adlandırılır
+        if name in used_names:
+            name = f"{Path(name).stem}_{submission.id}{file_path.suffix}"
+        used_names.add(name)
+        entries.append((name, file_path, submission.upload_date))
+    
+    course = await db.get(models.Course, assignment.course_id)
+    archive_name = sanitize_filename(f"{course.code if course else 'ders'}_odev{assignment_id}_teslimler") + ".zip"
+    logger.info(f"📦 Ödev teslimleri indiriliyor: {assignment.title} ({len(entries)} dosya)")
+    
+    return StreamingResponse(
+        iter_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{archive_name}"'}
+    )
+
+
 @api_router.put("/homework-assignments/{assignment_id}", response_model=schemas.HomeworkAssignment)
 async def update_homework_assignment(
     assignment_id: int,
     assignment_update: schemas.HomeworkAssignmentUpdate,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ödev tanımını güncelle (Süre uzatma vb.) (Admin/Hoca)
     """
-    db_assignment = db.query(models.HomeworkAssignment).filter(
-        models.HomeworkAssignment.id == assignment_id
-    ).first()
+    db_assignment = await db.get(models.HomeworkAssignment, assignment_id)
     
     if not db_assignment:
         raise HTTPException(status_code=404, detail="Ödev tanımı bulunamadı")
@@ -1245,8 +1745,8 @@ async def update_homework_assignment(
     for field, value in update_data.items():
         setattr(db_assignment, field, value)
     
-    db.commit()
-    db.refresh(db_assignment)
+    await db.commit()
+    await db.refresh(db_assignment)
     
     logger.info(f"✅ Ödev tanımı güncellendi: {db_assignment.title}")
     return db_assignment
@@ -1255,52 +1755,170 @@ async def update_homework_assignment(
 @api_router.delete("/homework-assignments/{assignment_id}")
 async def delete_homework_assignment(
     assignment_id: int,
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Ödev tanımını sil (Admin/Hoca)
     """
-    db_assignment = db.query(models.HomeworkAssignment).filter(
-        models.HomeworkAssignment.id == assignment_id
-    ).first()
+    db_assignment = await db.get(models.HomeworkAssignment, assignment_id)
     
     if not db_assignment:
         raise HTTPException(status_code=404, detail="Ödev tanımı bulunamadı")
     
-    db.delete(db_assignment)
-    db.commit()
+    await db.delete(db_assignment)
+    await db.commit()
     
     logger.info(f"🗑️ Ödev tanımı silindi: {db_assignment.title}")
     return {"message": "Ödev tanımı silindi"}
 
 
+# ==================== ANA SAYFA ====================
+
+@api_router.get("/home", response_model=schemas.HomePage)
+async def get_home(
+    request: Request,
+    response: Response,
+    limit: int = HOME_ITEM_LIMIT,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ana sayfa verileri tek istekte (herkese açık)
+    Son duyurular, galeri, aktif dersler ve CV tek okuma işleminde (aynı anlık
+    görüntüden) okunur. ETag dört tablonun doğrulayıcılarından birleştirilir;
+    aynı ETag için serileştirilmiş gövde bellekten döner
+    """
+    limit = max(1, min(limit, HOME_MAX_ITEM_LIMIT))
+    
+    async with read_snapshot(db):
+        validators = await combined_validators(
+            db,
+            (models.Announcement, func.sum(models.Announcement.views)),
+            (models.GalleryItem,),
+            (models.Course,),
+            (models.CV,),
+            extra=(limit,),
+        )
+        not_modified = check_not_modified(request, response, validators)
+        if not_modified:
+            return not_modified
+        
+        key = ("/api/home", validators.etag)
+        cached = home_cache.get(key)
+        if cached is not None:
+            return json_bytes_response(cached.body, response)
+        
+        announcements, _ = await paginate(
+            db,
+            select(*ANNOUNCEMENT_COLUMNS).where(models.Announcement.is_published == True),
+            ANNOUNCEMENT_ORDER, limit, scalars=False
+        )
+        gallery_items, _ = await paginate(
+            db,
+            select(*GALLERY_ITEM_COLUMNS).where(models.GalleryItem.is_published == True),
+            GALLERY_ORDER, limit, scalars=False
+        )
+        courses, _ = await paginate(
+            db,
+            select(*COURSE_COLUMNS).where(models.Course.is_active == True),
+            COURSE_ORDER, limit, scalars=False
+        )
+        cv = await db.scalar(select(models.CV))
+        variants = await load_variants(
+            db,
+            [announcement.image_url for announcement in announcements]
+            + [item.url for item in gallery_items if item.item_type == 'photo']
+        )
+        # Çıkışta işlem geri alınınca ORM nesneleri expire olur; eşleme blok içinde yapılır
+        content = {
+            "announcements": [
+                announcement_dict(announcement, variants.get(announcement.image_url, ()))
+                for announcement in announcements
+            ],
+            "gallery": [gallery_item_dict(item, variants.get(item.url, ())) for item in gallery_items],
+            "courses": [course_dict(course) for course in courses],
+            "cv": cv_dict(cv) if cv else None,
+        }
+    
+    body = dumps(content)
+    home_cache.set(key, CachedResponse(status=200, headers=[], body=body))
+    return json_bytes_response(body, response)
+
+# ==================== ARAMA ====================
+
+@api_router.get("/search", response_model=List[schemas.SearchResult])
+async def search_content(
+    response: Response,
+    q: str = "",
+    type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Duyuru, yayın ve derslerde tam metin arama (herkese açık)
+    Sonuçlar BM25 skoruna göre sıralanır; title/snippet eşleşmeleri <mark> ile işaretlenir.
+    type ile tipler süzülebilir (ör. type=announcement,publication); sonraki sayfa
+    X-Next-Cursor başlığında döner
+    """
+    kinds = parse_kinds(type)
+    if cursor:
+        skip = decode_search_cursor(cursor)
+    
+    results, has_more = await search(db, q, kinds, limit, skip)
+    if has_more:
+        set_next_cursor(response, encode_search_cursor(skip + len(results)))
+    return json_response(results, response)
+
 # ==================== ANALYTICS ENDPOINTS ====================
 
 @api_router.get("/analytics", response_model=schemas.AnalyticsResponse)
 async def get_analytics(
-    current_user: models.User = Depends(get_current_active_admin),
-    db: Session = Depends(get_db)
+    current_user: TokenClaims = Depends(get_current_active_admin),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get site analytics (admin only)"""
-    # Get or create analytics record
-    analytics = db.query(models.Analytics).first()
+    """
+    Get site analytics (admin only)
+    Toplamlar ekleme/silme işlemleriyle aynı işlemde tetikleyicilerle güncellenir;
+    endpoint tek satır okur ve tablo boyutundan bağımsızdır
+    """
+    analytics = await db.scalar(select(models.Analytics).order_by(models.Analytics.id).limit(1))
     if not analytics:
-        analytics = models.Analytics()
-        db.add(analytics)
-    
-    # Update counts
-    analytics.total_announcements = db.query(models.Announcement).count()
-    analytics.total_courses = db.query(models.Course).count()
-    analytics.total_publications = db.query(models.Publication).count()
-    analytics.total_gallery_items = db.query(models.GalleryItem).count()
-    analytics.total_students = db.query(models.Student).count()
-    analytics.active_students = db.query(models.Student).filter(models.Student.is_active == True).count()
-    
-    db.commit()
-    db.refresh(analytics)
+        # Satır silinmişse yeniden oluştur ve toplamları hesapla
+        from migrations import backfill_analytics
+        await db.run_sync(lambda session: backfill_analytics(session.connection()))
+        await db.commit()
+        analytics = await db.scalar(select(models.Analytics).order_by(models.Analytics.id).limit(1))
     return analytics
 
+# ==================== ARKA PLAN İŞLERİ ====================
+
+@api_router.get("/jobs/{job_id}", response_model=schemas.JobStatus)
+async def get_job(
+    job_id: str,
+    current_user: TokenClaims = Depends(get_current_active_admin)
+):
+    """Arka plan işinin durumunu ve ilerlemesini getir (admin only)"""
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="İş bulunamadı")
+    return job
+
+# ==================== METRİKLER ====================
+
+@api_router.get("/metrics")
+async def get_metrics(current_user: TokenClaims = Depends(get_current_active_admin)):
+    """Sunucu içi performans sayaçları (admin only)"""
+    return {
+        "response_cache": response_cache.stats(),
+        "write_behind": write_behind.stats(),
+        "password_hasher": password_hasher.stats(),
+        "content_store": content_store.stats(),
+        "compression": compressed_bodies.stats(),
+        "home_cache": home_cache.stats()
+    }
+
 # ==================== HELLO WORLD (for testing) ====================
 
 @api_router.get("/")
@@ -1324,24 +1942,44 @@ async def view_pdf(filename: str):
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="PDF dosyası bulunamadı")
     
-    return FileResponse(
-        path=file_path,
+    return CachedFileResponse(
+        file_path,
         media_type="application/pdf",
         filename=filename
     )
 
 @api_router.get("/files/image/{filename}")
-async def view_image(filename: str):
+async def view_image(
+    filename: str,
+    request: Request,
+    w: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """
     Görsel dosyasını görüntüle
     Herkes erişebilir (kimlik doğrulama gerekmez)
+    Varyantı varsa format Accept başlığına (AVIF/WebP/JPEG), genişlik w
+    parametresine göre seçilir; yoksa orijinal dosya döner
+
+    Varyant dosyaları değişmez (immutable) olarak önbelleğe alınır. Orijinale
+    düşülen yanıt no-cache ile gider: varyantlar sonradan oluştuğunda aynı
+    URL artık farklı bir dosya döndürür ve tarayıcı bunu görebilmelidir.
     """
     file_path = UPLOAD_DIR / "images" / filename
     
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Görsel bulunamadı")
     
-    return FileResponse(path=file_path)
+    variants = (await db.scalars(
+        select(models.ImageVariant).where(models.ImageVariant.source_filename == filename)
+    )).all()
+    variant = negotiate_variant(variants, request.headers.get("accept"), w)
+    if variant:
+        variant_path = UPLOAD_DIR / variant.url.replace("/uploads/", "")
+        if variant_path.exists():
+            return CachedFileResponse(variant_path, media_type=variant.mime_type, headers={"Vary": "Accept"})
+    
+    return CachedFileResponse(file_path, cache_control=REVALIDATE_CACHE_CONTROL, headers={"Vary": "Accept"})
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -1361,6 +1999,17 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+# Herkese açık içerik listeleri için yanıt önbelleği
+# (admin yazma endpoint'leri ilgili yolu response_cache.invalidate ile temizler)
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    paths=["/api/announcements", "/api/courses", "/api/publications", "/api/gallery", "/api/cv"],
+)
+
+# Yanıt sıkıştırma (önbelleğin dışında: önbellek sıkıştırılmamış gövdeyi tutar)
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -1373,6 +2022,7 @@ app.add_middleware(
     ],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 # Configure logging
@@ -1386,28 +2036,34 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     """Create default admin user if not exists"""
-    from database import SessionLocal
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         # Check if admin exists
-        admin = db.query(models.User).filter(models.User.username == "admin").first()
+        admin = await db.scalar(select(models.User).where(models.User.username == "admin"))
         if not admin:
             admin = models.User(
                 username="admin",
                 email="admin@example.com",
                 full_name="Administrator",
-                hashed_password=get_password_hash("admin123"),
+                hashed_password=await get_password_hash_async("admin123"),
                 is_active=True,
                 is_admin=True
             )
             db.add(admin)
-            db.commit()
+            await db.commit()
             logger.info("✅ Default admin user created (username: admin, password: admin123)")
         else:
             logger.info("✅ Admin user already exists")
-    finally:
-        db.close()
+    
+    write_behind.start()
+    await credential_versions.refresh()
+    credential_versions.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    from database import async_engine
+    await write_behind.stop()
+    await credential_versions.stop()
+    await async_engine.dispose()
+    shutdown_process_pool()
+    password_hasher.shutdown()
     logger.info("Application shutting down")
@@ -0,0 +1,184 @@
+"""
+Toplu Öğrenci İşlemleri
+
+Dönem sonu işlemleri dönem ve akademik yıla göre seçilen öğrencilere küme
+tabanlı SQL ile uygulanır. Bu işlemler silme, pasifleştirme ve bir üst sınıfa
+geçirmedir. Öğrenciler id sırasıyla STUDENT_BULK_CHUNK_SIZE'lık parçalar
+halinde işlenir ve her parça kendi kısa işleminde commit edilir. Böylece
+binlerce öğrencilik bir işlem yazma kilidini uzun süre tutmaz; aradaki ödev
+yükleme gibi istekler beklemez.
+
+Silinen öğrencilerin ödev ve ders kayıtları aynı parça işleminde silinir.
+Ödev dosyalarının depo referansları da aynı işlemde bırakılır. Dosyaların
+kendisi commit'ten sonra bir arka plan işiyle diskten kaldırılır.
+"""
+
+from typing import List, Optional
+import asyncio
+import logging
+import os
+
+from sqlalchemy import and_, delete, select, update
+
+import models
+from compression import remove_precompressed
+from file_store import content_store
+from file_utils import UPLOAD_DIR
+from jobs import Job, jobs
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== YAPILANDIRMA ====================
+
+# Tek işlemde (transaction) işlenen öğrenci sayısı
+STUDENT_BULK_CHUNK_SIZE = int(os.environ.get("STUDENT_BULK_CHUNK_SIZE", "500"))
+
+# Arka plan temizliğinde bir iş parçacığı çağrısında silinen dosya sayısı
+FILE_CLEANUP_BATCH_SIZE = 200
+
+# Son sınıf; bu sınıftaki öğrenciler bir üst sınıfa geçirilmez
+MAX_STUDENT_YEAR = 4
+
+
+# ==================== SEÇİM ====================
+
+def semester_filter(semester: str, academic_year: str):
+    """Döneme ait öğrencileri seçen koşul (ix_students_semester_academic_year)"""
+    return and_(
+        models.Student.semester == semester,
+        models.Student.academic_year == academic_year,
+    )
+
+
+def _chunk_ids(where, after_id: int, chunk_size: int):
+    """Koşula uyan, after_id'den sonraki ilk chunk_size öğrencinin ID'leri (keyset)"""
+    return (
+        select(models.Student.id)
+        .where(where, models.Student.id > after_id)
+        .order_by(models.Student.id)
+        .limit(chunk_size)
+    )
+
+
+# ==================== SİLME ====================
+
+async def delete_students(db, student_ids: List[int]) -> dict:
+    """
+    Öğrencileri ödev ve ders kayıtlarıyla birlikte sil (commit çağırana aittir)
+
+    Ödev dosyalarının depo referansları aynı işlemde bırakılır. Diskteki
+    dosyalar silinmez; dönen file_urls start_file_cleanup'a verilmelidir.
+
+    Returns:
+        dict: students (silinen öğrenci sayısı), homeworks (silinen ödev sayısı), file_urls
+    """
+    homework_urls = select(models.Homework.file_url).where(models.Homework.student_id.in_(student_ids))
+    await content_store.release_many(db, homework_urls)
+
+    file_urls = (await db.scalars(
+        delete(models.Homework)
+        .where(models.Homework.student_id.in_(student_ids))
+        .returning(models.Homework.file_url)
+    )).all()
+    await db.execute(delete(models.Enrollment).where(models.Enrollment.student_id.in_(student_ids)))
+    result = await db.execute(delete(models.Student).where(models.Student.id.in_(student_ids)))
+
+    return {"students": result.rowcount, "homeworks": len(file_urls), "file_urls": list(file_urls)}
+
+
+async def bulk_delete_students(db, where, chunk_size: int = STUDENT_BULK_CHUNK_SIZE) -> dict:
+    """
+    Koşula uyan öğrencileri parça parça sil (her parça ayrı işlemde commit edilir)
+
+    Returns:
+        dict: students, homeworks ve tüm parçaların file_urls listesi
+    """
+    totals = {"students": 0, "homeworks": 0, "file_urls": []}
+    after_id = 0
+    while True:
+        student_ids = (await db.scalars(_chunk_ids(where, after_id, chunk_size))).all()
+        if not student_ids:
+            break
+
+        deleted = await delete_students(db, student_ids)
+        await db.commit()
+
+        totals["students"] += deleted["students"]
+        totals["homeworks"] += deleted["homeworks"]
+        totals["file_urls"].extend(deleted["file_urls"])
+        after_id = student_ids[-1]
+    return totals
+
+
+# ==================== GÜNCELLEME ====================
+
+async def bulk_update_students(db, where, values: dict, chunk_size: int = STUDENT_BULK_CHUNK_SIZE) -> int:
+    """
+    Koşula uyan öğrencileri parça parça güncelle
+
+    Her parça tek bir UPDATE ... WHERE id IN (sonraki parça) RETURNING id
+    sorgusudur ve ayrı işlemde commit edilir. Keyset (id) ilerlediği için
+    güncelleme sonrası koşula hâlâ uyan satırlar (ör. 1. sınıftan 2. sınıfa
+    geçen öğrenci) ikinci kez güncellenmez.
+
+    Returns:
+        int: Güncellenen öğrenci sayısı
+    """
+    updated = 0
+    after_id = 0
+    while True:
+        student_ids = (await db.scalars(
+            update(models.Student)
+            .where(models.Student.id.in_(_chunk_ids(where, after_id, chunk_size)))
+            .values(**values)
+            .returning(models.Student.id)
+        )).all()
+        await db.commit()
+        if not student_ids:
+            break
+
+        updated += len(student_ids)
+        after_id = max(student_ids)
+    return updated
+
+
+# ==================== DOSYA TEMİZLİĞİ ====================
+
+def _remove_files(file_urls: List[str]) -> int:
+    """Mantıksal dosyaları ve sıkıştırılmış kopyalarını sil (iş parçacığında çalışır)"""
+    removed = 0
+    for file_url in file_urls:
+        if not file_url.startswith("/uploads/"):
+            continue
+        file_path = UPLOAD_DIR / file_url.replace("/uploads/", "", 1)
+        remove_precompressed(file_path)
+        try:
+            file_path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ Dosya silinemedi: {file_url} ({str(e)})")
+    return removed
+
+
+async def run_file_cleanup(job: Job, file_urls: List[str]) -> dict:
+    """Silinen kayıtların dosyalarını olay döngüsünü bloklamadan parça parça sil"""
+    removed = 0
+    for start in range(0, len(file_urls), FILE_CLEANUP_BATCH_SIZE):
+        batch = file_urls[start:start + FILE_CLEANUP_BATCH_SIZE]
+        removed += await asyncio.to_thread(_remove_files, batch)
+        job.advance(len(batch))
+
+    logger.info(f"🗑️ Dosya temizliği tamamlandı: {removed}/{len(file_urls)} dosya silindi")
+    return {"removed_count": removed, "missing_count": len(file_urls) - removed}
+
+
+def start_file_cleanup(file_urls: List[str]) -> Optional[Job]:
+    """Dosya temizliğini arka plan işi olarak başlat (silinecek dosya yoksa None)"""
+    if not file_urls:
+        return None
+    job = jobs.create("students.file_cleanup", total=len(file_urls))
+    return jobs.start(job, run_file_cleanup(job, file_urls))
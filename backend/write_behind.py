@@ -0,0 +1,175 @@
+"""
+Gecikmeli Yazma (Write-Behind) Tamponu
+
+Bu modül, sık değişen sayaç/zaman damgası kolonlarını (duyuru görüntülenme
+sayısı, öğrenci son giriş zamanı) her istekte ayrı ayrı commit etmek yerine
+bellekte biriktirir ve belirli aralıklarla tek bir işlemde (transaction)
+toplu olarak yazar. Böylece sayfa görüntüleme ve giriş istekleri SQLite yazma
+kilidini beklemez; detay sayfası GET istekleri salt okunur hale gelir.
+
+Tampon süreç içidir: süreç beklenmedik şekilde sonlanırsa son aralıktaki
+birikmiş değerler kaybolur. Düzgün kapanışta (shutdown) kalanlar yazılır.
+"""
+
+from datetime import datetime
+from typing import Optional
+import asyncio
+import logging
+import os
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import SQLAlchemyError
+
+import models
+from database import async_engine
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== YAPILANDIRMA ====================
+
+# Birikmiş değerlerin veritabanına yazılma aralığı (saniye)
+WRITE_BEHIND_INTERVAL = float(os.environ.get("WRITE_BEHIND_INTERVAL", "5"))
+
+
+# ==================== TOPLU GÜNCELLEME SORGULARI ====================
+
+announcements_table = models.Announcement.__table__
+students_table = models.Student.__table__
+
+# Görüntülenme artışı; updated_at korunur ki içerik değişmiş sayılmasın (ETag)
+ANNOUNCEMENT_VIEWS_UPDATE = (
+    update(announcements_table)
+    .where(announcements_table.c.id == bindparam("_id"))
+    .values(
+        views=announcements_table.c.views + bindparam("_increment"),
+        updated_at=announcements_table.c.updated_at,
+    )
+)
+
+STUDENT_LAST_LOGIN_UPDATE = (
+    update(students_table)
+    .where(students_table.c.id == bindparam("_id"))
+    .values(last_login=bindparam("_last_login"))
+)
+
+
+# ==================== TAMPON ====================
+
+class WriteBehindBuffer:
+    """
+    Sayaç artışlarını ve son giriş zamanlarını biriktirip toplu yazan tampon
+
+    Aynı kayda gelen artışlar toplanır, aynı öğrencinin girişlerinden yalnızca
+    en yenisi tutulur. flush() tek bir işlemde executemany ile yazar; hata
+    olursa değerler tampona geri eklenir ve bir sonraki turda tekrar denenir.
+    """
+
+    def __init__(self, engine, interval: float = WRITE_BEHIND_INTERVAL):
+        self.engine = engine
+        self.interval = interval
+        self._view_increments = {}
+        self._last_logins = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+
+    # ---------- Kayıt ----------
+
+    def add_view(self, announcement_id: int, count: int = 1) -> None:
+        """Duyurunun görüntülenme sayısını tamponda artır"""
+        self._view_increments[announcement_id] = self._view_increments.get(announcement_id, 0) + count
+
+    def pending_views(self, announcement_id: int) -> int:
+        """Henüz yazılmamış görüntülenme sayısı"""
+        return self._view_increments.get(announcement_id, 0)
+
+    def record_login(self, student_id: int, when: datetime) -> None:
+        """Öğrencinin son giriş zamanını tampona yaz (en yenisi kalır)"""
+        previous = self._last_logins.get(student_id)
+        if previous is None or when > previous:
+            self._last_logins[student_id] = when
+
+    def pending_last_login(self, student_id: int) -> Optional[datetime]:
+        """Henüz yazılmamış son giriş zamanı"""
+        return self._last_logins.get(student_id)
+
+    # ---------- Yazma ----------
+
+    async def flush(self) -> int:
+        """
+        Birikmiş değerleri tek işlemde veritabanına yaz
+
+        Returns:
+            int: Yazılan kayıt sayısı
+        """
+        async with self._lock:
+            views, self._view_increments = self._view_increments, {}
+            logins, self._last_logins = self._last_logins, {}
+            if not views and not logins:
+                return 0
+
+            try:
+                async with self.engine.begin() as connection:
+                    if views:
+                        await connection.execute(ANNOUNCEMENT_VIEWS_UPDATE, [
+                            {"_id": announcement_id, "_increment": increment}
+                            for announcement_id, increment in views.items()
+                        ])
+                    if logins:
+                        await connection.execute(STUDENT_LAST_LOGIN_UPDATE, [
+                            {"_id": student_id, "_last_login": when}
+                            for student_id, when in logins.items()
+                        ])
+            except SQLAlchemyError as e:
+                # Değerleri kaybetme; bir sonraki turda yeniden dene
+                self.failures += 1
+                for announcement_id, increment in views.items():
+                    self.add_view(announcement_id, increment)
+                for student_id, when in logins.items():
+                    self.record_login(student_id, when)
+                logger.warning(f"⚠️ Gecikmeli yazma başarısız, tekrar denenecek: {str(e)}")
+                return 0
+
+            written = len(views) + len(logins)
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Periyodik yazma görevini başlat (uygulama başlangıcında)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Periyodik görevi durdur ve kalan değerleri yaz (uygulama kapanışında)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "pending_views": len(self._view_increments),
+            "pending_logins": len(self._last_logins),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+        }
+
+
+# Uygulama genelinde kullanılan tampon
+write_behind = WriteBehindBuffer(async_engine)
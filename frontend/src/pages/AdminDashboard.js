@@ -44,10 +44,16 @@ const getErrorMessage = (error) => {
   return error.message || 'Bir hata oluştu';
 };
 
+// Ödev listesi sayfa boyutu (sonraki sayfa X-Next-Cursor ile yüklenir)
+const HOMEWORK_PAGE_SIZE = 50;
+
 // Homeworks Tab Component
 const HomeworksTab = ({ currentTheme, toast }) => {
   const [homeworks, setHomeworks] = useState([]);
+  const [totalHomeworks, setTotalHomeworks] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [courses, setCourses] = useState([]);
   const [students, setStudents] = useState([]);
 
@@ -65,14 +71,23 @@ const HomeworksTab = ({ currentTheme, toast }) => {
     }
   };
 
-  const loadHomeworks = async () => {
+  // cursor verilmezse ilk sayfa (toplam sayı ile) yüklenir, verilirse listeye eklenir
+  const loadHomeworks = async (cursor = null) => {
     try {
-      setLoading(true);
-      const response = await api.get('/homeworks');
-      setHomeworks(response.data);
+      cursor ? setLoadingMore(true) : setLoading(true);
+      const params = cursor
+        ? { limit: HOMEWORK_PAGE_SIZE, cursor }
+        : { limit: HOMEWORK_PAGE_SIZE, include_total: true };
+      const response = await api.get('/homeworks', { params });
+      const loaded = cursor ? [...homeworks, ...response.data] : response.data;
+      setHomeworks(loaded);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+      if (!cursor) {
+        setTotalHomeworks(Number(response.headers['x-total-count'] ?? response.data.length));
+      }
       
-      // Benzersiz öğrenci sayısını hesapla
-      const uniqueStudents = [...new Set(response.data.map(h => h.student_number))];
+      // Benzersiz öğrenci sayısını hesapla (yüklenen ödevler üzerinden)
+      const uniqueStudents = [...new Set(loaded.map(h => h.student_number))];
       setStudents(uniqueStudents);
     } catch (error) {
       console.error('Ödev yükleme hatası:', error);
@@ -83,6 +98,7 @@ const HomeworksTab = ({ currentTheme, toast }) => {
       });
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -127,7 +143,7 @@ const HomeworksTab = ({ currentTheme, toast }) => {
             <div className="flex items-center justify-between">
               <div>
                 <p className="text-sm" style={{ color: currentTheme.text, opacity: 0.7 }}>Toplam Ödev</p>
-                <p className="text-3xl font-bold" style={{ color: currentTheme.text }}>{homeworks.length}</p>
+                <p className="text-3xl font-bold" style={{ color: currentTheme.text }}>{totalHomeworks}</p>
               </div>
               <FileText className="h-8 w-8" style={{ color: currentTheme.accent }} />
             </div>
@@ -175,7 +191,7 @@ const HomeworksTab = ({ currentTheme, toast }) => {
 
       <div className="flex justify-between items-center">
         <h2 className="text-2xl font-bold" style={{ color: currentTheme.text }}>
-          Yüklenen Ödevler ({homeworks.length})
+          Yüklenen Ödevler ({totalHomeworks})
         </h2>
         {homeworks.length > 0 && (
           <Button 
@@ -243,6 +259,17 @@ const HomeworksTab = ({ currentTheme, toast }) => {
               </CardContent>
             </Card>
           ))}
+          {nextCursor && (
+            <div className="text-center pt-2">
+              <Button
+                onClick={() => loadHomeworks(nextCursor)}
+                variant="outline"
+                disabled={loadingMore}
+              >
+                {loadingMore ? 'Yükleniyor...' : `Daha Fazla Yükle (${homeworks.length}/${totalHomeworks})`}
+              </Button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -140,7 +140,12 @@ export const authAPI = {
     const response = await api.post('/auth/change-password', formData, {
       headers: { 'Content-Type': 'multipart/form-data' },
     });
-    
+
+    // Şifre değişince eski token geçersiz olur; yeni token'ı sakla
+    if (response.data.access_token) {
+      localStorage.setItem('authToken', response.data.access_token);
+    }
+
     return response.data;
   },
 };